@@ -0,0 +1,59 @@
+import argparse
+from benchmarks.circuits import FAMILIES, family_defaults
+from benchmarks.runner import run_benchmarks, write_results, scaling_exponents, check_scaling, parse_throughput
+from benchmarks.validation import compare_with_ngspice, format_comparison
+from entities.netlist import Netlist
+
+def main() -> None:
+    """
+    Запускает замеры масштабирования из командной строки (из каталога src):
+
+        python -m benchmarks --families ladder mesh star --sizes 1 2 4 8 --backends kirchhoff numeric mna
+
+    С --parse-sizes дополнительно замеряется скорость чтения файлов .cir (read_netlist) на схемах этих размеров,
+    с --ngspice каждая схема рассчитывается также в ngspice (.tran) и сравнивается по точности и времени.
+    Не заданные размеры, интервал и шаг берутся для каждого семейства из family_defaults.
+    """
+    parser = argparse.ArgumentParser(description="Замеры времени и памяти этапов анализа на параметрических схемах")
+    parser.add_argument('--families', nargs='+', default=list(FAMILIES), choices=list(FAMILIES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=None)
+    parser.add_argument('--backends', nargs='+', default=['kirchhoff', 'numeric', 'mna'], choices=['kirchhoff', 'numeric', 'mna'])
+    parser.add_argument('--end-time', type=float, default=None)
+    parser.add_argument('--time-step', type=float, default=None)
+    parser.add_argument('--timeout', type=float, default=300.0, help="Ограничение времени на один случай, с")
+    parser.add_argument('--trace-memory', action='store_true', help="Пиковая память каждого этапа (tracemalloc)")
+    parser.add_argument('--parse-sizes', nargs='*', type=int, default=[], help="Размеры схем для замера чтения .cir")
+    parser.add_argument('--ngspice', action='store_true', help="Сравнить переходный процесс с ngspice (нужен libngspice)")
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+    records = run_benchmarks(args.families, args.sizes, args.backends, timeout=args.timeout,
+                             end_time=args.end_time, time_step=args.time_step, trace_memory=args.trace_memory)
+    parse_records = []
+    for family in args.families:
+        for size in args.parse_sizes:
+            record = parse_throughput(family, size, trace_memory=args.trace_memory)
+            parse_records.append(record)
+            print(f"{family:>6} {size:>5} parse: {record['lines']} строк, {record['parse_time']:.3f} с, "
+                  f"{record['lines_per_second']:.0f} строк/с (PySpice {record['build_time'] + record['from_circuit_time']:.3f} с)", flush=True)
+    comparisons = []
+    if args.ngspice:
+        for family in args.families:
+            defaults = family_defaults(family)
+            for size in sorted(args.sizes or defaults['sizes']):
+                circuit = FAMILIES[family](size)
+                netlist = Netlist.from_circuit(circuit)
+                cold_start = {key: 0.0 for key in netlist.keys_of_type(Netlist.INDUCTOR, Netlist.CAPACITOR)}
+                end_time = defaults['end_time'] if args.end_time is None else args.end_time
+                comparison = compare_with_ngspice(circuit, end_time, backends=tuple(args.backends),
+                                                  initial_conditions=cold_start)
+                print(f"{family:>6} {size:>5} ngspice:\n{format_comparison(comparison)}", flush=True)
+                comparisons.append({'family': family, 'size': size, 'engines': comparison['engines']})
+    write_results(records, args.output, parse_records or None, comparisons or None)
+    for (family, backend), stages in scaling_exponents(records).items():
+        print(f"{family}/{backend}: " + ', '.join(f"{name} {values}" for name, values in stages.items()))
+    for violation in check_scaling(records):
+        print(f"Рост выше ожидаемого: {violation}")
+    print(f"Результаты записаны в {args.output}")
+
+if __name__ == '__main__':
+    main()
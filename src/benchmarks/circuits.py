@@ -0,0 +1,133 @@
+from PySpice.Spice.Netlist import Circuit
+from PySpice.Unit import *
+from entities.transmission_line import TransmissionLine
+
+def ladder_circuit(sections: int) -> Circuit:
+    """
+    Строит RLC-лестницу из sections звеньев: источник, в каждом звене последовательные R и L
+    и конденсатор на землю, на конце — нагрузочный резистор.
+
+    Аргументы:
+        sections (int): Число звеньев.
+
+    Возвращает:
+        Circuit: Схема PySpice.
+    """
+    circuit = Circuit(f'ladder-{sections}')
+    circuit.V(1, 1, circuit.gnd, 100@u_V)
+    node = 1
+    for k in range(1, sections + 1):
+        circuit.R(k, node, node + 1, 1@u_Ohm)
+        circuit.L(k, node + 1, node + 2, 0.001@u_H)
+        circuit.C(k, node + 2, circuit.gnd, 0.001@u_F)
+        node += 2
+    circuit.R(sections + 1, node, circuit.gnd, 10@u_Ohm)
+    return circuit
+
+def mesh_circuit(rows: int, columns: int) -> Circuit:
+    """
+    Строит сетку rows × columns узлов: горизонтальные рёбра — резисторы, вертикальные — последовательные
+    R и L, у каждого узла ниже верхнего ряда — конденсатор на землю (иначе индуктивности образуют
+    сечение и их токи не независимы); источник подключён к левому верхнему узлу.
+
+    Аргументы:
+        rows (int): Число рядов узлов.
+        columns (int): Число столбцов узлов.
+
+    Возвращает:
+        Circuit: Схема PySpice.
+    """
+    circuit = Circuit(f'mesh-{rows}x{columns}')
+    grid = {(i, j): 1 + i * columns + j for i in range(rows) for j in range(columns)}
+    extra = rows * columns + 1
+    counts = {'R': 0, 'L': 0, 'C': 0}
+
+    def number(prefix):
+        counts[prefix] += 1
+        return counts[prefix]
+
+    circuit.V(1, extra, circuit.gnd, 100@u_V)
+    circuit.R(number('R'), extra, grid[0, 0], 1@u_Ohm)
+    for (i, j), node in grid.items():
+        if j + 1 < columns:
+            circuit.R(number('R'), node, grid[i, j + 1], 1@u_Ohm)
+        if i + 1 < rows:
+            extra += 1
+            circuit.R(number('R'), node, extra, 1@u_Ohm)
+            circuit.L(number('L'), extra, grid[i + 1, j], 0.001@u_H)
+        if i > 0:
+            circuit.C(number('C'), node, circuit.gnd, 0.001@u_F)
+    return circuit
+
+def star_circuit(arms: int) -> Circuit:
+    """
+    Строит звезду: источник через резистор питает центральный узел, от которого отходят arms лучей;
+    нечётные лучи — R и C на землю, чётные — R и L на землю.
+
+    Аргументы:
+        arms (int): Число лучей.
+
+    Возвращает:
+        Circuit: Схема PySpice.
+    """
+    circuit = Circuit(f'star-{arms}')
+    circuit.V(1, 1, circuit.gnd, 100@u_V)
+    circuit.R(1, 1, 2, 1@u_Ohm)
+    node = 2
+    for k in range(1, arms + 1):
+        node += 1
+        circuit.R(k + 1, 2, node, 10@u_Ohm)
+        if k % 2:
+            circuit.C(k, node, circuit.gnd, 0.001@u_F)
+        else:
+            circuit.L(k, node, circuit.gnd, 0.001@u_H)
+    return circuit
+
+CABLE = {'resistance': 0.5, 'inductance': 250e-9, 'conductance': 1e-6, 'capacitance': 100e-12, 'length': 1.0}
+LINE_DELAY = TransmissionLine('delay', **CABLE).delay
+
+def line_circuit(sections: int) -> Circuit:
+    """
+    Строит линию передачи из sections звеньев (TransmissionLine): 1 м кабеля 50 Ом с потерями
+    между источником с внутренним сопротивлением 50 Ом и нагрузкой 100 Ом.
+
+    Аргументы:
+        sections (int): Число звеньев линии.
+
+    Возвращает:
+        Circuit: Схема PySpice.
+    """
+    circuit = Circuit(f'line-{sections}')
+    circuit.subcircuit(TransmissionLine('cable', sections=sections, **CABLE))
+    circuit.V(1, 1, circuit.gnd, 1@u_V)
+    circuit.R(1, 1, 2, 50@u_Ohm)
+    circuit.X(1, 'cable', 2, 3)
+    circuit.R(2, 3, circuit.gnd, 100@u_Ohm)
+    return circuit
+
+FAMILIES = {
+    'ladder': lambda size: ladder_circuit(size),
+    'mesh': lambda size: mesh_circuit(size, size),
+    'star': lambda size: star_circuit(size),
+    'line': lambda size: line_circuit(size),
+}
+
+# Параметры замера по умолчанию: размеры, интервал расчёта и шаг бэкенда 'mna'. Волны в линии
+# проходят её за LINE_DELAY (5 нс), поэтому её интервал — несколько десятков пробегов, а размеры —
+# больше BANDED_LIMIT переменных состояния (два на звено), чтобы замерялась ленточная модель.
+DEFAULTS = {'sizes': [1, 2, 4, 8, 16], 'end_time': 0.01, 'time_step': 1e-5}
+FAMILY_DEFAULTS = {
+    'line': {'sizes': [64, 128, 256, 512], 'end_time': 40 * LINE_DELAY, 'time_step': LINE_DELAY / 50},
+}
+
+def family_defaults(family: str) -> dict:
+    """
+    Возвращает параметры замера семейства по умолчанию (sizes, end_time, time_step).
+
+    Аргументы:
+        family (str): Семейство схем из FAMILIES.
+
+    Возвращает:
+        dict: Параметры замера.
+    """
+    return {**DEFAULTS, **FAMILY_DEFAULTS.get(family, {})}
@@ -0,0 +1,319 @@
+import json
+import math
+import multiprocessing
+import os
+import platform
+import tempfile
+import tracemalloc
+import traceback
+from queue import Empty
+from time import perf_counter
+from benchmarks.circuits import FAMILIES, family_defaults
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SCALING_LIMITS = {('line', 'numeric'): {'solve': 1.5, 'steps': 0.25}}
+
+def _timed_simplify(counter: dict):
+    """
+    Возвращает обёртку над sympy.simplify, накапливающую число вызовов и время в counter.
+    """
+    import sympy
+
+    def simplify(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return sympy.simplify(*args, **kwargs)
+        finally:
+            counter['calls'] += 1
+            counter['time'] += perf_counter() - start
+    return simplify
+
+def run_case(family: str, size: int, backend: str, end_time: float = None, time_step: float = None,
+             trace_memory: bool = False) -> dict:
+    """
+    Строит схему семейства family размера size и проходит все этапы анализа, замеряя каждый.
+
+    Этапы берутся из профиля CircuitSimulation (parse, graph, branches, equations, compiled_model,
+    numeric_assembly, elimination, mna_equations, operating_point, solve). Вызовы sympy.simplify внутри генератора уравнений
+    замеряются отдельно. Затем значение первого резистора меняется (set_value) и расчёт повторяется:
+    его время (update_time) показывает цену изменения только значений. Ошибка на любом этапе
+    записывается в результат, а не прерывает серию.
+
+    Аргументы:
+        family (str): Семейство схем из FAMILIES.
+        size (int): Размер схемы.
+        backend (str): Бэкенд CircuitSimulation.
+        end_time (float, optional): Время окончания расчёта переходного процесса (по умолчанию — family_defaults).
+        time_step (float, optional): Шаг по времени для бэкенда 'mna' (по умолчанию — family_defaults).
+        trace_memory (bool): Замерять пиковую память каждого этапа (tracemalloc, замедляет расчёт).
+
+    Возвращает:
+        dict: Запись результата: размеры схемы, профиль этапов, simplify, число шагов по времени, время
+        повторного расчёта после изменения значения, статус, пиковая память процесса.
+    """
+    from entities.circuit_simulation import CircuitSimulation
+    from entities.netlist import Netlist
+    import utilits.equation_generator as equation_generator
+    defaults = family_defaults(family)
+    end_time = defaults['end_time'] if end_time is None else end_time
+    time_step = defaults['time_step'] if time_step is None else time_step
+    record = {'family': family, 'size': size, 'backend': backend, 'status': 'ok', 'error': None}
+    counter = {'calls': 0, 'time': 0.0}
+    original = equation_generator.simplify
+    equation_generator.simplify = _timed_simplify(counter)
+    start = perf_counter()
+    sim = None
+    stages = None
+    record['update_time'] = None
+    try:
+        build_start = perf_counter()
+        circuit = FAMILIES[family](size)
+        record['build_time'] = perf_counter() - build_start
+        sim = CircuitSimulation(circuit, backend=backend, profile_memory=trace_memory)
+        record['elements'] = len(sim.nodes_list)
+        record['states'] = len(sim.state_variables)
+        if backend == 'mna':
+            record['unknowns'] = len(sim.mna_system.unknowns)
+        elif backend == 'numeric':
+            record['unknowns'] = len(sim.numeric_assembly.unknowns)
+        sim.set_initial_conditions()
+
+        def analyze():
+            if backend == 'mna':
+                return sim.analyze(end_time=end_time, time_step=time_step, method='trapezoidal')
+            return sim.analyze(end_time=end_time)
+
+        record['steps'] = len(analyze().time)
+        record['total_time'] = perf_counter() - start
+        stages = sim.profile_report()
+        update_start = perf_counter()
+        key = next(key for key in sim.nodes_list.keys_of_type(Netlist.RESISTOR) if sim.nodes_list[key][2])
+        sim.set_value(key, 1.1 * sim.nodes_list[key][2])
+        analyze()
+        record['update_time'] = perf_counter() - update_start
+    except Exception as error:
+        record['status'] = 'error'
+        record['error'] = f"{type(error).__name__}: {error}"
+        record['traceback'] = traceback.format_exc(limit=5)
+    finally:
+        equation_generator.simplify = original
+    record.setdefault('total_time', perf_counter() - start)
+    record['stages'] = stages if stages is not None else sim.profile_report() if sim is not None else {}
+    record['simplify'] = counter
+    if resource is not None:
+        scale = 1 if platform.system() == 'Darwin' else 1024
+        record['peak_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    else:
+        record['peak_rss'] = None
+    return record
+
+def parse_throughput(family: str, size: int, trace_memory: bool = False) -> dict:
+    """
+    Замеряет скорость чтения списка соединений SPICE: схема семейства family записывается в файл .cir
+    и читается read_netlist; для сравнения замеряются построение объекта PySpice и Netlist.from_circuit по нему.
+
+    Аргументы:
+        family (str): Семейство схем из FAMILIES.
+        size (int): Размер схемы.
+        trace_memory (bool): Дополнительно замерить пиковую память чтения (tracemalloc, отдельный проход).
+
+    Возвращает:
+        dict: Число строк, байт и элементов, время чтения, строк в секунду, время построения схемы PySpice
+        и from_circuit.
+    """
+    from entities.netlist import Netlist
+    from utilits.spice_parser import read_netlist
+    start = perf_counter()
+    circuit = FAMILIES[family](size)
+    build_time = perf_counter() - start
+    text = str(circuit)
+    with tempfile.NamedTemporaryFile('w', suffix='.cir', delete=False) as file:
+        file.write(text)
+    try:
+        start = perf_counter()
+        netlist = read_netlist(file.name)
+        parse_time = perf_counter() - start
+        start = perf_counter()
+        Netlist.from_circuit(circuit)
+        record = {'family': family, 'size': size, 'lines': text.count('\n'), 'bytes': len(text.encode()),
+                  'elements': len(netlist), 'parse_time': parse_time, 'build_time': build_time, 'from_circuit_time': perf_counter() - start,
+                  'lines_per_second': text.count('\n') / parse_time if parse_time > 0 else None, 'parse_memory': None}
+        if trace_memory:
+            tracemalloc.start()
+            read_netlist(file.name)
+            record['parse_memory'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    finally:
+        os.remove(file.name)
+    return record
+
+def _worker(queue, kwargs: dict) -> None:
+    """
+    Выполняет run_case в отдельном процессе и передаёт результат через очередь.
+    """
+    queue.put(run_case(**kwargs))
+
+def run_isolated(timeout: float = None, **kwargs) -> dict:
+    """
+    Выполняет run_case в отдельном процессе: пиковая память процесса относится только к этому случаю,
+    а зависший расчёт прерывается по тайм-ауту.
+
+    Аргументы:
+        timeout (float, optional): Ограничение времени в секундах.
+        kwargs: Аргументы run_case.
+
+    Возвращает:
+        dict: Запись результата (status 'timeout', если время вышло).
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_worker, args=(queue, kwargs))
+    process.start()
+    start = perf_counter()
+    try:
+        while True:
+            try:
+                return queue.get(timeout=0.5)
+            except Empty:
+                if not process.is_alive():
+                    status, error = 'crashed', f"Exit code {process.exitcode}"
+                    break
+                if timeout is not None and perf_counter() - start > timeout:
+                    status, error = 'timeout', f"No result within {timeout} s"
+                    break
+        return {'family': kwargs['family'], 'size': kwargs['size'], 'backend': kwargs['backend'],
+                'status': status, 'error': error, 'total_time': perf_counter() - start,
+                'stages': {}, 'simplify': None, 'peak_rss': None}
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+def run_benchmarks(families: list, sizes: list, backends: list, timeout: float = 300.0, **kwargs) -> list:
+    """
+    Прогоняет все сочетания семейств, размеров и бэкендов, каждый случай — в отдельном процессе.
+
+    Размеры перебираются по возрастанию; после тайм-аута или ошибки памяти большие размеры того же
+    семейства и бэкенда пропускаются (status 'skipped').
+
+    Аргументы:
+        families (list): Семейства схем.
+        sizes (list | None): Размеры схем (None — размеры семейства из family_defaults).
+        backends (list): Бэкенды CircuitSimulation.
+        timeout (float): Ограничение времени на один случай в секундах.
+        kwargs: Прочие аргументы run_case.
+
+    Возвращает:
+        list: Записи результатов.
+    """
+    records = []
+    for family in families:
+        for backend in backends:
+            blocked = False
+            for size in sorted(sizes or family_defaults(family)['sizes']):
+                if blocked:
+                    records.append({'family': family, 'size': size, 'backend': backend, 'status': 'skipped',
+                                    'error': 'A smaller size timed out or crashed', 'stages': {}})
+                    continue
+                record = run_isolated(timeout=timeout, family=family, size=size, backend=backend, **kwargs)
+                blocked = record['status'] in ('timeout', 'crashed')
+                records.append(record)
+                print(format_record(record), flush=True)
+    return records
+
+def scaling_exponents(records: list) -> dict:
+    """
+    Оценивает показатель степени роста времени каждого этапа по размеру: наклон в логарифмических
+    координатах между соседними успешными размерами. Резкий рост показателя указывает на
+    комбинаторный взрыв. Так же оценивается рост числа шагов по времени ('steps').
+
+    Аргументы:
+        records (list): Записи результатов run_benchmarks.
+
+    Возвращает:
+        dict: {(семейство, бэкенд): {этап: [показатели между соседними размерами]}}.
+    """
+    series = {}
+    for record in records:
+        if record['status'] != 'ok':
+            continue
+        times = {name: stage['time'] for name, stage in record['stages'].items()}
+        times['total'] = record['total_time']
+        if record.get('steps'):
+            times['steps'] = record['steps']
+        series.setdefault((record['family'], record['backend']), []).append((record['size'], times))
+    exponents = {}
+    for key, points in series.items():
+        points.sort(key=lambda point: point[0])
+        result = {}
+        for (size_a, times_a), (size_b, times_b) in zip(points, points[1:]):
+            for name in times_a.keys() & times_b.keys():
+                if times_a[name] > 0 and times_b[name] > 0 and size_b > size_a:
+                    slope = math.log(times_b[name] / times_a[name]) / math.log(size_b / size_a)
+                    result.setdefault(name, []).append(round(slope, 2))
+        exponents[key] = result
+    return exponents
+
+def check_scaling(records: list, limits: dict = None) -> list:
+    """
+    Проверяет, что показатели роста не превышают ожидаемых: например, у многозвенной линии в бэкенде
+    'numeric' (ленточная модель) время решения должно расти линейно, а число шагов — не расти с числом звеньев.
+
+    Аргументы:
+        records (list): Записи результатов run_benchmarks.
+        limits (dict, optional): {(семейство, бэкенд): {этап: наибольший показатель}}; по умолчанию SCALING_LIMITS.
+
+    Возвращает:
+        list: Строки с описанием превышений (пустой список, если рост в пределах).
+    """
+    limits = SCALING_LIMITS if limits is None else limits
+    violations = []
+    for key, stages in scaling_exponents(records).items():
+        for name, limit in limits.get(key, {}).items():
+            worst = max(stages.get(name, []), default=None)
+            if worst is not None and worst > limit:
+                violations.append(f"{key[0]}/{key[1]} {name}: показатель {worst} > {limit}")
+    return violations
+
+def format_record(record: dict) -> str:
+    """
+    Форматирует запись результата в одну строку для вывода на экран.
+    """
+    head = f"{record['family']:>6} {record['size']:>5} {record['backend']:>9}: {record['status']}"
+    if record['status'] != 'ok':
+        return f"{head} ({record['error']})"
+    stages = ', '.join(f"{name} {stage['time'] * 1000:.1f} мс" for name, stage in record['stages'].items())
+    if record['simplify'] and record['simplify']['calls']:
+        stages += f"; simplify {record['simplify']['calls']} вызовов, {record['simplify']['time'] * 1000:.1f} мс"
+    memory = f", пик {record['peak_rss'] / 2**20:.0f} МиБ" if record.get('peak_rss') else ''
+    steps = f", {record['steps']} шагов" if record.get('steps') else ''
+    update = f", после set_value {record['update_time']:.3f} с" if record.get('update_time') is not None else ''
+    return f"{head}, всего {record['total_time']:.3f} с{steps}{update}{memory} [{stages}]"
+
+def write_results(records: list, path: str, parse_records: list = None, comparisons: list = None) -> None:
+    """
+    Записывает результаты и показатели роста в JSON-файл.
+
+    Аргументы:
+        records (list): Записи результатов.
+        path (str): Путь к файлу.
+        parse_records (list, optional): Записи parse_throughput.
+        comparisons (list, optional): Сравнения с ngspice (compare_with_ngspice) по семействам и размерам.
+    """
+    exponents = {f"{family}/{backend}": value for (family, backend), value in scaling_exponents(records).items()}
+    payload = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'records': records,
+        'scaling_exponents': exponents,
+        'scaling_violations': check_scaling(records),
+    }
+    if parse_records is not None:
+        payload['parse'] = parse_records
+    if comparisons is not None:
+        payload['ngspice'] = comparisons
+    with open(path, 'w') as file:
+        json.dump(payload, file, indent=2, ensure_ascii=False)
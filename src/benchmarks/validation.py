@@ -0,0 +1,167 @@
+import numpy as np
+import traceback
+from time import perf_counter
+from entities.netlist import Netlist
+
+def ngspice_states(analysis, netlist: Netlist, state_variables: list) -> dict:
+    """
+    Извлекает переменные состояния из результата .tran ngspice в направлениях элементов.
+
+    Напряжение конденсатора — разность потенциалов его узлов V(n+) - V(n-), ток индуктивности —
+    ток ветви ngspice (от n+ к n-).
+
+    Аргументы:
+        analysis: Результат simulator.transient PySpice.
+        netlist (Netlist): Таблица элементов схемы.
+        state_variables (list): Переменные состояния (I_L1, U_C1, ...).
+
+    Возвращает:
+        dict: {переменная состояния: массив по моментам analysis.time}.
+    """
+    time = np.asarray(analysis.time, dtype=float)
+    nodes = {str(name).lower(): np.asarray(values, dtype=float) for name, values in analysis.nodes.items()}
+    branches = {str(name).lower(): np.asarray(values, dtype=float) for name, values in analysis.branches.items()}
+
+    def potential(node):
+        return np.zeros_like(time) if node in ('0', 'gnd') else nodes[node.lower()]
+
+    states = {}
+    for name in state_variables:
+        key = name[2:]
+        if netlist.is_type(key, Netlist.INDUCTOR):
+            values = branches[key.lower()]
+        else:
+            a, b = netlist[key][:2]
+            values = potential(a) - potential(b)
+        states[name] = values
+    return states
+
+def run_ngspice(circuit, initial_state: dict, end_time: float, step_time: float, max_step: float = None,
+                options: dict = None):
+    """
+    Выполняет .tran в ngspice с начальными условиями элементов (UIC).
+
+    Начальные условия записываются в параметры ic индуктивностей и конденсаторов схемы на время
+    расчёта и затем восстанавливаются.
+
+    Аргументы:
+        circuit: Схема PySpice.
+        initial_state (dict): Начальные условия по именам элементов в направлении от n+ к n-.
+        end_time (float): Время окончания расчёта.
+        step_time (float): Шаг вывода .tran.
+        max_step (float, optional): Максимальный шаг ngspice.
+        options (dict, optional): Параметры .options ngspice (reltol, abstol, ...).
+
+    Возвращает:
+        tuple: (результат PySpice, время в секундах, включая запуск ngspice).
+    """
+    previous = {}
+    try:
+        for key, value in initial_state.items():
+            element = circuit[key]
+            previous[key] = element.initial_condition
+            element.initial_condition = value
+        start = perf_counter()
+        simulator = circuit.simulator(temperature=25, nominal_temperature=25)
+        if options:
+            simulator.options(**options)
+        analysis = simulator.transient(step_time=step_time, end_time=end_time, max_time=max_step,
+                                       use_initial_condition=True)
+        return analysis, perf_counter() - start
+    finally:
+        for key, value in previous.items():
+            circuit[key].initial_condition = value
+
+def compare_with_ngspice(circuit, end_time: float, backends: tuple = ('kirchhoff',), initial_conditions: dict = None,
+                         points: int = 1000, step_time: float = None, max_step: float = None,
+                         ngspice_options: dict = None) -> dict:
+    """
+    Рассчитывает переходный процесс одной схемы ngspice и собственными бэкендами и сравнивает результаты.
+
+    Начальные условия определяет первый успешный бэкенд (set_initial_conditions: заданные значения,
+    остальные — из рабочей точки); ngspice получает те же значения через ic= элементов и UIC.
+    Переменные состояния всех движков сравниваются в направлениях элементов (U = V(n+) - V(n-),
+    ток от n+ к n-, см. state_orientation) на общей равномерной сетке из points моментов: ngspice —
+    линейной интерполяцией по его точкам, собственные бэкенды — плотным выходом TransientResult.
+    Ошибка одного движка записывается в результат и не прерывает сравнение остальных.
+
+    Аргументы:
+        circuit: Схема PySpice.
+        end_time (float): Время окончания расчёта.
+        backends (tuple): Бэкенды CircuitSimulation.
+        initial_conditions (dict, optional): Начальные условия по именам элементов (как в set_initial_conditions).
+        points (int): Число точек общей сетки.
+        step_time (float, optional): Шаг вывода ngspice (по умолчанию end_time / points).
+        max_step (float, optional): Максимальный шаг ngspice и solve_ivp.
+        ngspice_options (dict, optional): Параметры .options ngspice.
+
+    Возвращает:
+        dict: {'grid': сетка, 'states': переменные состояния, 'initial_state': начальные условия по элементам,
+        'engines': {имя: {'status', 'time', 'errors': {переменная: {'max', 'rms', 'relative'}}, ...}}}.
+    """
+    from entities.circuit_simulation import CircuitSimulation
+    grid = np.linspace(0.0, end_time, points)
+    engines = {}
+    results = {}
+    reference = None
+    for backend in backends:
+        record = {'status': 'ok', 'error': None}
+        start = perf_counter()
+        try:
+            sim = CircuitSimulation(circuit, backend=backend)
+            sim.set_initial_conditions(initial_conditions)
+            result = sim.analyze(end_time=end_time, max_step=max_step)
+            record['time'] = perf_counter() - start
+            record['stages'] = sim.profile_report()
+            values = result(grid)
+            results[backend] = {name: values[k] for k, name in enumerate(result.names)}
+            if reference is None:
+                reference = sim
+        except Exception as error:
+            record.update(status='error', error=f"{type(error).__name__}: {error}",
+                          traceback=traceback.format_exc(limit=5), time=perf_counter() - start)
+        engines[backend] = record
+    if reference is None:
+        return {'grid': grid, 'states': [], 'initial_state': {}, 'engines': engines}
+    initial_state = {name[2:]: value for name, value in reference.initial_conditions.items()}
+    record = {'status': 'ok', 'error': None}
+    try:
+        analysis, elapsed = run_ngspice(circuit, initial_state, end_time, step_time or end_time / points,
+                                        max_step, ngspice_options)
+        record['time'] = elapsed
+        time = np.asarray(analysis.time, dtype=float)
+        states = ngspice_states(analysis, reference.nodes_list, reference.state_variables)
+        expected = {name: np.interp(grid, time, values) for name, values in states.items()}
+    except Exception as error:
+        record.update(status='error', error=f"{type(error).__name__}: {error}", traceback=traceback.format_exc(limit=5))
+        expected = None
+    engines['ngspice'] = record
+    if expected is not None:
+        for backend, values in results.items():
+            errors = {}
+            for name, target in expected.items():
+                difference = values[name] - target
+                scale = np.max(np.abs(target))
+                errors[name] = {'max': float(np.max(np.abs(difference))), 'rms': float(np.sqrt(np.mean(difference ** 2))),
+                                'relative': float(np.max(np.abs(difference)) / scale) if scale > 0 else None}
+            engines[backend]['errors'] = errors
+            engines[backend]['speedup'] = record['time'] / engines[backend]['time']
+    return {'grid': grid, 'states': list(reference.state_variables), 'initial_state': initial_state, 'engines': engines}
+
+def format_comparison(comparison: dict) -> str:
+    """
+    Форматирует результат compare_with_ngspice: время каждого движка и ошибки по переменным состояния.
+    """
+    lines = []
+    for engine, record in comparison['engines'].items():
+        if record['status'] != 'ok':
+            lines.append(f"{engine:>9}: {record['status']} ({record['error']})")
+            continue
+        head = f"{engine:>9}: {record['time'] * 1000:.1f} мс"
+        if 'speedup' in record:
+            head += f", быстрее ngspice в {record['speedup']:.1f} раз"
+        lines.append(head)
+        for name, error in record.get('errors', {}).items():
+            relative = '' if error['relative'] is None else f", отн. {error['relative']:.2e}"
+            lines.append(f"{'':>11}{name}: макс. {error['max']:.3e}, СКО {error['rms']:.3e}{relative}")
+    return '\n'.join(lines)
@@ -0,0 +1,220 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from entities.state_space import StateSpaceModel
+from entities.transient_result import TransientResult
+from utilits.plotting import solve_piecewise
+from utilits.stiffness import select_solver_settings
+
+def _solve_block(task: dict) -> tuple:
+    """
+    Интегрирует один блок x_b' = A_bb x_b + A_bu x_u(t) + B_b u(t) с собственным выбором метода и шага.
+
+    Состояния вышестоящих блоков x_u(t) берутся из их плотного выхода. Жёсткость оценивается по
+    собственным числам блока вместе с самыми медленными модами всех вышестоящих блоков: быстрый блок,
+    который следует за медленным входом, жёсткий, хотя его собственные моды близки. Функция верхнего
+    уровня, чтобы её можно было выполнить в другом процессе.
+
+    Аргументы:
+        task (dict): Матрицы блока ('A', 'coupling', 'B'), значения и зависимости входов ('inputs',
+            'waveforms'), плотные выходы вышестоящих блоков ('upstream'), собственные числа блока и
+            самые медленные моды вышестоящих блоков ('eigenvalues'), начальное состояние ('state'),
+            интервал ('time_span'), точки излома ('breakpoints') и параметры решателя.
+
+    Возвращает:
+        tuple: (моменты времени, значения, плотный выход OdeSolution, метод, число вызовов правой части).
+    """
+    A, coupling, upstream = task['A'], task['coupling'], task['upstream']
+    columns = list(task['waveforms'])
+    constant = task['B'] @ np.where(np.isin(np.arange(len(task['inputs'])), columns), 0.0, task['inputs'])
+    varying = np.ascontiguousarray(task['B'][:, columns])
+    waveforms = list(task['waveforms'].values())
+
+    def rhs(time, state):
+        derivative = A @ state + constant
+        if waveforms:
+            derivative += varying @ np.array([waveform(time) for waveform in waveforms])
+        if upstream:
+            derivative += coupling @ np.concatenate([solution(time) for solution in upstream])
+        return derivative
+
+    settings = select_solver_settings(task['eigenvalues'], end_time=task['time_span'][1], method=task['method'],
+                                      max_step=task['max_step'], source_period=task['source_period'])
+    options = {'method': settings['method'], 'max_step': settings['max_step']}
+    if settings['method'] in ('Radau', 'BDF', 'LSODA'):
+        options['jac'] = lambda time, state: A
+    solution = solve_piecewise(rhs, task['time_span'], task['state'], task['breakpoints'], dense_output=True, **options)
+    if not solution.success:
+        raise RuntimeError(solution.message)
+    return solution.t, solution.y, solution.sol, settings['method'], solution.nfev
+
+class BlockInterpolant:
+    """
+    Плотный выход всей системы, собранный из плотных выходов блоков.
+    """
+    def __init__(self, blocks: list, solutions: list, size: int) -> None:
+        self.blocks = blocks
+        self.solutions = solutions
+        self.size = size
+
+    def __call__(self, time) -> np.ndarray:
+        time = np.asarray(time, dtype=float)
+        values = np.empty((self.size,) + time.shape)
+        for block, solution in zip(self.blocks, self.solutions):
+            values[block] = solution(time)
+        return values
+
+class BlockTriangularSystem:
+    """
+    Разбиение линейной системы x' = A x + B u на слабо связанные блоки.
+
+    Граф зависимостей переменных состояния (ребро j -> i, если A[i, j] ≠ 0) раскладывается на
+    сильно связные компоненты (scipy.sparse.csgraph); в порядке топологической сортировки их
+    конденсации матрица A блочно-треугольная. Каждый блок интегрируется отдельно, со своим методом
+    и шагом по собственным числам своего диагонального блока: жёсткий блок больше не задаёт шаг
+    всей системе. Состояния вышестоящих блоков подаются в нижестоящие как входы через плотный выход
+    решателя. Блоки, которые не зависят друг от друга, считаются параллельно в пуле процессов.
+
+    Атрибуты:
+        model (StateSpaceModel): Исходная модель.
+        input_functions (dict): Зависимости входов от времени по именам входов.
+        blocks (list): Индексы переменных состояния каждого блока в топологическом порядке.
+        dependencies (list): Номера вышестоящих блоков для каждого блока.
+        ancestors (list): Номера всех блоков, от которых блок зависит прямо или через другие блоки.
+        levels (list): Номера блоков по уровням: блоки уровня зависят только от блоков предыдущих уровней.
+        components (int): Число независимых (слабо связных) подсистем.
+        eigenvalues (list): Собственные числа диагонального блока A каждого блока.
+        methods (list): Методы solve_ivp, выбранные для блоков при последнем расчёте.
+        rhs_calls (list): Число вызовов правой части каждого блока при последнем расчёте.
+    """
+    def __init__(self, model: StateSpaceModel, input_functions: dict = None) -> None:
+        """
+        Находит блочно-треугольную структуру матрицы A.
+
+        Аргументы:
+            model (StateSpaceModel): Линейная модель схемы.
+            input_functions (dict, optional): Зависимости входов от времени (например, {'U_V1': Waveform}).
+        """
+        self.model = model
+        self.input_functions = dict(input_functions or {})
+        A = np.asarray(model.A)
+        n = A.shape[0]
+        rows, cols = np.nonzero(A)
+        graph = csr_matrix((np.ones(rows.size), (cols, rows)), shape=(n, n))
+        self.components = int(connected_components(graph, directed=True, connection='weak')[0]) if n else 0
+        count, labels = connected_components(graph, directed=True, connection='strong')
+        upstream = [set() for _ in range(count)]
+        for i, j in zip(labels[rows].tolist(), labels[cols].tolist()):
+            if i != j:
+                upstream[i].add(j)
+        downstream = [[] for _ in range(count)]
+        for block, others in enumerate(upstream):
+            for other in others:
+                downstream[other].append(block)
+        remaining = [len(others) for others in upstream]
+        depth = [0] * count
+        queue = [block for block in range(count) if not remaining[block]]
+        for block in queue:
+            for other in downstream[block]:
+                depth[other] = max(depth[other], depth[block] + 1)
+                remaining[other] -= 1
+                if not remaining[other]:
+                    queue.append(other)
+        order = sorted(range(count), key=lambda block: (depth[block], block))
+        position = {block: k for k, block in enumerate(order)}
+        self.blocks = [np.flatnonzero(labels == block) for block in order]
+        self.dependencies = [sorted(position[other] for other in upstream[block]) for block in order]
+        self.levels = [[] for _ in range(max(depth, default=-1) + 1)]
+        self.methods = []
+        self.rhs_calls = []
+        for k, block in enumerate(order):
+            self.levels[depth[block]].append(k)
+        self.eigenvalues = [np.linalg.eigvals(A[np.ix_(block, block)]) for block in self.blocks]
+        self.ancestors = []
+        for dependencies in self.dependencies:
+            self.ancestors.append(sorted(set(dependencies).union(*(self.ancestors[other] for other in dependencies))))
+
+    def _task(self, k: int, solutions: list, initial_state: np.ndarray, time_span: tuple, breakpoints,
+              method: str, max_step: float, source_period: float) -> dict:
+        """
+        Собирает задачу _solve_block для блока k.
+        """
+        block = self.blocks[k]
+        upstream = np.concatenate([self.blocks[other] for other in self.dependencies[k]]) \
+            if self.dependencies[k] else np.empty(0, dtype=int)
+        names = list(self.model.input_names)
+        return {
+            'A': np.ascontiguousarray(self.model.A[np.ix_(block, block)]),
+            'coupling': np.ascontiguousarray(self.model.A[np.ix_(block, upstream)]),
+            'B': np.asarray(self.model.B)[block],
+            'inputs': np.asarray(self.model.input_values, dtype=float),
+            'waveforms': {names.index(name): function for name, function in self.input_functions.items()},
+            'upstream': [solutions[other] for other in self.dependencies[k]],
+            'eigenvalues': np.concatenate([self.eigenvalues[k]] + [
+                self.eigenvalues[other][np.argsort(np.abs(self.eigenvalues[other].real))[:1]]
+                for other in self.ancestors[k]]),
+            'state': initial_state[block],
+            'time_span': time_span,
+            'breakpoints': breakpoints,
+            'method': method,
+            'max_step': max_step,
+            'source_period': source_period,
+        }
+
+    def solve(self, time_span: tuple, initial_state, breakpoints=(), method: str = None, max_step: float = None,
+              source_period: float = None, max_workers: int = None) -> TransientResult:
+        """
+        Интегрирует блоки в топологическом порядке, каждый со своим методом и шагом.
+
+        Блок запускается, как только готовы все его вышестоящие блоки; при max_workers > 1 блоки
+        выполняются в пуле процессов, иначе — последовательно в текущем процессе. Пул окупается,
+        когда блоки крупные: запуск процесса и передача плотных выходов стоят десятки миллисекунд.
+
+        Аргументы:
+            time_span (tuple): Интервал (начало, конец).
+            initial_state (array-like): Начальное состояние в порядке model.state_names.
+            breakpoints (array-like): Точки излома источников.
+            method (str, optional): Метод solve_ivp для всех блоков (по умолчанию — по жёсткости блока).
+            max_step (float, optional): Максимальный шаг для всех блоков.
+            source_period (float, optional): Наименьший период источников.
+            max_workers (int, optional): Число процессов (по умолчанию — число ядер; 1 — без пула).
+
+        Возвращает:
+            TransientResult: Значения на объединении сеток блоков и общий плотный выход.
+        """
+        initial_state = np.asarray(initial_state, dtype=float)
+        time_span = (float(time_span[0]), float(time_span[1]))
+        breakpoints = np.asarray(breakpoints, dtype=float)
+        arguments = (initial_state, time_span, breakpoints, method, max_step, source_period)
+        results = [None] * len(self.blocks)
+        solutions = [None] * len(self.blocks)
+        if max_workers == 1 or len(self.blocks) < 2:
+            for level in self.levels:
+                for k in level:
+                    results[k] = _solve_block(self._task(k, solutions, *arguments))
+                    solutions[k] = results[k][2]
+        else:
+            remaining = [len(dependencies) for dependencies in self.dependencies]
+            downstream = [[] for _ in self.blocks]
+            for k, dependencies in enumerate(self.dependencies):
+                for other in dependencies:
+                    downstream[other].append(k)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                running = {executor.submit(_solve_block, self._task(k, solutions, *arguments)): k
+                           for k in self.levels[0]}
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        k = running.pop(future)
+                        results[k] = future.result()
+                        solutions[k] = results[k][2]
+                        for other in downstream[k]:
+                            remaining[other] -= 1
+                            if remaining[other] == 0:
+                                running[executor.submit(_solve_block, self._task(other, solutions, *arguments))] = other
+        self.methods = [result[3] for result in results]
+        self.rhs_calls = [result[4] for result in results]
+        interpolant = BlockInterpolant(self.blocks, solutions, len(initial_state))
+        time = np.unique(np.concatenate([result[0] for result in results]))
+        return TransientResult(time, interpolant(time), list(self.model.state_names), interpolant=interpolant)
@@ -3,10 +3,29 @@ logger = Logging.setup_logging()
 from entities.transmission_line import TransmissionLine as LineCircuit
 from PySpice.Spice.Netlist import Circuit
 from PySpice.Unit import *
-from utilits.circuit_tools import get_inductors_and_capacitors, get_element_nodes_dict, get_node_connections, calculate_branches, substitute_element_values, calculate_voltages
+from utilits.circuit_tools import calculate_branches, calculate_voltages
 from sympy import *
 from utilits.equation_generator import generate_circuit_equations
-from utilits.plotting import plot_ode_system_solution
+from utilits.plotting import model_solver_options, solve_ode_system, solve_piecewise
+from utilits.stiffness import select_solver_settings
+from scipy.linalg import eigvals
+from entities.compiled_model import BandedLinearModel, CompiledModel, LinearModel
+from entities.netlist import Netlist
+from utilits.spice_parser import read_netlist
+from entities.state_space import StateSpaceModel, solve_linear_system
+from entities.ensemble import EnsembleResult
+from entities.transient_result import TransientResult
+from entities.transient_store import TransientStore
+from entities.mna_system import MNASystem
+from entities.numeric_assembly import NumericAssembly
+from entities.block_system import BlockInterpolant, BlockTriangularSystem
+from entities.model_reduction import ReducedModel, OutputTrajectory, model_outputs, reduce_model
+from entities.model_cache import ModelCache
+from entities.discrete_model import DiscreteModel
+import numpy as np
+import os
+import tracemalloc
+from time import perf_counter
 
 class CircuitSimulation:
     """
@@ -23,41 +42,350 @@ class CircuitSimulation:
     - Численное решение системы ОДУ и построение графиков переходных процессов
     - Удобный вывод информации о структуре схемы, токах и напряжениях
 
+    Анализ разбит на ленивые этапы: parse → graph → branches → equations → compiled_model → solve.
+    Каждый этап выполняется при первом обращении к его результату и запоминается, поэтому
+    скрипт, которому нужна только часть конвейера, не платит за остальные этапы.
+
     Атрибуты:
         circuit: объект схемы PySpice
         lc_list: список имён индуктивностей и конденсаторов
         nodes_list: словарь с узлами и параметрами элементов
         connection_list: граф соединений между узлами
         simulator: объект симулятора PySpice
-        analysis: результат операционного анализа схемы
+        analysis: рабочая точка схемы по постоянному току (без ngspice)
         need_to_find: переменные, которые нужно найти (для генерации уравнений)
         state_variables: переменные состояния (токи через L, напряжения на C)
         currents: словарь токов в ветвях
         voltages: словарь напряжений на элементах
+        compiled_model: скомпилированная правая часть системы ОДУ
+        backend: способ построения уравнений ('kirchhoff', 'numeric' или 'mna')
+        mna_system: разреженная система MNA
+        numeric_assembly: матрицы законов Кирхгофа для численной сборки (NumericAssembly)
+        cache: дисковый кэш выведенных уравнений (ModelCache) или None
+        reduced_model: модель пониженного порядка (ReducedModel), построенная reduce(), или None
+        discrete_model: дискретная модель (DiscreteModel), построенная discretize(), или None
     """
-    def __init__(self, circuit):
+    BACKENDS = ('kirchhoff', 'numeric', 'mna')
+    VALUE_STAGES = ('numeric_assembly', 'elimination', 'mna_equations', 'operating_point',
+                    'ngspice_operating_point', 'simulator', 'block_structure')
+    MNA_DENSE_LIMIT = 2000
+    BANDED_LIMIT = 100
+    STREAM_WINDOW = 4096
+
+    def __init__(self, circuit, backend: str = 'kirchhoff', cache: ModelCache = None, profile_memory: bool = False):
         """
         Инициализация анализа схемы.
+
+        Этапы анализа (разбор схемы, граф, ветви, уравнения, компиляция модели, решение) не
+        выполняются в конструкторе: каждый этап вычисляется при первом обращении к его результату
+        и запоминается. Время (и, при profile_memory=True, память) каждого этапа доступно
+        через profile_report().
+
         Аргументы:
-            circuit: объект схемы PySpice (Circuit)
+            circuit: объект схемы PySpice (Circuit), путь к файлу SPICE (.cir, читается read_netlist
+                без объектов PySpice) или готовый Netlist (например, одно состояние ключей схемы,
+                см. SwitchedSimulation)
+            backend (str): 'kirchhoff' — символьные уравнения по законам Кирхгофа,
+                'numeric' — матрицы законов Кирхгофа без символьных преобразований
+                (символьные уравнения остаются доступны через generate_equations),
+                'mna' — разреженный модифицированный узловой анализ (для больших схем).
+            cache (ModelCache, optional): Дисковый кэш выведенных уравнений по хэшу топологии.
+            profile_memory (bool): Измерять пиковую память этапов через tracemalloc.
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
         self.circuit = circuit
-        self.lc_list = get_inductors_and_capacitors(circuit)
-        self.nodes_list = get_element_nodes_dict(circuit)
-        self.connection_list = get_node_connections(circuit)
-        self.simulator = circuit.simulator(temperature=25, nominal_temperature=25)
-        self.analysis = self.simulator.operating_point()
-        self.need_to_find = [[], []]
-        self.state_variables = []
-        for element in self.lc_list:
-            if "L" in element:
-                self.need_to_find[0].append(f"U_{str(element)}")
-                self.state_variables.append(f"I_{str(element)}")
+        self.backend = backend
+        self.cache = cache
+        self.profile_memory = profile_memory
+        self.initial_conditions = None
+        self.reduced_model = None
+        self.discrete_model = None
+        self._stage_results = {}
+        self._stage_profile = {}
+        self._time_stack = []
+        self._memory_stack = []
+
+    def _measure(self, name: str, compute):
+        """
+        Выполняет этап анализа, записывая его время и память в профиль.
+
+        Время вложенных этапов, запущенных изнутри данного, из его времени вычитается;
+        пиковая память учитывает и вложенные этапы.
+
+        Аргументы:
+            name (str): Имя этапа.
+            compute: Функция без аргументов, вычисляющая результат этапа.
+
+        Возвращает:
+            Результат этапа.
+        """
+        if self.profile_memory:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            if self._memory_stack:
+                self._memory_stack[-1] = max(self._memory_stack[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            self._memory_stack.append(0)
+        self._time_stack.append(0.0)
+        start = perf_counter()
+        try:
+            result = compute()
+        finally:
+            elapsed = perf_counter() - start
+            nested = self._time_stack.pop()
+            if self._time_stack:
+                self._time_stack[-1] += elapsed
+            memory = None
+            if self.profile_memory:
+                peak = max(self._memory_stack.pop(), tracemalloc.get_traced_memory()[1])
+                memory = peak - baseline
+                if started_tracing:
+                    tracemalloc.stop()
+        self._stage_profile[name] = {'time': elapsed - nested, 'memory': memory}
+        return result
+
+    def _stage(self, name: str, compute, *dependencies):
+        """
+        Возвращает запомненный результат этапа, вычисляя его при первом обращении.
+
+        Зависимости вычисляются до начала замера этапа.
+
+        Аргументы:
+            name (str): Имя этапа.
+            compute: Функция без аргументов, вычисляющая результат этапа.
+            dependencies: Функции, вычисляющие этапы, от которых зависит данный.
+
+        Возвращает:
+            Результат этапа.
+        """
+        if name not in self._stage_results:
+            for dependency in dependencies:
+                dependency()
+            self._stage_results[name] = self._measure(name, compute)
+        return self._stage_results[name]
+
+    def _parse(self) -> dict:
+        """
+        Этап разбора схемы: элементы, их узлы и значения, переменные состояния.
+        """
+        def compute():
+            if isinstance(self.circuit, Netlist):
+                netlist = self.circuit
+            elif isinstance(self.circuit, (str, os.PathLike)):
+                netlist = read_netlist(self.circuit)
             else:
-                self.need_to_find[1].append(f"I_{str(element)}")
-                self.state_variables.append(f"U_{str(element)}")
-        self.currents = calculate_branches(self.nodes_list, self.connection_list)
-        self.voltages = calculate_voltages(self.currents, self.nodes_list)
+                netlist = Netlist.from_circuit(self.circuit)
+            if netlist.switches:
+                raise ValueError(f"Circuit has switches ({', '.join(netlist.switches)}); use SwitchedSimulation")
+            if netlist.delay_lines and self.backend != 'mna':
+                raise ValueError(f"Delay lines ({', '.join(netlist.delay_lines)}) need backend 'mna'")
+            lc_list = netlist.keys_of_type(Netlist.INDUCTOR, Netlist.CAPACITOR)
+            need_to_find = [[], []]
+            state_variables = []
+            for element in lc_list:
+                if netlist.is_type(element, Netlist.INDUCTOR):
+                    need_to_find[0].append(f"U_{str(element)}")
+                    state_variables.append(f"I_{str(element)}")
+                else:
+                    need_to_find[1].append(f"I_{str(element)}")
+                    state_variables.append(f"U_{str(element)}")
+            return {
+                'lc_list': lc_list,
+                'nodes_list': netlist,
+                'need_to_find': need_to_find,
+                'state_variables': state_variables,
+            }
+        return self._stage('parse', compute)
+
+    @property
+    def lc_list(self) -> list:
+        """
+        Список имён индуктивностей и конденсаторов (этап 'parse').
+        """
+        return self._parse()['lc_list']
+
+    @property
+    def nodes_list(self) -> Netlist:
+        """
+        Элементы схемы с узлами и значениями — Netlist, совместимый со словарём get_element_nodes_dict (этап 'parse').
+        """
+        return self._parse()['nodes_list']
+
+    @property
+    def need_to_find(self) -> list:
+        """
+        Переменные, которые нужно найти при генерации уравнений (этап 'parse').
+        """
+        return self._parse()['need_to_find']
+
+    @property
+    def state_variables(self) -> list:
+        """
+        Переменные состояния — токи через L и напряжения на C (этап 'parse').
+        """
+        return self._parse()['state_variables']
+
+    @property
+    def connection_list(self) -> dict:
+        """
+        Граф соединений между узлами (этап 'graph').
+        """
+        return self._stage('graph', lambda: self.nodes_list.adjacency(), self._parse)
+
+    @property
+    def simulator(self):
+        """
+        Симулятор PySpice; ngspice загружается только при обращении.
+        """
+        return self._stage('simulator', lambda: self.circuit.simulator(temperature=25, nominal_temperature=25))
+
+    @property
+    def analysis(self) -> dict:
+        """
+        Рабочая точка схемы по постоянному току, рассчитанная без ngspice (этап 'operating_point').
+        """
+        return self.operating_point()
+
+    def operating_point(self, use_ngspice: bool = False):
+        """
+        Рассчитывает рабочую точку схемы по постоянному току.
+
+        По умолчанию используется собственный линейный расчёт по таблице элементов (индуктивности —
+        короткое замыкание, конденсаторы — разрыв), без запуска ngspice. Анализ ngspice выполняется
+        только по явному запросу, например для перекрёстной проверки.
+
+        Аргументы:
+            use_ngspice (bool): Выполнить операционный анализ в ngspice через PySpice.
+
+        Возвращает:
+            dict | анализ PySpice: Потенциалы узлов (U_<узел>), токи (I_<элемент>) и переменные
+            состояния (I_L..., U_C... в направлении от первого узла элемента ко второму),
+            либо результат PySpice при use_ngspice=True.
+        """
+        if use_ngspice:
+            return self._stage('ngspice_operating_point', lambda: self.simulator.operating_point())
+        return self._stage('operating_point', lambda: self.mna_system.operating_point(), lambda: self.mna_system)
+
+    def state_orientation(self) -> dict:
+        """
+        Возвращает направление переменных состояния относительно узлов элемента.
+
+        Во всех бэкендах переменные состояния направлены по порядку узлов элемента: U_C = V(n+) - V(n-),
+        ток I_L — от n+ к n- (уравнения бэкенда 'kirchhoff' приводятся к этим направлениям, см.
+        _branch_orientation), поэтому все значения равны +1.
+
+        Возвращает:
+            dict: Словарь {переменная состояния: +1}.
+        """
+        return {name: 1 for name in self.state_variables}
+
+    def _branch_orientation(self) -> dict:
+        """
+        Возвращает направление переменных состояния уравнений Кирхгофа относительно узлов элемента.
+
+        В уравнениях Кирхгофа ток индуктивности и напряжение конденсатора направлены вдоль ветви,
+        поэтому могут быть противоположны порядку узлов элемента (n+ -> n-); -1 означает, что
+        переменная противоположна напряжению V(n+) - V(n-) или току от n+ к n-.
+
+        Возвращает:
+            dict: Словарь {переменная состояния: +1 или -1}.
+        """
+        return {name: 1 if f"U_{name[2:]}" in self.voltages else -1 for name in self.state_variables}
+
+    def _branches(self) -> tuple:
+        """
+        Этап определения ветвей: токи в ветвях и напряжения на элементах.
+        """
+        def compute():
+            currents = calculate_branches(self.nodes_list, self.connection_list)
+            return currents, calculate_voltages(currents, self.nodes_list)
+        return self._stage('branches', compute, self._parse, lambda: self.connection_list)
+
+    @property
+    def currents(self) -> dict:
+        """
+        Словарь токов в ветвях (этап 'branches').
+        """
+        return self._branches()[0]
+
+    @property
+    def voltages(self) -> dict:
+        """
+        Словарь напряжений на элементах (этап 'branches').
+        """
+        return self._branches()[1]
+
+    @property
+    def compiled_model(self) -> CompiledModel:
+        """
+        Скомпилированная правая часть системы ОДУ и матрица Якоби (этап 'compiled_model').
+
+        В бэкенде 'numeric' — LinearModel по численно собранным матрицам A и B. Если переменных
+        состояния больше BANDED_LIMIT, алгебраические переменные исключаются с сохранением
+        разреженности (NumericAssembly.eliminate_sparse), и при узкой ленте A (многозвенные линии,
+        лестничные цепи) строится BandedLinearModel: её расчёт растёт линейно с числом звеньев.
+        Модель схемы с распределёнными линиями (TransmissionLine) любого размера считается методом
+        Radau без разрешения паразитных мод звеньев (resolve_modes = False), как BandedLinearModel.
+        Источники SIN, PULSE и PWL входят в модель как функции времени.
+        """
+        waveforms = self.nodes_list.input_waveforms()
+        if self.backend == 'numeric':
+            def compute_numeric():
+                assembly = self.numeric_assembly
+                if len(assembly.state_names) > self.BANDED_LIMIT:
+                    A, B = assembly.eliminate_sparse()
+                    model = BandedLinearModel.detect(A, B, assembly.state_names, assembly.input_names,
+                                                     assembly.input_values, waveforms)
+                    if model is not None:
+                        return model
+                return LinearModel(self.to_state_space(), waveforms,
+                                   resolve_modes=not self.nodes_list.line_sections)
+            return self._stage('compiled_model', compute_numeric, lambda: self.numeric_assembly)
+
+        def compute():
+            expressions, inputs, element_values = self.derive_state_equations()
+            self._check_state_symbols(expressions, inputs, element_values)
+            return CompiledModel(self.state_variables, list(expressions), parameters={**element_values, **inputs},
+                                 input_functions=waveforms)
+        return self._stage('compiled_model', compute, self.derive_state_equations)
+
+    @property
+    def numeric_assembly(self) -> NumericAssembly:
+        """
+        Матрицы законов Кирхгофа для численной сборки уравнений состояния (этап 'numeric_assembly').
+        """
+        return self._stage('numeric_assembly', lambda: NumericAssembly(self.nodes_list), self._parse)
+
+    @property
+    def mna_system(self) -> MNASystem:
+        """
+        Разреженная система MNA (этап 'mna_equations').
+        """
+        return self._stage('mna_equations', lambda: MNASystem(self.nodes_list), self._parse)
+
+    def profile_report(self) -> dict:
+        """
+        Возвращает профиль выполненных этапов анализа.
+
+        Возвращает:
+            dict: Словарь {этап: {'time': секунды, 'memory': байты или None}} в порядке выполнения.
+        """
+        return {name: dict(value) for name, value in self._stage_profile.items()}
+
+    def print_profile(self) -> None:
+        """
+        Выводит на экран время и память выполненных этапов анализа.
+        """
+        print("\n=== Профиль этапов анализа ===")
+        if not self._stage_profile:
+            print("  Этапы ещё не выполнялись.")
+        for name, value in self._stage_profile.items():
+            memory = f", память {value['memory'] / 2**20:.2f} МБ" if value['memory'] is not None else ""
+            print(f"  {name}: {value['time'] * 1000:.2f} мс{memory}")
+        print("=== Конец профиля ===\n")
 
     def print_connections(self):
         """
@@ -92,52 +420,122 @@ class CircuitSimulation:
                 print(f"  {branch}: между узлами {voltage}")
         print("=== Конец списка напряжений ===\n")
 
-    def set_initial_conditions(self, initial_conditions: dict) -> None:
+    def set_value(self, key: str, value: float) -> None:
+        """
+        Меняет значение одного элемента (см. set_values).
+
+        Аргументы:
+            key (str): Ключ или имя SPICE элемента ('R3').
+            value (float): Новое значение в единицах СИ.
+        """
+        self.set_values({key: value})
+
+    def set_values(self, values: dict) -> None:
+        """
+        Меняет значения элементов, сбрасывая только численные этапы, зависящие от значений.
+
+        Разбор схемы, граф, ветви и символьные уравнения (этапы parse, graph, branches, equations)
+        зависят только от топологии и сохраняются: уравнения выведены с символами элементов.
+        Скомпилированная символьная модель (бэкенд 'kirchhoff') получает новые значения параметров
+        без повторной компиляции; численные этапы (VALUE_STAGES, модель бэкенда 'numeric') и модели
+        reduce() и discretize() сбрасываются и строятся заново при следующем обращении. Переход
+        резистора к нулевому сопротивлению или от него меняет топологию и сбрасывает все этапы,
+        кроме разбора. Начальные условия не меняются; рабочую точку при новых значениях даёт
+        повторный вызов set_initial_conditions. Значения элементов верхнего уровня переносятся и
+        в схему PySpice (для ngspice).
+
+        Аргументы:
+            values (dict): Новые значения по ключам или именам SPICE элементов.
+        """
+        netlist = self.nodes_list
+        updated = self._measure('update', lambda: netlist.with_values(values))
+        topology = any(netlist.is_type(key, Netlist.RESISTOR) and (netlist[key][2] == 0) != (float(value) == 0)
+                       for key, value in values.items())
+        self._stage_results['parse'] = {**self._stage_results['parse'], 'nodes_list': updated}
+        if topology:
+            self._stage_results = {'parse': self._stage_results['parse']}
+        else:
+            for name in self.VALUE_STAGES:
+                self._stage_results.pop(name, None)
+            model = self._stage_results.get('compiled_model')
+            if isinstance(model, CompiledModel):
+                _, inputs, element_values = self.derive_state_equations()
+                model.set_parameters({**element_values, **inputs})
+            else:
+                self._stage_results.pop('compiled_model', None)
+        self.reduced_model = None
+        self.discrete_model = None
+        if isinstance(self.circuit, Circuit):
+            names = {element.name for element in self.circuit.elements}
+            for key, value in values.items():
+                if key in names:
+                    element = self.circuit[key]
+                    setattr(element, Netlist.VALUE_ATTRIBUTES[element.PREFIX], float(value))
+
+    def set_initial_conditions(self, initial_conditions: dict = None) -> None:
         """
         Устанавливает начальные условия для индуктивностей и конденсаторов схемы.
+
+        Значения задаются в направлениях элементов (U_C = V(n+) - V(n-), ток I_L от n+ к n-) одинаково
+        для всех бэкендов. Элементы, для которых значение не задано, получают значения из рабочей
+        точки по постоянному току (operating_point). У схемы без индуктивностей и конденсаторов
+        переходного процесса нет, и возбуждается ValueError.
+
         Аргументы:
-            initial_conditions (dict): Словарь с начальными условиями для каждого элемента.
+            initial_conditions (dict, optional): Словарь с начальными условиями для каждого элемента.
         """
+        if not self.state_variables:
+            raise ValueError("Circuit has no inductors or capacitors, so it has no transient; "
+                             "use operating_point() or ac_sweep() with node outputs")
+        initial_conditions = initial_conditions or {}
         self.initial_conditions = {}
         for key, value in initial_conditions.items():
-            if "L" in key:
+            if key in self.nodes_list and self.nodes_list.is_type(key, Netlist.INDUCTOR):
                 self.initial_conditions[f"I_{key}"] = value
             else:
                 self.initial_conditions[f"U_{key}"] = value
+        missing = [name for name in self.state_variables if name not in self.initial_conditions]
+        if missing:
+            operating_point = self.operating_point()
+            for name in missing:
+                self.initial_conditions[name] = operating_point[name]
 
-    def analyze(self) -> None:
+    def generate_equations(self) -> tuple:
         """
-        Выполняет полный анализ переходного процесса:
-        - Формирует систему уравнений по законам Кирхгофа
-        - Подставляет численные значения элементов
-        - Решает систему ОДУ и строит графики переходных процессов
+        Формирует систему уравнений по законам Кирхгофа в символьном виде (без подстановки значений).
+
+        Возвращает:
+            tuple: Кортеж из двух словарей — выражения для токов конденсаторов (I_C) и напряжений на индуктивностях (U_L).
         """
-        if self.initial_conditions is None:
-            raise ValueError("Initial conditions are not set")
-        
+        netlist = self.nodes_list
+        if netlist.delay_lines:
+            raise ValueError("Delay lines have no state equations; use transient analysis with backend 'mna'")
         can_be = []
         cant_be = []
-        for key in self.nodes_list:
-            if "X" in key:
+        for key in netlist:
+            kind = netlist.type_of(key)
+            if kind == Netlist.SUBCIRCUIT:
                 continue
-            elif "V" in key:
+            elif kind == Netlist.VOLTAGE_SOURCE:
                 can_be.append(f"U_{key}")
-            elif "C" in key:
+            elif kind == Netlist.CAPACITOR:
                 can_be.append(key)
                 can_be.append(f"U_{key}")
-            elif "L" in key:
+            elif kind == Netlist.INDUCTOR:
                 can_be.append(key)
                 cant_be.append(f"U_{key}")
             else:
                 can_be.append(key)
                 cant_be.append(f"U_{key}")
         for key in self.currents:
-            if "I_L" in key:
-                can_be.append(f"{key}")
-            if "I_C" in key or "I_R" in key or "I_V" in key:
+            if key[2:] not in netlist:
+                continue
+            kind = netlist.type_of(key[2:])
+            if kind == Netlist.INDUCTOR:
+                can_be.append(key)
+            elif kind in (Netlist.CAPACITOR, Netlist.RESISTOR, Netlist.VOLTAGE_SOURCE):
                 cant_be.append(key)
-        del key
-        i_set, u_set = generate_circuit_equations(
+        return generate_circuit_equations(
             can_be=can_be,
             cant_be=cant_be,
             need_to_find=self.need_to_find,
@@ -146,13 +544,587 @@ class CircuitSimulation:
             element_nodes=self.nodes_list,
             element_graph=self.connection_list
         )
-        il_equations = []
-        uc_equations = []
-        for key, value in i_set.items():
-            i_set[key] = simplify(substitute_element_values(value, self.nodes_list))
-            uc_equations.append(substitute_element_values(f"U_{key[2:]}' = ({i_set[key]})/{key[2:]}", self.nodes_list))
-        for key, value in u_set.items():
-            u_set[key] = simplify(substitute_element_values(value, self.nodes_list))
-            il_equations.append(substitute_element_values(f"I_{key[2:]}' = ({u_set[key]})/{key[2:]}", self.nodes_list))
-            
-        plot_ode_system_solution(self.initial_conditions, il_equations, uc_equations)        
+
+    def derive_state_equations(self) -> tuple:
+        """
+        Выражает производные переменных состояния через состояния, источники и параметры элементов.
+
+        Значения элементов не подставляются: R, L, C остаются символами, поэтому одну и ту же
+        систему можно вычислять при разных значениях элементов. Если задан кэш моделей,
+        выражения берутся из него по хэшу топологии, а при промахе — выводятся и сохраняются.
+        Выражения запоминаются как этап 'equations' и не пересчитываются при set_values;
+        словари значений берутся из текущей таблицы элементов при каждом вызове. Переменные
+        состояния, направленные вдоль ветви против порядка узлов элемента (_branch_orientation),
+        заменяются противоположными, поэтому знаки совпадают с бэкендами 'numeric' и 'mna'.
+
+        Возвращает:
+            tuple: (Matrix производных в порядке self.state_variables,
+                    словарь входов {имя: значение}, словарь параметров {имя элемента: значение}).
+        """
+        def compute():
+            key = ModelCache.topology_key(self.nodes_list) if self.cache is not None else None
+            expressions = self.cache.get(key) if self.cache is not None else None
+            if expressions is None:
+                i_set, u_set = self.generate_equations()
+                derivatives = {}
+                for name, value in i_set.items():
+                    value = value.rhs if isinstance(value, Equality) else sympify(value)
+                    derivatives[f"U_{name[2:]}"] = value / Symbol(name[2:])
+                for name, value in u_set.items():
+                    value = value.rhs if isinstance(value, Equality) else sympify(value)
+                    derivatives[f"I_{name[2:]}"] = value / Symbol(name[2:])
+                missing = [name for name in self.state_variables if name not in derivatives]
+                if missing:
+                    raise ValueError(f"No equations for state variables: {', '.join(missing)}")
+                expressions = Matrix([derivatives[name] for name in self.state_variables])
+                if self.cache is not None:
+                    self.cache.put(key, expressions)
+            reversed_names = [name for name, sign in self._branch_orientation().items() if sign < 0]
+            if reversed_names:
+                flipped = {Symbol(name): -Symbol(name) for name in reversed_names}
+                rows = [self.state_variables.index(name) for name in reversed_names]
+                expressions = Matrix([-row if i in rows else row
+                                      for i, row in enumerate(expressions.xreplace(flipped))])
+            return expressions
+        expressions = self._stage('equations', compute, self._parse)
+        inputs = {}
+        element_values = {}
+        for key, value in self.nodes_list.items():
+            kind = self.nodes_list.type_of(key)
+            if kind == Netlist.SUBCIRCUIT:
+                continue
+            elif kind == Netlist.VOLTAGE_SOURCE:
+                inputs[f"U_{key}"] = value[2]
+            elif kind == Netlist.CURRENT_SOURCE:
+                inputs[f"I_{key}"] = value[2]
+            else:
+                element_values[key] = value[2]
+        return expressions, inputs, element_values
+
+    def _check_state_symbols(self, expressions: Matrix, inputs: dict, element_values: dict) -> None:
+        """
+        Проверяет, что уравнения состояния зависят только от состояний, входов и параметров элементов.
+
+        Иначе оставшиеся символы (например, неисключённые I_C или U_L) были бы приняты за константы
+        и дали бы неверные матрицы A и B.
+
+        Аргументы:
+            expressions (Matrix): Производные переменных состояния.
+            inputs (dict): Входы схемы.
+            element_values (dict): Параметры элементов.
+        """
+        known = {Symbol(name) for name in [*self.state_variables, *inputs, *element_values]}
+        unknown = expressions.free_symbols - known
+        if unknown:
+            raise ValueError(f"State equations depend on unresolved variables {', '.join(sorted(map(str, unknown)))}; "
+                             f"use backend 'numeric' or 'mna'")
+
+    def to_state_space(self) -> StateSpaceModel:
+        """
+        Строит линейную модель схемы в пространстве состояний x' = A x + B u, y = C x + D u.
+
+        Переменные состояния — self.state_variables, входы — источники постоянного напряжения (U_V...)
+        и тока (I_I...), выходы совпадают с переменными состояния (C — единичная матрица, D — нулевая).
+
+        В бэкендах 'numeric' и 'mna' алгебраические переменные исключаются из матриц законов Кирхгофа
+        LU-разложением (этап 'elimination'), без символьных уравнений; иначе A и B — матрицы Якоби
+        символьных уравнений состояния. У схемы без L и C модель в бэкендах 'numeric' и 'mna' не имеет
+        переменных состояния (y = D u). Если уравнения Кирхгофа не исключили токи конденсаторов
+        или напряжения на индуктивностях (I_C, U_L остались в правых частях), возбуждается ValueError:
+        такие символы нельзя считать константами.
+
+        Возвращает:
+            StateSpaceModel: Модель с матрицами A, B, C, D в виде массивов NumPy.
+        """
+        if self.backend in ('numeric', 'mna'):
+            return self._stage('elimination', lambda: self.numeric_assembly.state_space(),
+                               lambda: self.numeric_assembly)
+        if not self.state_variables:
+            raise ValueError("Circuit has no inductors or capacitors; use backend 'numeric' or 'mna' for its static model")
+        expressions, inputs, element_values = self.derive_state_equations()
+        self._check_state_symbols(expressions, inputs, element_values)
+        expressions = expressions.subs({Symbol(key): value for key, value in element_values.items()})
+        A = expressions.jacobian([Symbol(name) for name in self.state_variables])
+        B = expressions.jacobian([Symbol(name) for name in inputs])
+        if A.free_symbols or B.free_symbols:
+            raise ValueError(f"State equations are not linear in {', '.join(sorted(map(str, A.free_symbols | B.free_symbols)))}")
+        n = len(self.state_variables)
+        return StateSpaceModel(
+            A=np.array(A.evalf(), dtype=float).reshape(n, n),
+            B=np.array(B.evalf(), dtype=float).reshape(n, len(inputs)),
+            C=np.eye(n),
+            D=np.zeros((n, len(inputs))),
+            state_names=self.state_variables,
+            input_names=list(inputs),
+            output_names=self.state_variables,
+            input_values=list(inputs.values()),
+            input_functions=self.nodes_list.input_waveforms()
+        )
+
+    def ac_sweep(self, frequencies, input: str = None, output: str = None, method: str = 'auto',
+                 reduced: bool = False) -> np.ndarray:
+        """
+        Рассчитывает частотную характеристику H(jω) = C (jω I - A)⁻¹ B + D сразу на всех частотах.
+
+        Для выходов-переменных состояния используется модель to_state_space() (знаки — как у
+        переменных состояния бэкенда). Потенциалы узлов (U_<узел>) и токи источников напряжения,
+        линий и конденсаторов (I_<элемент>) выражаются через численную сборку (NumericAssembly),
+        знаки — от n+ к n-. Входное сопротивление источника напряжения V1: -1 / ac_sweep(f, 'U_V1', 'I_V1').
+
+        Аргументы:
+            frequencies (array-like): Частоты в герцах.
+            input (str, optional): Имя входа (U_V..., I_I...); по умолчанию — все входы.
+            output (str, optional): Имя выхода; по умолчанию — все переменные состояния.
+            method (str): Способ расчёта ('eig', 'hessenberg' или 'auto', см. StateSpaceModel.frequency_response).
+            reduced (bool): Считать по модели пониженного порядка из reduce() (выходы — её выходы).
+
+        Возвращает:
+            np.ndarray: Комплексный массив (выходы, входы, частоты); оси заданных имён опускаются.
+        """
+        if reduced:
+            if self.reduced_model is None:
+                raise ValueError("Reduced model is not built; call reduce() first")
+            model = self.reduced_model
+        elif output is None or output in self.state_variables:
+            model = self.to_state_space()
+        else:
+            model = self.numeric_assembly.state_space(outputs=[output])
+        return self._measure('ac_sweep', lambda: model.frequency_response(frequencies, input, output, method))
+
+    def _symbolic_ensemble(self, element_values: dict) -> tuple:
+        """
+        Вычисляет матрицы A и вынуждающие члены B u ансамбля по символьным уравнениям состояния (см. run_ensemble).
+
+        Аргументы:
+            element_values (dict): Массивы значений по именам элементов.
+
+        Возвращает:
+            tuple: (A размера (ансамбль, n, n), B u размера (ансамбль, n)).
+        """
+        expressions, inputs, nominal_values = self.derive_state_equations()
+        self._check_state_symbols(expressions, inputs, nominal_values)
+        parameters = {**nominal_values, **inputs}
+        samples = {}
+        for key, values in element_values.items():
+            name = next((name for name in (key, f"U_{key}", f"I_{key}") if name in parameters), None)
+            if name is None:
+                raise KeyError(f"Unknown element: {key}")
+            samples[name] = np.asarray(values, dtype=float)
+        size = max(np.size(values) for values in samples.values()) if samples else 1
+        states = [Symbol(name) for name in self.state_variables]
+        input_symbols = [Symbol(name) for name in inputs]
+        parameter_symbols = [Symbol(name) for name in parameters]
+        A = expressions.jacobian(states)
+        forcing = A.zeros(len(states), 1) if not inputs else expressions.jacobian(input_symbols) * Matrix(input_symbols)
+        unknown = (A.free_symbols | forcing.free_symbols) - set(parameter_symbols)
+        if unknown:
+            raise ValueError(f"State equations are not linear in {', '.join(sorted(map(str, unknown)))}")
+        n = len(states)
+        evaluate = lambdify(parameter_symbols, list(A) + list(forcing), modules='numpy')
+        arguments = [np.broadcast_to(samples.get(name, value), (size,)) for name, value in parameters.items()]
+        entries = np.empty((n * n + n, size))
+        for i, entry in enumerate(evaluate(*arguments)):
+            entries[i] = entry
+        return entries[:n * n].T.reshape(size, n, n), entries[n * n:].T
+
+    def run_ensemble(self, element_values: dict, time_points, initial_conditions: dict = None) -> EnsembleResult:
+        """
+        Рассчитывает переходный процесс для ансамбля копий схемы с разными значениями элементов.
+
+        Топология и символьные уравнения строятся один раз; матрицы A и B вычисляются для всех
+        членов ансамбля сразу, а система решается одним пакетным вычислением NumPy. В бэкендах
+        'numeric' и 'mna' символьные уравнения не строятся: A и B всех членов получаются пакетным
+        исключением из матриц численной сборки (NumericAssembly.ensemble). Решение точно
+        для постоянных источников, поэтому источникам SIN, PULSE и PWL нужно задать постоянные
+        значения в element_values, иначе возбуждается ValueError.
+
+        Аргументы:
+            element_values (dict): Массивы значений по именам элементов из self.nodes_list
+                (например, {'R1': r_samples, 'C1': c_samples}); для источников ('V1') — значения источника.
+                Не заданные элементы берут номинальные значения.
+            time_points (array-like): Моменты времени.
+            initial_conditions (dict, optional): Начальные условия по переменным состояния (число или массив
+                по ансамблю); по умолчанию — заданные через set_initial_conditions.
+
+        Возвращает:
+            EnsembleResult: Траектории размера (ансамбль, переменная состояния, время) и статистика.
+        """
+        if initial_conditions is None:
+            initial_conditions = self.initial_conditions
+        if initial_conditions is None:
+            raise ValueError("Initial conditions are not set")
+        varying = [name for name in self.nodes_list.input_waveforms()
+                   if name not in element_values and name[2:] not in element_values]
+        if varying:
+            raise ValueError(f"Sources {', '.join(varying)} vary in time; the ensemble solution assumes constant "
+                             f"sources, pass their values in element_values or use analyze()")
+        if self.backend in ('numeric', 'mna'):
+            A_batch, forcing_batch = self.numeric_assembly.ensemble(
+                {key[2:] if key not in self.nodes_list and key[:2] in ('U_', 'I_') else key: values
+                 for key, values in element_values.items()})
+        else:
+            A_batch, forcing_batch = self._symbolic_ensemble(element_values)
+        size = A_batch.shape[0]
+        x0 = np.stack([np.broadcast_to(np.asarray(initial_conditions[name], dtype=float), (size,))
+                       for name in self.state_variables], axis=-1)
+        return EnsembleResult(np.asarray(time_points, dtype=float),
+                              solve_linear_system(A_batch, forcing_batch, x0, time_points),
+                              self.state_variables)
+
+    def analyze(self, end_time: float = None, time_step: float = None, method: str = None, max_step: float = None) -> TransientResult:
+        """
+        Выполняет полный анализ переходного процесса:
+        - Формирует систему уравнений по законам Кирхгофа (символьно или, в бэкенде 'numeric', матрицами
+          коэффициентов) или разреженную систему MNA
+        - Компилирует правую часть системы ОДУ и её матрицу Якоби (self.compiled_model);
+          значения элементов передаются как параметры модели
+        - Оценивает постоянные времени системы и выбирает метод, интервал и шаг расчёта
+          (шаг ограничен и периодом синусоидальных источников)
+        - Решает систему ОДУ отрезками между точками излома источников PULSE/PWL, перезапуская
+          решатель в каждой; графики не строятся (см. TransientResult.plot)
+
+        Аргументы:
+            end_time (float, optional): Время окончания расчёта (по умолчанию — по самой медленной моде).
+            time_step (float, optional): Шаг по времени для бэкенда 'mna' (по умолчанию — по модам системы,
+                не больше задержки линий DelayLine).
+            method (str, optional): Метод solve_ivp ('RK45', 'Radau', 'BDF', 'LSODA', ...) или, для бэкенда 'mna',
+                'trapezoidal' / 'backward_euler' (по умолчанию — по жёсткости системы).
+            max_step (float, optional): Максимальный шаг solve_ivp (по умолчанию — по самой быстрой моде).
+
+        Возвращает:
+            TransientResult: Моменты времени, значения переменных состояния и плотный выход решателя.
+        """
+        if self.initial_conditions is None:
+            raise ValueError("Initial conditions are not set")
+        if self.backend == 'mna':
+            system = self.mna_system
+            if end_time is None or time_step is None or method is None:
+                if len(system.unknowns) > self.MNA_DENSE_LIMIT:
+                    raise ValueError("end_time, time_step and method are required for large MNA systems")
+                eigenvalues = eigvals(-system.G.toarray(), system.C.toarray())
+                settings = select_solver_settings(eigenvalues, end_time=end_time, min_points=1000,
+                                                  source_period=self.nodes_list.shortest_period())
+                end_time = float(settings['end_time'])
+                time_step = time_step or settings['max_step']
+                if system.delay_lines:
+                    time_step = min(time_step, min(line[4] for line in system.delay_lines.values()))
+                method = method or ('backward_euler' if settings['stiff'] else 'trapezoidal')
+            time, values, names = self._measure('solve', lambda: system.transient(
+                end_time, time_step, initial_conditions=self.initial_conditions, method=method))
+            return TransientResult(time, values, names)
+        model = self.compiled_model
+        initial_conditions = {name: self.initial_conditions[name] for name in model.state_variables}
+        time_span = [0, end_time] if end_time is not None else None
+        solution = self._measure('solve', lambda: solve_ode_system(model, initial_conditions, time_span, method, max_step,
+                                                                   breakpoints=self.nodes_list.breakpoints,
+                                                                   source_period=self.nodes_list.shortest_period()))
+        if isinstance(model, BandedLinearModel):
+            # Ленточная модель решается в своём порядке переменных; результат — в порядке state_variables.
+            interpolant = BlockInterpolant([model.permutation], [solution.sol], len(model.permutation))
+            values = np.empty_like(solution.y)
+            values[model.permutation] = solution.y
+            return TransientResult(solution.t, values, self.state_variables, interpolant=interpolant)
+        return TransientResult(solution.t, solution.y, self.state_variables, interpolant=solution.sol)
+
+    @property
+    def block_system(self) -> BlockTriangularSystem:
+        """
+        Блочно-треугольная структура выведенной системы x' = A x + B u (этап 'block_structure').
+        """
+        return self._stage('block_structure', lambda: BlockTriangularSystem(
+            self.to_state_space(), self.nodes_list.input_waveforms()), self.to_state_space)
+
+    def analyze_blocks(self, end_time: float = None, method: str = None, max_step: float = None,
+                       max_workers: int = None) -> TransientResult:
+        """
+        Рассчитывает переходный процесс по блокам: независимые подсистемы и блоки с односторонней
+        связью интегрируются отдельно, каждый со своим методом и шагом, параллельно в пуле процессов.
+
+        Состояния вышестоящих блоков подаются в нижестоящие через плотный выход решателя
+        (см. BlockTriangularSystem).
+
+        Аргументы:
+            end_time (float, optional): Время окончания расчёта (по умолчанию — по самой медленной моде системы).
+            method (str, optional): Метод solve_ivp для всех блоков (по умолчанию — по жёсткости каждого блока).
+            max_step (float, optional): Максимальный шаг для всех блоков.
+            max_workers (int, optional): Число процессов (1 — последовательно в текущем процессе).
+
+        Возвращает:
+            TransientResult: Значения переменных состояния и общий плотный выход.
+        """
+        if self.initial_conditions is None:
+            raise ValueError("Initial conditions are not set")
+        system = self.block_system
+        if end_time is None:
+            end_time = select_solver_settings(np.linalg.eigvals(system.model.A),
+                                              source_period=self.nodes_list.shortest_period())['end_time']
+        initial_state = [self.initial_conditions[name] for name in system.model.state_names]
+        return self._measure('solve', lambda: system.solve(
+            (0.0, end_time), initial_state, self.nodes_list.breakpoints(0.0, end_time), method=method,
+            max_step=max_step, source_period=self.nodes_list.shortest_period(), max_workers=max_workers))
+
+    def reduce(self, order: int = None, tolerance: float = None, method: str = 'balanced', outputs: list = None,
+               **options) -> ReducedModel:
+        """
+        Строит модель пониженного порядка выведенной линейной системы (этап 'reduction').
+
+        Для длинных линий и лестничных цепей из сотен звеньев порядок системы равен числу L и C,
+        хотя на входах и выходах схема ведёт себя как система нескольких десятков порядков.
+        Модель сохраняется в self.reduced_model и используется analyze_reduced и ac_sweep(reduced=True).
+
+        Аргументы:
+            order (int, optional): Порядок модели.
+            tolerance (float, optional): Допустимая ошибка ‖H - Hr‖∞ (для 'balanced').
+            method (str): 'balanced' — сбалансированное усечение, 'krylov' — согласование моментов (см. reduce_model).
+            outputs (list, optional): Выходы модели (переменные состояния, U_<узел>, I_<элемент>, как в ac_sweep);
+                по умолчанию — все переменные состояния. Чем меньше выходов, тем ниже достаточный порядок.
+            options: match_dc для 'balanced', expansion_point для 'krylov'. Для 'krylov' энергетический вес
+                diag(L, C) переменных состояния (energy) берётся из схемы.
+
+        Возвращает:
+            ReducedModel: Модель пониженного порядка.
+        """
+        model = self.to_state_space() if outputs is None else self.numeric_assembly.state_space(outputs=list(outputs))
+        if method == 'krylov' and 'energy' not in options:
+            options['energy'] = [self.nodes_list[name[2:]][2] for name in model.state_names]
+        self.reduced_model = self._measure('reduction', lambda: reduce_model(model, order, tolerance, method, **options))
+        return self.reduced_model
+
+    def _solve_model(self, model: StateSpaceModel, initial_state, end_time: float, method: str, max_step: float):
+        """
+        Решает x' = A x + B u(t) линейной модели с источниками схемы (как analyze).
+        """
+        initial_conditions = dict(zip(model.state_names, np.asarray(initial_state, dtype=float)))
+        return solve_ode_system(LinearModel(model, self.nodes_list.input_waveforms()), initial_conditions,
+                                [0, end_time] if end_time is not None else None, method, max_step,
+                                breakpoints=self.nodes_list.breakpoints,
+                                source_period=self.nodes_list.shortest_period())
+
+    def analyze_reduced(self, end_time: float = None, method: str = None, max_step: float = None) -> TransientResult:
+        """
+        Рассчитывает переходный процесс по модели пониженного порядка из reduce().
+
+        Начальное состояние переносится в переменные модели (z0 = projection x0), решатель тот же,
+        что в analyze; результат — выходы модели y = Cr z + Dr u(t), а не переменные z.
+
+        Аргументы:
+            end_time (float, optional): Время окончания расчёта (по умолчанию — по самой медленной моде).
+            method (str, optional): Метод solve_ivp (по умолчанию — по жёсткости модели).
+            max_step (float, optional): Максимальный шаг solve_ivp.
+
+        Возвращает:
+            TransientResult: Моменты времени, значения выходов и плотный выход.
+        """
+        if self.initial_conditions is None:
+            raise ValueError("Initial conditions are not set")
+        if self.reduced_model is None:
+            raise ValueError("Reduced model is not built; call reduce() first")
+        model = self.reduced_model
+        initial_state = model.reduce_state([self.initial_conditions[name] for name in model.original.state_names])
+        waveforms = self.nodes_list.input_waveforms()
+        solution = self._measure('solve', lambda: self._solve_model(model, initial_state, end_time, method, max_step))
+        return TransientResult(solution.t, model.outputs(solution.t, solution.y, waveforms), model.output_names,
+                               interpolant=OutputTrajectory(model, solution.sol, waveforms))
+
+    def compare_reduced(self, end_time: float = None, frequencies=None, points: int = 1000) -> dict:
+        """
+        Сравнивает модель пониженного порядка с исходной: время и ошибка переходного процесса и АЧХ.
+
+        Переходный процесс обеих моделей считается одним решателем на одном интервале, выходы
+        сравниваются на равномерной сетке по плотному выходу. Частотные характеристики сравниваются
+        по всем входам и выходам.
+
+        Аргументы:
+            end_time (float, optional): Время окончания расчёта (по умолчанию — по самой медленной моде исходной модели).
+            frequencies (array-like, optional): Частоты в герцах (по умолчанию — 200 точек от декады ниже самой
+                медленной до декады выше самой быстрой собственной частоты исходной модели).
+            points (int): Число точек сетки сравнения переходного процесса.
+
+        Возвращает:
+            dict: {'order', 'full_order', 'method', 'error_bound', 'transient': {...}, 'ac': {...}}; разделы
+            содержат время исходной и пониженной моделей ('full_time', 'reduced_time'), ускорение ('speedup'),
+            наибольшую абсолютную ('max_error') и относительную ('relative_error') ошибки.
+        """
+        if self.initial_conditions is None:
+            raise ValueError("Initial conditions are not set")
+        if self.reduced_model is None:
+            raise ValueError("Reduced model is not built; call reduce() first")
+        reduced = self.reduced_model
+        full = reduced.original
+        eigenvalues = np.abs(np.linalg.eigvals(full.A))
+        eigenvalues = eigenvalues[eigenvalues > 0]
+        if end_time is None:
+            end_time = float(select_solver_settings(np.linalg.eigvals(full.A),
+                                                    source_period=self.nodes_list.shortest_period())['end_time'])
+        if frequencies is None:
+            frequencies = np.logspace(np.log10(eigenvalues.min() / (2 * np.pi)) - 1,
+                                      np.log10(eigenvalues.max() / (2 * np.pi)) + 1, 200)
+        waveforms = self.nodes_list.input_waveforms()
+        initial_state = [self.initial_conditions[name] for name in full.state_names]
+        grid = np.linspace(0.0, end_time, points)
+
+        start = perf_counter()
+        full_solution = self._solve_model(full, initial_state, end_time, None, None)
+        full_time = perf_counter() - start
+        start = perf_counter()
+        result = self.analyze_reduced(end_time)
+        reduced_time = perf_counter() - start
+        expected = model_outputs(full, grid, full_solution.sol(grid), waveforms)
+        difference = np.abs(result(grid) - expected)
+        scale = np.max(np.abs(expected))
+        transient = {'full_time': full_time, 'reduced_time': reduced_time, 'speedup': full_time / reduced_time,
+                     'max_error': float(difference.max()),
+                     'relative_error': float(difference.max() / scale) if scale > 0 else None}
+
+        start = perf_counter()
+        response = full.frequency_response(frequencies)
+        full_time = perf_counter() - start
+        start = perf_counter()
+        reduced_response = reduced.frequency_response(frequencies)
+        reduced_time = perf_counter() - start
+        difference = np.abs(response - reduced_response)
+        scale = np.max(np.abs(response))
+        ac = {'full_time': full_time, 'reduced_time': reduced_time, 'speedup': full_time / reduced_time,
+              'max_error': float(difference.max()),
+              'relative_error': float(difference.max() / scale) if scale > 0 else None}
+        return {'order': reduced.order, 'full_order': full.A.shape[0], 'method': reduced.method,
+                'error_bound': reduced.error_bound, 'transient': transient, 'ac': ac}
+
+    def discretize(self, time_step: float) -> DiscreteModel:
+        """
+        Строит дискретную модель выведенной линейной системы с шагом time_step (этап 'discretization').
+
+        Матрицы Φ = e^{AΔt} и Γ вычисляются один раз (фиксатор нулевого порядка, zero_order_hold),
+        после чего каждый шаг расчёта — умножение на постоянные матрицы. Модель сохраняется в
+        self.discrete_model; её simulate принимает и пакеты последовательностей входов.
+
+        Аргументы:
+            time_step (float): Шаг дискретизации.
+
+        Возвращает:
+            DiscreteModel: Дискретная модель с переменными состояния self.state_variables.
+        """
+        model = self.to_state_space()
+        self.discrete_model = self._measure('discretization', lambda: DiscreteModel.from_state_space(model, time_step))
+        return self.discrete_model
+
+    def input_samples(self, time) -> np.ndarray:
+        """
+        Возвращает значения входов модели в моменты time: источники SIN/PULSE/PWL вычисляются векторно,
+        остальные постоянны.
+
+        Аргументы:
+            time (array-like): Моменты времени.
+
+        Возвращает:
+            np.ndarray: Массив размера (число входов, число моментов).
+        """
+        model = self.discrete_model if self.discrete_model is not None else self.to_state_space()
+        time = np.asarray(time, dtype=float)
+        values = np.repeat(model.input_values[:, None], time.size, axis=1)
+        for name, waveform in self.nodes_list.input_waveforms().items():
+            values[model.input_names.index(name)] = waveform(time)
+        return values
+
+    def analyze_discrete(self, end_time: float, time_step: float, out: np.ndarray = None) -> TransientResult:
+        """
+        Рассчитывает переходный процесс на равномерной сетке по дискретной модели (discretize).
+
+        Источники схемы берутся в начале каждого шага и удерживаются до следующего, поэтому фронт
+        импульса смещается не больше чем на шаг, а для постоянных источников значения в узлах сетки
+        точные. Стоимость шага постоянна: solve_ivp и выбор шага не используются.
+
+        Аргументы:
+            end_time (float): Время окончания расчёта.
+            time_step (float): Шаг сетки.
+            out (np.ndarray, optional): Массив размера (число переменных состояния, число шагов + 1) для записи.
+
+        Возвращает:
+            TransientResult: Моменты времени и значения переменных состояния на сетке.
+        """
+        if self.initial_conditions is None:
+            raise ValueError("Initial conditions are not set")
+        if self.discrete_model is None or self.discrete_model.time_step != float(time_step):
+            self.discretize(time_step)
+        model = self.discrete_model
+        steps = int(round(end_time / time_step))
+        time = np.arange(steps + 1) * time_step
+        inputs = self.input_samples(time[:-1]) if self.nodes_list.waveforms else None
+        initial_state = [self.initial_conditions[name] for name in model.state_names]
+        states = self._measure('solve', lambda: model.simulate(initial_state, inputs, steps, out=out))
+        return TransientResult(time, states, model.state_names)
+
+    def stream(self, directory: str, end_time: float, time_step: float, window: float = None,
+               method: str = None, max_step: float = None, resume: bool = True) -> TransientStore:
+        """
+        Рассчитывает переходный процесс окнами по времени, дописывая каждое окно в файлы .npy на диске.
+
+        В памяти находится только текущее окно, поэтому длительность расчёта ограничена местом на
+        диске, а не объёмом памяти. После каждого окна сохраняется состояние решателя; при повторном
+        вызове с тем же каталогом и параметрами расчёт продолжается с последнего сохранённого окна.
+        Пока расчёт идёт, записанную часть можно читать без копирования: TransientStore(directory).open().
+
+        Аргументы:
+            directory (str): Каталог для файлов переменных и meta.json.
+            end_time (float): Время окончания расчёта.
+            time_step (float): Шаг между сохраняемыми отсчётами (и шаг интегрирования для бэкенда 'mna').
+            window (float, optional): Длительность окна (по умолчанию STREAM_WINDOW шагов).
+            method (str, optional): Метод solve_ivp или, для бэкенда 'mna', 'trapezoidal' / 'backward_euler'.
+            max_step (float, optional): Максимальный шаг solve_ivp.
+            resume (bool): Продолжить сохранённый в каталоге расчёт, если он есть.
+
+        Возвращает:
+            TransientStore: Хранилище с результатами расчёта.
+        """
+        if self.initial_conditions is None:
+            raise ValueError("Initial conditions are not set")
+        names = self.mna_system.state_variables if self.backend == 'mna' else self.compiled_model.state_variables
+        sample_count = int(round(end_time / time_step)) + 1
+        window_steps = max(1, int(round(window / time_step))) if window else self.STREAM_WINDOW
+        store = TransientStore(directory)
+        if resume and store.exists():
+            store.open(writable=True)
+            if store.names != names or store.time_step != float(time_step) or store.sample_count != sample_count:
+                raise ValueError(f"Store in {directory} belongs to a different run")
+        else:
+            store.create(names, time_step, sample_count)
+
+        if self.backend == 'mna':
+            system = self.mna_system
+            if system.delay_lines and store.count > 1 and not store.complete:
+                raise ValueError("Runs with delay lines cannot be resumed: the line history is not stored")
+            operators = system.step_operators(time_step, method or 'trapezoidal')
+            projection, _ = system.output_projection()
+            state = store.state if store.count else system.initial_state(self.initial_conditions)
+
+            def advance(state, start, steps):
+                values = np.empty((len(names), steps))
+                return values, system.march(state, steps, operators, projection, values, start=start)
+
+            first = projection @ state
+        else:
+            model = self.compiled_model
+            state = store.state if store.count else np.array([self.initial_conditions[name] for name in names], dtype=float)
+            _, options = model_solver_options(model, state, end_time, method, max_step, self.nodes_list.shortest_period())
+
+            def advance(state, start, steps):
+                time = (start + np.arange(steps + 1)) * time_step
+                solution = solve_piecewise(model.rhs, (time[0], time[-1]), state,
+                                           self.nodes_list.breakpoints(time[0], time[-1]), t_eval=time[1:], **options)
+                if not solution.success:
+                    raise RuntimeError(solution.message)
+                return solution.y, solution.y[:, -1]
+
+            first = state
+
+        def run():
+            nonlocal state
+            if not store.count:
+                store.append(np.asarray(first)[:, None], state)
+            while not store.complete:
+                steps = min(window_steps, store.sample_count - store.count)
+                values, state = advance(state, store.count - 1, steps)
+                store.append(values, state)
+            return store
+
+        return self._measure('solve', run)
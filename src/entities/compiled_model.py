@@ -0,0 +1,330 @@
+import numpy as np
+from scipy.linalg import solve_banded
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import ArpackError, LinearOperator, eigs
+from sympy import Matrix, Symbol, lambdify, sympify
+from utilits.banded import band_ordering, to_banded
+
+class CompiledModel:
+    """
+    Скомпилированная правая часть системы ОДУ схемы.
+
+    Символьные уравнения для производных переменных состояния один раз переводятся
+    в функции NumPy (через sympy.lambdify), поэтому решатель на каждом шаге вызывает
+    готовую функцию, а не разбирает и компилирует строку через eval().
+    Дополнительно строится аналитическая матрица Якоби системы.
+
+    Атрибуты:
+        state_variables (list): Имена переменных состояния в порядке вектора y.
+        expressions (list): Символьные выражения для производных переменных состояния.
+        parameters (dict): Символьные параметры модели и их численные значения.
+        input_functions (dict): Параметры-источники, зависящие от времени: имя -> функция f(t).
+        rhs_calls (int): Количество вызовов правой части с момента последнего сброса.
+        jacobian_calls (int): Количество вычислений матрицы Якоби с момента последнего сброса.
+    """
+    def __init__(self, state_variables: list, expressions: list, parameters: dict = None,
+                 input_functions: dict = None) -> None:
+        """
+        Компилирует правую часть и матрицу Якоби системы ОДУ.
+
+        Аргументы:
+            state_variables (list): Имена переменных состояния (например, ['I_L1', 'U_C1']).
+            expressions (list): Выражения для производных в том же порядке, что и state_variables.
+            parameters (dict, optional): Параметры, оставленные в выражениях символьными,
+                и их численные значения.
+            input_functions (dict, optional): Зависимости параметров-источников от времени
+                (например, {'U_V1': Waveform}); значение параметра вычисляется при каждом вызове.
+        """
+        self.state_variables = list(state_variables)
+        self.parameters = dict(parameters or {})
+        self.input_functions = dict(input_functions or {})
+        self.expressions = [sympify(expr) for expr in expressions]
+        time = Symbol('t')
+        states = [Symbol(name) for name in self.state_variables]
+        params = [Symbol(name) for name in self.parameters]
+        self._parameter_values = np.array(list(self.parameters.values()), dtype=float)
+        names = list(self.parameters)
+        self._input_slots = [(names.index(name), function) for name, function in self.input_functions.items()]
+        self._rhs = lambdify((time, states, params), self.expressions, modules='numpy', cse=True)
+        jacobian = Matrix(self.expressions).jacobian(states)
+        self._jacobian = lambdify((time, states, params), jacobian, modules='numpy', cse=True)
+        self.rhs_calls = 0
+        self.jacobian_calls = 0
+
+    @classmethod
+    def from_equations(cls, state_variables: list, equations: list, parameters: dict = None) -> "CompiledModel":
+        """
+        Создаёт модель по уравнениям вида "I_L1' = выражение".
+
+        Аргументы:
+            state_variables (list): Имена переменных состояния в порядке вектора y.
+            equations (list): Строки уравнений для производных переменных состояния.
+            parameters (dict, optional): Символьные параметры и их значения.
+
+        Возвращает:
+            CompiledModel: Скомпилированная модель.
+        """
+        right_parts = {}
+        for eq in equations:
+            left_part = eq[:eq.find("'")]
+            right_parts[left_part.strip()] = eq[eq.find("=")+1:]
+        missing = [name for name in state_variables if name not in right_parts]
+        if missing:
+            raise ValueError(f"No equations for state variables: {', '.join(missing)}")
+        return cls(state_variables, [right_parts[name] for name in state_variables], parameters)
+
+    def set_parameters(self, values: dict) -> None:
+        """
+        Меняет численные значения параметров без повторной компиляции выражений.
+
+        Аргументы:
+            values (dict): Новые значения по именам параметров.
+        """
+        for name, value in values.items():
+            if name not in self.parameters:
+                raise KeyError(f"Unknown parameter: {name}")
+            self.parameters[name] = float(value)
+        self._parameter_values = np.array(list(self.parameters.values()), dtype=float)
+
+    def rhs(self, time: float, y: np.ndarray) -> np.ndarray:
+        """
+        Правая часть системы ОДУ в форме, ожидаемой scipy.integrate.solve_ivp.
+
+        Аргументы:
+            time (float): Текущее время.
+            y (np.ndarray): Вектор переменных состояния.
+
+        Возвращает:
+            np.ndarray: Вектор производных.
+        """
+        self.rhs_calls += 1
+        return np.asarray(self._rhs(time, y, self._parameters_at(time)), dtype=float)
+
+    def jacobian(self, time: float, y: np.ndarray) -> np.ndarray:
+        """
+        Аналитическая матрица Якоби правой части по переменным состояния.
+
+        Аргументы:
+            time (float): Текущее время.
+            y (np.ndarray): Вектор переменных состояния.
+
+        Возвращает:
+            np.ndarray: Матрица Якоби размера (n, n).
+        """
+        self.jacobian_calls += 1
+        return np.asarray(self._jacobian(time, y, self._parameters_at(time)), dtype=float)
+
+    def _parameters_at(self, time: float) -> np.ndarray:
+        """
+        Возвращает значения параметров в момент времени time (источники — по input_functions).
+        """
+        if not self._input_slots:
+            return self._parameter_values
+        values = self._parameter_values.copy()
+        for index, function in self._input_slots:
+            values[index] = function(time)
+        return values
+
+    def reset_counters(self) -> None:
+        """
+        Сбрасывает счётчики вызовов правой части и матрицы Якоби.
+        """
+        self.rhs_calls = 0
+        self.jacobian_calls = 0
+
+    def calls_per_second(self, elapsed: float) -> float:
+        """
+        Возвращает число вызовов правой части в секунду за время решения.
+
+        Аргументы:
+            elapsed (float): Длительность решения в секундах.
+
+        Возвращает:
+            float: Вызовов правой части в секунду.
+        """
+        return self.rhs_calls / elapsed if elapsed > 0 else float('inf')
+
+class LinearModel:
+    """
+    Правая часть линейной системы ОДУ x' = A x + B u с тем же интерфейсом, что у CompiledModel.
+
+    Используется, когда матрицы A и B собраны численно (NumericAssembly) и символьные выражения
+    не нужны: правая часть — одно матричное умножение, матрица Якоби — постоянная матрица A.
+
+    Атрибуты:
+        state_variables (list): Имена переменных состояния в порядке вектора y.
+        A (np.ndarray): Матрица системы.
+        forcing (np.ndarray): Вынуждающая составляющая B u при значениях входов из модели.
+        input_functions (dict): Входы, зависящие от времени: имя -> функция f(t).
+        default_method (str | None): Метод solve_ivp по умолчанию (None — по жёсткости системы).
+        resolve_modes (bool): Ограничивать шаг неявного метода периодами мод (см. BandedLinearModel).
+        rhs_calls (int): Количество вызовов правой части с момента последнего сброса.
+        jacobian_calls (int): Количество вычислений матрицы Якоби с момента последнего сброса.
+    """
+    def __init__(self, model, input_functions: dict = None, resolve_modes: bool = True) -> None:
+        """
+        Создаёт правую часть по линейной модели в пространстве состояний.
+
+        Аргументы:
+            model (StateSpaceModel): Модель с матрицами A, B и значениями входов.
+            input_functions (dict, optional): Зависимости входов от времени (например, {'U_V1': Waveform}).
+            resolve_modes (bool): False — модель линии из звеньев: расчёт методом Radau без разрешения
+                паразитных мод звеньев, как у BandedLinearModel.
+        """
+        self.default_method = None if resolve_modes else 'Radau'
+        self.resolve_modes = resolve_modes
+        self.state_variables = list(model.state_names)
+        self.A = np.ascontiguousarray(model.A)
+        self.forcing = model.B @ model.input_values
+        self.input_functions = dict(input_functions or {})
+        columns = [model.input_names.index(name) for name in self.input_functions]
+        self._constant_forcing = model.B @ np.where(np.isin(np.arange(len(model.input_names)), columns), 0.0, model.input_values)
+        self._input_columns = np.ascontiguousarray(model.B[:, columns])
+        self.rhs_calls = 0
+        self.jacobian_calls = 0
+
+    def rhs(self, time: float, y: np.ndarray) -> np.ndarray:
+        """
+        Правая часть системы ОДУ в форме, ожидаемой scipy.integrate.solve_ivp.
+        """
+        self.rhs_calls += 1
+        if self.input_functions:
+            inputs = np.array([function(time) for function in self.input_functions.values()])
+            return self.A @ y + self._constant_forcing + self._input_columns @ inputs
+        return self.A @ y + self.forcing
+
+    def jacobian(self, time: float, y: np.ndarray) -> np.ndarray:
+        """
+        Матрица Якоби — матрица A системы.
+        """
+        self.jacobian_calls += 1
+        return self.A
+
+    reset_counters = CompiledModel.reset_counters
+    calls_per_second = CompiledModel.calls_per_second
+
+class BandedLinearModel:
+    """
+    Правая часть x' = A x + B u с разреженной ленточной матрицей A (длинные линии, лестничные цепи).
+
+    Переменные состояния переставляются так, чтобы лента A была узкой (band_ordering: исходный
+    порядок или обратный Катхилла — Макки), и решатель работает в этом порядке. Правая часть —
+    разреженное умножение за O(n). Radau и BDF получают разреженную матрицу Якоби, LSODA — ленточную
+    (lband, uband): LU-разложение ленты стоит O(n (lower + upper)²), а не O(n³). По умолчанию
+    выбирается Radau независимо от оценки жёсткости: у линии из многих звеньев есть паразитные
+    колебательные моды звеньев далеко выше полосы сигнала, и явный метод (как и LSODA в режиме
+    Адамса) идёт шагом, обратно пропорциональным числу звеньев, а L-устойчивый Radau их гасит.
+    По той же причине (resolve_modes = False) шаг неявного метода не ограничивается периодом этих
+    мод — только периодом источников и длиной интервала, и число шагов не растёт с числом звеньев.
+    Для выбора шага вычисляются только крайние по модулю собственные числа (ARPACK; самые
+    медленные моды — обратными итерациями через solve_banded).
+
+    Атрибуты:
+        state_variables (list): Имена переменных состояния в порядке вектора y (переставленные).
+        permutation (np.ndarray): Номера переменных исходного порядка: y = x[permutation].
+        A (csr_matrix): Матрица системы в порядке вектора y.
+        lower, upper (int): Число поддиагоналей и наддиагоналей A.
+        banded (np.ndarray): A в ленточном формате LAPACK (см. to_banded).
+        input_functions (dict): Входы, зависящие от времени: имя -> функция f(t).
+        rhs_calls (int): Количество вызовов правой части с момента последнего сброса.
+        jacobian_calls (int): Количество вычислений матрицы Якоби с момента последнего сброса.
+    """
+    default_method = 'Radau'
+    resolve_modes = False
+    MAX_BAND_FRACTION = 0.1
+    MODES = 6
+
+    def __init__(self, A, B, state_names: list, input_names: list, input_values, input_functions: dict = None,
+                 ordering: tuple = None) -> None:
+        """
+        Переставляет переменные и переводит A в ленточный формат.
+
+        Аргументы:
+            A, B: Разреженные матрицы системы (например, из NumericAssembly.eliminate_sparse).
+            state_names (list): Имена переменных состояния в исходном порядке.
+            input_names (list): Имена входов.
+            input_values (array-like): Значения входов.
+            input_functions (dict, optional): Зависимости входов от времени (например, {'U_V1': Waveform}).
+            ordering (tuple, optional): Результат band_ordering(A), если уже вычислен.
+        """
+        self.permutation, self.lower, self.upper = ordering if ordering is not None else band_ordering(A)
+        self.state_variables = [state_names[k] for k in self.permutation]
+        self.A = csr_matrix(A)[self.permutation][:, self.permutation]
+        self.banded = to_banded(self.A, self.lower, self.upper)
+        B = csr_matrix(B)[self.permutation]
+        input_values = np.asarray(input_values, dtype=float)
+        self.input_functions = dict(input_functions or {})
+        columns = [list(input_names).index(name) for name in self.input_functions]
+        self.forcing = B @ input_values
+        self._constant_forcing = B @ np.where(np.isin(np.arange(len(input_names)), columns), 0.0, input_values)
+        self._input_columns = csr_matrix(B[:, columns])
+        self.rhs_calls = 0
+        self.jacobian_calls = 0
+
+    @classmethod
+    def detect(cls, A, B, state_names: list, input_names: list, input_values,
+               input_functions: dict = None) -> 'BandedLinearModel | None':
+        """
+        Строит модель, если после перестановки лента A занимает не больше MAX_BAND_FRACTION строк.
+
+        Возвращает:
+            BandedLinearModel | None: Модель или None, если матрица не ленточная.
+        """
+        ordering = band_ordering(A)
+        if ordering[1] + ordering[2] + 1 > cls.MAX_BAND_FRACTION * A.shape[0]:
+            return None
+        return cls(A, B, state_names, input_names, input_values, input_functions, ordering)
+
+    def rhs(self, time: float, y: np.ndarray) -> np.ndarray:
+        """
+        Правая часть системы ОДУ в форме, ожидаемой scipy.integrate.solve_ivp.
+        """
+        self.rhs_calls += 1
+        if self.input_functions:
+            inputs = np.array([function(time) for function in self.input_functions.values()])
+            return self.A @ y + self._constant_forcing + self._input_columns @ inputs
+        return self.A @ y + self.forcing
+
+    def jacobian(self, time: float, y: np.ndarray) -> csr_matrix:
+        """
+        Матрица Якоби — разреженная матрица A системы.
+        """
+        self.jacobian_calls += 1
+        return self.A
+
+    def banded_jacobian(self, time: float, y: np.ndarray) -> np.ndarray:
+        """
+        Матрица Якоби в ленточном формате для LSODA.
+        """
+        self.jacobian_calls += 1
+        return self.banded
+
+    def jacobian_options(self, method: str) -> dict:
+        """
+        Возвращает параметры solve_ivp для матрицы Якоби: ленточную для LSODA, разреженную для Radau и BDF.
+        """
+        if method == 'LSODA':
+            return {'jac': self.banded_jacobian, 'lband': self.lower, 'uband': self.upper}
+        return {'jac': self.jacobian}
+
+    def eigenvalues(self) -> np.ndarray:
+        """
+        Возвращает MODES самых быстрых и MODES самых медленных мод (для небольших систем — все).
+
+        Если ARPACK не сходится или A вырождена, собственные числа вычисляются полностью.
+        """
+        n = self.A.shape[0]
+        if n <= 4 * self.MODES + 2:
+            return np.linalg.eigvals(self.A.toarray())
+        inverse = LinearOperator((n, n), dtype=float,
+                                 matvec=lambda v: solve_banded((self.lower, self.upper), self.banded, v))
+        try:
+            fast = eigs(self.A, k=self.MODES, which='LM', tol=1e-3, return_eigenvectors=False)
+            slow = eigs(self.A, k=self.MODES, sigma=0.0, OPinv=inverse, which='LM', tol=1e-3,
+                        return_eigenvectors=False)
+        except (ArpackError, np.linalg.LinAlgError, ValueError):
+            return np.linalg.eigvals(self.A.toarray())
+        return np.concatenate([fast, slow])
+
+    reset_counters = CompiledModel.reset_counters
+    calls_per_second = CompiledModel.calls_per_second
@@ -0,0 +1,82 @@
+import numpy as np
+
+class DelayHistory:
+    """
+    История линий без потерь (модель Бержерона) в кольцевых буферах NumPy фиксированного размера.
+
+    В системе MNA у линии с задержкой две неизвестные — токи I1, I2, втекающие в линию в её портах,
+    и два уравнения I_k = V_k / Z0 + h_k. Волна, выходящая из порта k в линию, w_k = V_k / Z0 + I_k
+    через время τ приходит к другому порту m: h_m(t) = -w_k(t - τ). При постоянном шаге Δt момент
+    t - τ лежит между отсчётами с постоянными весами (τ = (q + f) Δt), поэтому для каждого порта
+    хранится q + 2 последних значения w и берётся линейная интерполяция. Память и работа на шаг
+    не зависят ни от длины расчёта, ни от длины линии. До начала расчёта линия считается в
+    установившемся режиме по постоянному току: волны равны начальным.
+
+    Аргументы:
+        lines (dict): MNASystem.delay_lines: ключ -> (узел порта 1, узел порта 2, номер тока I1, Z0, τ).
+        time_step (float): Шаг по времени; не больше наименьшей задержки.
+
+    Атрибуты:
+        rows (np.ndarray): Номера уравнений портов (сначала порты 1 всех линий, затем порты 2).
+        nodes (np.ndarray): Номера потенциалов узлов портов (-1 — земля).
+        conductance (np.ndarray): Проводимости 1 / Z0 портов.
+        lag (np.ndarray): Целая часть задержки в шагах q.
+        fraction (np.ndarray): Дробная часть задержки в шагах f.
+        source (np.ndarray): Номер порта на другом конце линии для каждого порта.
+        buffer (np.ndarray): Кольцевой буфер волн w размера (число портов, max q + 2).
+        step (int): Номер последнего записанного шага (None до start).
+    """
+
+    def __init__(self, lines: dict, time_step: float) -> None:
+        """
+        Вычисляет веса интерполяции и выделяет кольцевой буфер.
+        """
+        first, second, branches, impedances, delays = (np.array(column) for column in zip(*lines.values()))
+        count = len(lines)
+        self.rows = np.concatenate([branches, branches + 1]).astype(int)
+        self.nodes = np.concatenate([first, second]).astype(int)
+        self.conductance = np.tile(1.0 / impedances, 2)
+        ratio = np.tile(delays, 2) / time_step
+        self.lag = np.floor(ratio + 1e-9).astype(int)
+        self.fraction = np.clip(ratio - self.lag, 0.0, 1.0)
+        if (self.lag < 1).any():
+            raise ValueError(f"Time step {time_step} exceeds the shortest line delay {delays.min()}")
+        self.source = np.concatenate([np.arange(count, 2 * count), np.arange(count)])
+        self.buffer = np.zeros((2 * count, int(self.lag.max()) + 2))
+        self.step = None
+
+    def start(self, x: np.ndarray, step: int = 0) -> None:
+        """
+        Начинает историю: заполняет буфер волнами в начальный момент (до него режим постоянный).
+
+        Аргументы:
+            x (np.ndarray): Вектор неизвестных в момент step.
+            step (int): Номер шага начального момента.
+        """
+        self.buffer[:] = self.waves(x)[:, None]
+        self.step = step
+
+    def waves(self, x: np.ndarray) -> np.ndarray:
+        """
+        Возвращает волны w = V / Z0 + I, выходящие из портов, по вектору неизвестных x.
+        """
+        voltages = np.where(self.nodes >= 0, x[self.nodes], 0.0)
+        return self.conductance * voltages + x[self.rows]
+
+    def record(self, step: int, x: np.ndarray) -> None:
+        """
+        Записывает волны портов в момент step на место самого старого отсчёта.
+        """
+        self.buffer[:, step % self.buffer.shape[1]] = self.waves(x)
+        self.step = step
+
+    def sources(self, step: int) -> np.ndarray:
+        """
+        Возвращает источники истории h портов в момент step: волны другого порта в момент step - τ.
+
+        Нужны отсчёты step - q и step - q - 1, поэтому при q >= 1 оба уже записаны и ещё не затёрты.
+        """
+        size = self.buffer.shape[1]
+        latest = step - self.lag
+        return -((1 - self.fraction) * self.buffer[self.source, latest % size]
+                 + self.fraction * self.buffer[self.source, (latest - 1) % size])
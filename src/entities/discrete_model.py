@@ -0,0 +1,203 @@
+import numpy as np
+from scipy.linalg import expm
+
+def zero_order_hold(A: np.ndarray, B: np.ndarray, time_step: float) -> tuple:
+    """
+    Дискретизирует x' = A x + B u с фиксатором нулевого порядка (вход постоянен на шаге).
+
+    Обе матрицы берутся из одной матричной экспоненты расширенной системы:
+    expm([[A, B], [0, 0]] Δt) = [[Φ, Γ], [0, I]], где Φ = e^{AΔt}, Γ = ∫₀^Δt e^{Aτ} dτ B.
+    Такой способ не требует обратимости A (схемы с интегрирующими звеньями).
+
+    Аргументы:
+        A (np.ndarray): Матрица системы размера (n, n).
+        B (np.ndarray): Матрица входов размера (n, m).
+        time_step (float): Шаг дискретизации Δt.
+
+    Возвращает:
+        tuple: (Φ, Γ).
+    """
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    if B.ndim < 2:
+        B = B.reshape(A.shape[0], -1)
+    n, m = B.shape
+    augmented = np.zeros((n + m, n + m))
+    augmented[:n, :n] = A
+    augmented[:n, n:] = B
+    transition = expm(augmented * time_step)
+    return transition[:n, :n], transition[:n, n:]
+
+class DiscreteModel:
+    """
+    Линейная модель схемы в дискретном времени с постоянным шагом Δt:
+
+        x[k+1] = Φ x[k] + Γ u[k],
+        y[k]   = C x[k] + D u[k].
+
+    Для входов, постоянных на шаге, значения в узлах сетки точные (без ошибки метода
+    интегрирования); стоимость шага постоянна и не зависит от жёсткости схемы. Рекурсия
+    продвигается блоками по block шагов: состояния блока — одно матричное умножение
+    [x[k+1]; …; x[k+r]] = P x[k] + M [u[k]; …; u[k+r-1]], где P — степени Φ, а M — нижняя
+    блочно-тёплицева матрица Φ^i Γ, поэтому цикл Python выполняется в block раз реже.
+
+    Атрибуты:
+        Phi, Gamma, C, D (np.ndarray): Матрицы модели.
+        time_step (float): Шаг дискретизации.
+        state_names (list): Имена переменных состояния.
+        input_names (list): Имена входов.
+        output_names (list): Имена выходов.
+        input_values (np.ndarray): Значения источников, заданные в схеме.
+        input_functions (dict): Зависимости входов от времени (для них нужны последовательности inputs).
+    """
+    BLOCK_WIDTH = 256
+
+    def __init__(self, Phi: np.ndarray, Gamma: np.ndarray, C: np.ndarray, D: np.ndarray, time_step: float,
+                 state_names: list, input_names: list, output_names: list, input_values=None,
+                 input_functions: dict = None) -> None:
+        """
+        Инициализирует дискретную модель.
+
+        Аргументы:
+            Phi, Gamma, C, D (np.ndarray): Матрицы модели.
+            time_step (float): Шаг дискретизации.
+            state_names (list): Имена переменных состояния.
+            input_names (list): Имена входов.
+            output_names (list): Имена выходов.
+            input_values (array-like, optional): Значения входов по умолчанию.
+            input_functions (dict, optional): Зависимости входов от времени.
+        """
+        n = len(state_names)
+        self.Phi = np.asarray(Phi, dtype=float).reshape(n, n)
+        self.Gamma = np.asarray(Gamma, dtype=float).reshape(n, len(input_names))
+        self.C = np.asarray(C, dtype=float).reshape(len(output_names), n)
+        self.D = np.asarray(D, dtype=float).reshape(len(output_names), len(input_names))
+        self.time_step = float(time_step)
+        self.state_names = list(state_names)
+        self.input_names = list(input_names)
+        self.output_names = list(output_names)
+        if input_values is None:
+            input_values = np.zeros(self.Gamma.shape[1])
+        self.input_values = np.asarray(input_values, dtype=float)
+        self.input_functions = dict(input_functions or {})
+        self._lifted = {}
+
+    @classmethod
+    def from_state_space(cls, model, time_step: float) -> 'DiscreteModel':
+        """
+        Строит дискретную модель по StateSpaceModel с фиксатором нулевого порядка (zero_order_hold).
+
+        Аргументы:
+            model (StateSpaceModel): Непрерывная модель.
+            time_step (float): Шаг дискретизации.
+
+        Возвращает:
+            DiscreteModel: Дискретная модель с теми же именами и матрицами C, D.
+        """
+        Phi, Gamma = zero_order_hold(model.A, model.B, time_step)
+        return cls(Phi, Gamma, model.C, model.D, time_step, model.state_names, model.input_names,
+                   model.output_names, model.input_values, model.input_functions)
+
+    def lifted(self, block: int) -> tuple:
+        """
+        Возвращает матрицы блока из block шагов (запоминаются по размеру блока).
+
+        Аргументы:
+            block (int): Число шагов в блоке.
+
+        Возвращает:
+            tuple: (Pᵀ размера (n, block·n), Mᵀ размера (block·m, block·n)); блок j матрицы P — Φ^{j+1},
+            блок (j, i) матрицы M — Φ^{j-i} Γ при i <= j.
+        """
+        if block not in self._lifted:
+            n, m = self.Gamma.shape
+            powers = np.empty((block, n, n))
+            responses = np.empty((block, n, m))
+            power = np.eye(n)
+            for j in range(block):
+                responses[j] = power @ self.Gamma
+                power = self.Phi @ power
+                powers[j] = power
+            markov = np.zeros((block * n, block * m))
+            for j in range(block):
+                for i in range(j + 1):
+                    markov[j * n:(j + 1) * n, i * m:(i + 1) * m] = responses[j - i]
+            self._lifted[block] = (np.ascontiguousarray(powers.reshape(block * n, n).T),
+                                   np.ascontiguousarray(markov.T))
+        return self._lifted[block]
+
+    def simulate(self, initial_state, inputs=None, steps: int = None, out: np.ndarray = None,
+                 block: int = None) -> np.ndarray:
+        """
+        Продвигает состояние на сетке с шагом time_step, записывая его в заранее выделенный массив.
+
+        Несколько последовательностей входов (и начальных состояний) считаются одним пакетом:
+        ведущие оси inputs и initial_state согласуются по правилам broadcasting NumPy.
+
+        Аргументы:
+            initial_state (array-like): Состояние x[0] размера (..., n).
+            inputs (array-like, optional): Входы u[0 … steps-1] размера (..., m, steps); по умолчанию —
+                постоянные значения из схемы (тогда нужен steps; при источниках SIN/PULSE/PWL — ValueError).
+            steps (int, optional): Число шагов (без inputs).
+            out (np.ndarray, optional): Массив размера (..., n, steps + 1) для записи результата.
+            block (int, optional): Число шагов в блоке (по умолчанию BLOCK_WIDTH // n).
+
+        Возвращает:
+            np.ndarray: Состояния x[0 … steps] размера (..., n, steps + 1) (out, если он передан).
+        """
+        x0 = np.asarray(initial_state, dtype=float)
+        n, m = self.Gamma.shape
+        if inputs is None:
+            if steps is None:
+                raise ValueError("steps is required when no input sequences are given")
+            if self.input_functions:
+                raise ValueError(f"Inputs {', '.join(self.input_functions)} vary in time; pass input sequences "
+                                 f"(see CircuitSimulation.input_samples)")
+            batch = x0.shape[:-1]
+        else:
+            inputs = np.asarray(inputs, dtype=float)
+            if inputs.ndim < 2 or inputs.shape[-2] != m:
+                raise ValueError(f"Inputs must have shape (..., {m}, steps), got {inputs.shape}")
+            steps = inputs.shape[-1]
+            batch = np.broadcast_shapes(x0.shape[:-1], inputs.shape[:-2])
+        shape = batch + (n, steps + 1)
+        if out is None:
+            out = np.empty(shape)
+        elif out.shape != shape:
+            raise ValueError(f"Output array must have shape {shape}, got {out.shape}")
+        out[..., 0] = x0
+        if not steps:
+            return out
+        block = min(block or max(1, self.BLOCK_WIDTH // max(n, 1)), steps)
+        powers, markov = self.lifted(block)
+        if inputs is None:
+            constant = np.tile(self.input_values, block) @ markov
+        for k in range(0, steps, block):
+            r = min(block, steps - k)
+            states = out[..., k] @ powers[:, :r * n]
+            if inputs is None:
+                states += constant[:r * n]
+            else:
+                chunk = inputs[..., k:k + r].swapaxes(-1, -2).reshape(inputs.shape[:-2] + (r * m,))
+                states += chunk @ markov[:r * m, :r * n]
+            out[..., k + 1:k + r + 1] = states.reshape(batch + (r, n)).swapaxes(-1, -2)
+        return out
+
+    def output(self, states: np.ndarray, inputs=None) -> np.ndarray:
+        """
+        Вычисляет выходы y = C x + D u для траектории состояний.
+
+        Аргументы:
+            states (np.ndarray): Состояния размера (..., n, число отсчётов).
+            inputs (array-like, optional): Входы размера (..., m, число отсчётов) или на один отсчёт меньше
+                (последний вход удерживается); по умолчанию — значения из схемы.
+
+        Возвращает:
+            np.ndarray: Выходы размера (..., число выходов, число отсчётов).
+        """
+        if inputs is None:
+            return self.C @ states + (self.D @ self.input_values)[:, None]
+        inputs = np.asarray(inputs, dtype=float)
+        if inputs.shape[-1] == states.shape[-1] - 1:
+            inputs = np.concatenate([inputs, inputs[..., -1:]], axis=-1)
+        return self.C @ states + self.D @ inputs
@@ -0,0 +1,52 @@
+import numpy as np
+
+class EnsembleResult:
+    """
+    Результат расчёта ансамбля копий схемы с разбросом значений элементов.
+
+    Атрибуты:
+        time (np.ndarray): Моменты времени.
+        states (np.ndarray): Траектории размера (ансамбль, переменная состояния, время).
+        state_names (list): Имена переменных состояния.
+    """
+    def __init__(self, time: np.ndarray, states: np.ndarray, state_names: list) -> None:
+        """
+        Инициализирует результат расчёта ансамбля.
+
+        Аргументы:
+            time (np.ndarray): Моменты времени.
+            states (np.ndarray): Траектории размера (ансамбль, переменная состояния, время).
+            state_names (list): Имена переменных состояния.
+        """
+        self.time = time
+        self.states = states
+        self.state_names = list(state_names)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Возвращает траектории одной переменной состояния размера (ансамбль, время).
+        """
+        return self.states[:, self.state_names.index(name), :]
+
+    def statistics(self, percentiles: tuple = (5, 95)) -> dict:
+        """
+        Вычисляет статистику по ансамблю для каждой переменной состояния и момента времени.
+
+        Аргументы:
+            percentiles (tuple): Процентили, которые нужно вычислить.
+
+        Возвращает:
+            dict: Словарь {имя переменной: {'mean', 'std', 'min', 'max', 'p<процентиль>': массив по времени}}.
+        """
+        summary = {}
+        for i, name in enumerate(self.state_names):
+            values = self.states[:, i, :]
+            summary[name] = {
+                'mean': values.mean(axis=0),
+                'std': values.std(axis=0),
+                'min': values.min(axis=0),
+                'max': values.max(axis=0),
+            }
+            for p, value in zip(percentiles, np.percentile(values, percentiles, axis=0)):
+                summary[name][f"p{p}"] = value
+        return summary
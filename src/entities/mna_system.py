@@ -0,0 +1,415 @@
+import numpy as np
+from scipy.sparse import coo_matrix, csc_matrix, diags
+from scipy.sparse.linalg import splu, spsolve
+from entities.netlist import Netlist
+from entities.delay_history import DelayHistory
+
+class MNASystem:
+    """
+    Разреженная система модифицированного узлового анализа (MNA) схемы:
+
+        C x' + G x = B u,
+
+    где x — потенциалы узлов (кроме земли) и токи через индуктивности, источники напряжения,
+    линии и резисторы нулевого сопротивления, u — значения источников. Линия с задержкой (T)
+    добавляет токи I1_<ключ>, I2_<ключ>, втекающие в её порты, и уравнения I_k = V_k / Z0 + h_k;
+    источники истории h_k добавляются в правую часть на каждом шаге (DelayHistory). Элементы из
+    get_element_nodes_dict записываются (штампуются) прямо в матрицы scipy.sparse, поэтому
+    объём памяти пропорционален числу ненулевых элементов.
+
+    Знаки: напряжение элемента U = V(n+) - V(n-), ток — от n+ к n- через элемент.
+
+    Атрибуты:
+        G, C (csc_matrix): Матрицы проводимостей и ёмкостей/индуктивностей.
+        B (csc_matrix): Матрица входов.
+        unknowns (list): Имена неизвестных (U_<узел> для потенциалов, I_<элемент> для токов).
+        index (dict): Номер неизвестной по имени.
+        node_count (int): Число узлов (первые node_count неизвестных — потенциалы узлов).
+        input_names (list): Имена входов (U_V... и I_I...).
+        input_values (np.ndarray): Значения источников (для SIN/PULSE/PWL — при t = 0).
+        input_functions (dict): Зависимости входов от времени: имя входа -> Waveform.
+        capacitors (dict): Конденсаторы: имя -> (узел+, узел-).
+        inductors (dict): Индуктивности: имя -> номер неизвестной тока.
+        delay_lines (dict): Линии с задержкой: ключ -> (узел порта 1, узел порта 2, номер тока I1, Z0, τ).
+    """
+    GROUND = '0'
+
+    def __init__(self, element_nodes: dict) -> None:
+        """
+        Штампует элементы схемы в разреженные матрицы G, C, B.
+
+        Аргументы:
+            element_nodes (dict): Netlist или словарь элементов из get_element_nodes_dict.
+        """
+        netlist = Netlist.from_nodes_dict(element_nodes)
+        if netlist.switches:
+            raise ValueError("Switches must be resolved with Netlist.configuration before stamping")
+        nodes = []
+        seen = {self.GROUND}
+        for value in netlist.values():
+            for node in value[:2]:
+                if node not in seen:
+                    seen.add(node)
+                    nodes.append(node)
+        self.unknowns = [f"U_{node}" for node in nodes]
+        self.node_count = len(nodes)
+        node_index = {node: i for i, node in enumerate(nodes)}
+        node_index[self.GROUND] = -1
+        self.input_names = []
+        input_values = []
+        self.capacitors = {}
+        self.inductors = {}
+        self.delay_lines = {}
+        g_rows, g_cols, g_vals = [], [], []
+        c_rows, c_cols, c_vals = [], [], []
+        b_rows, b_cols, b_vals = [], [], []
+
+        def stamp(rows, cols, vals, row, col, value):
+            if row >= 0 and col >= 0:
+                rows.append(row)
+                cols.append(col)
+                vals.append(value)
+
+        def stamp_branch(a, b, k):
+            stamp(g_rows, g_cols, g_vals, a, k, 1.0)
+            stamp(g_rows, g_cols, g_vals, b, k, -1.0)
+            stamp(g_rows, g_cols, g_vals, k, a, 1.0)
+            stamp(g_rows, g_cols, g_vals, k, b, -1.0)
+
+        for key, value in netlist.items():
+            a = node_index[value[0]]
+            b = node_index[value[1]]
+            kind = netlist.type_of(key)
+            if kind == Netlist.SUBCIRCUIT or (kind == Netlist.RESISTOR and value[2] == 0):
+                k = len(self.unknowns)
+                self.unknowns.append(f"I_{key.split()[-1]}")
+                stamp_branch(a, b, k)
+            elif kind == Netlist.VOLTAGE_SOURCE:
+                k = len(self.unknowns)
+                self.unknowns.append(f"I_{key}")
+                stamp_branch(a, b, k)
+                stamp(b_rows, b_cols, b_vals, k, len(self.input_names), 1.0)
+                self.input_names.append(f"U_{key}")
+                input_values.append(value[2])
+            elif kind == Netlist.CURRENT_SOURCE:
+                stamp(b_rows, b_cols, b_vals, a, len(self.input_names), -1.0)
+                stamp(b_rows, b_cols, b_vals, b, len(self.input_names), 1.0)
+                self.input_names.append(f"I_{key}")
+                input_values.append(value[2])
+            elif kind == Netlist.CAPACITOR:
+                for row, col, sign in ((a, a, 1.0), (b, b, 1.0), (a, b, -1.0), (b, a, -1.0)):
+                    stamp(c_rows, c_cols, c_vals, row, col, sign * value[2])
+                self.capacitors[key] = (a, b)
+            elif kind == Netlist.INDUCTOR:
+                k = len(self.unknowns)
+                self.unknowns.append(f"I_{key}")
+                stamp_branch(a, b, k)
+                stamp(c_rows, c_cols, c_vals, k, k, -value[2])
+                self.inductors[key] = k
+            elif kind == Netlist.DELAY_LINE:
+                k = len(self.unknowns)
+                self.unknowns += [f"I1_{key}", f"I2_{key}"]
+                for node, branch in ((a, k), (b, k + 1)):
+                    stamp(g_rows, g_cols, g_vals, node, branch, 1.0)
+                    stamp(g_rows, g_cols, g_vals, branch, node, 1.0 / value[2])
+                    stamp(g_rows, g_cols, g_vals, branch, branch, -1.0)
+                self.delay_lines[key] = (a, b, k, value[2], netlist.delay_lines[key])
+            else:
+                conductance = 1.0 / value[2]
+                for row, col, sign in ((a, a, 1.0), (b, b, 1.0), (a, b, -1.0), (b, a, -1.0)):
+                    stamp(g_rows, g_cols, g_vals, row, col, sign * conductance)
+        n = len(self.unknowns)
+        self.index = {name: i for i, name in enumerate(self.unknowns)}
+        self.G = csc_matrix(coo_matrix((g_vals, (g_rows, g_cols)), shape=(n, n)))
+        self.C = csc_matrix(coo_matrix((c_vals, (c_rows, c_cols)), shape=(n, n)))
+        self.B = csc_matrix(coo_matrix((b_vals, (b_rows, b_cols)), shape=(n, len(self.input_names))))
+        self.input_values = np.array(input_values, dtype=float)
+        self.input_functions = netlist.input_waveforms()
+
+    def inputs(self, time) -> np.ndarray:
+        """
+        Возвращает значения входов во всех заданных моментах времени одним векторным вычислением.
+
+        Аргументы:
+            time (array-like): Моменты времени.
+
+        Возвращает:
+            np.ndarray: Массив размера (число входов, число моментов времени).
+        """
+        time = np.asarray(time, dtype=float)
+        values = np.repeat(self.input_values[:, None], time.size, axis=1)
+        for name, function in self.input_functions.items():
+            values[self.input_names.index(name)] = function(time)
+        return values
+
+    @property
+    def state_variables(self) -> list:
+        """
+        Имена переменных состояния: токи индуктивностей (I_L...) и напряжения конденсаторов (U_C...).
+        """
+        return [f"I_{key}" for key in self.inductors] + [f"U_{key}" for key in self.capacitors]
+
+    def state_projection(self) -> csc_matrix:
+        """
+        Возвращает разреженную матрицу P, выделяющую переменные состояния из вектора неизвестных: s = P x.
+        """
+        rows, cols, vals = [], [], []
+        for row, k in enumerate(self.inductors.values()):
+            rows.append(row)
+            cols.append(k)
+            vals.append(1.0)
+        for row, (a, b) in enumerate(self.capacitors.values(), start=len(self.inductors)):
+            for node, sign in ((a, 1.0), (b, -1.0)):
+                if node >= 0:
+                    rows.append(row)
+                    cols.append(node)
+                    vals.append(sign)
+        return csc_matrix(coo_matrix((vals, (rows, cols)), shape=(len(self.state_variables), len(self.unknowns))))
+
+    def operating_point(self, gmin: float = 1e-12) -> dict:
+        """
+        Рассчитывает рабочую точку по постоянному току одной разреженной линейной системой.
+
+        Производные равны нулю, поэтому конденсаторы работают как разрыв, а индуктивности — как
+        короткое замыкание, линия с задержкой — тоже короткое замыкание (V1 = V2, I1 = -I2).
+        К каждому узлу добавляется малая проводимость gmin на землю, чтобы
+        узлы, соединённые только через конденсаторы, не делали систему вырожденной.
+
+        Аргументы:
+            gmin (float): Проводимость от каждого узла на землю.
+
+        Возвращает:
+            dict: Значения неизвестных (U_<узел>, I_<элемент>) и переменных состояния (I_L..., U_C...).
+        """
+        diagonal = np.zeros(len(self.unknowns))
+        diagonal[:self.node_count] = gmin
+        matrix = self._static_matrix() + diags(diagonal)
+        x = np.atleast_1d(spsolve(csc_matrix(matrix), self.B @ self.input_values))
+        result = dict(zip(self.unknowns, x.tolist()))
+        result.update(zip(self.state_variables, (self.state_projection() @ x).tolist()))
+        return result
+
+    def _static_matrix(self) -> csc_matrix:
+        """
+        Возвращает G, в которой уравнения портов линий с задержкой заменены уравнениями по постоянному
+        току: V1 - V2 = 0 и I1 + I2 = 0.
+        """
+        if not self.delay_lines:
+            return self.G
+        G = self.G.tocoo()
+        branches = [k for _, _, k, _, _ in self.delay_lines.values()]
+        keep = ~np.isin(G.row, branches + [k + 1 for k in branches])
+        rows, cols, vals = list(G.row[keep]), list(G.col[keep]), list(G.data[keep])
+        for a, b, k, _, _ in self.delay_lines.values():
+            for node, sign in ((a, 1.0), (b, -1.0)):
+                if node >= 0:
+                    rows.append(k)
+                    cols.append(node)
+                    vals.append(sign)
+            rows += [k + 1, k + 1]
+            cols += [k, k + 1]
+            vals += [1.0, 1.0]
+        return csc_matrix(coo_matrix((vals, (rows, cols)), shape=G.shape))
+
+    def initial_state(self, initial_conditions: dict = None) -> np.ndarray:
+        """
+        Находит согласованный начальный вектор неизвестных по начальным условиям для L и C.
+
+        Конденсаторы заменяются источниками напряжения U_C(0), токи индуктивностей фиксируются
+        равными I_L(0), и решается одна разреженная линейная система. Линии с задержкой в начальный
+        момент находятся в установившемся режиме и работают как короткое замыкание. Источниками
+        заменяются только конденсаторы дерева (_capacitor_tree): конденсатор, замыкающий контур из
+        конденсаторов и источников напряжения (параллельные конденсаторы, конденсатор параллельно
+        источнику), сделал бы систему вырожденной; его напряжение определяется остальными.
+
+        Аргументы:
+            initial_conditions (dict, optional): Значения переменных состояния (I_L..., U_C...); по умолчанию нули.
+
+        Возвращает:
+            np.ndarray: Вектор неизвестных при t = 0.
+        """
+        initial_conditions = initial_conditions or {}
+        n = len(self.unknowns)
+        static = self._static_matrix()
+        tree = self._capacitor_tree(static)
+        m = len(tree)
+        G = static.tocoo()
+        inductor_rows = set(self.inductors.values())
+        keep = ~np.isin(G.row, list(inductor_rows))
+        rows, cols, vals = list(G.row[keep]), list(G.col[keep]), list(G.data[keep])
+        rhs = np.zeros(n + m)
+        rhs[:n] = self.B @ self.input_values
+        for key, k in self.inductors.items():
+            rows.append(k)
+            cols.append(k)
+            vals.append(1.0)
+            rhs[k] = initial_conditions.get(f"I_{key}", 0.0)
+        for j, key in enumerate(tree, start=n):
+            a, b = self.capacitors[key]
+            for node, sign in ((a, 1.0), (b, -1.0)):
+                if node >= 0:
+                    rows += [node, j]
+                    cols += [j, node]
+                    vals += [sign, sign]
+            rhs[j] = initial_conditions.get(f"U_{key}", 0.0)
+        matrix = csc_matrix(coo_matrix((vals, (rows, cols)), shape=(n + m, n + m)))
+        x = np.atleast_1d(spsolve(matrix, rhs))[:n]
+        if not np.all(np.isfinite(x)):
+            raise ValueError("Initial conditions do not determine a consistent initial state "
+                             "(e.g. inductors in series or in series with a current source)")
+        return x
+
+    def _capacitor_tree(self, static: csc_matrix) -> list:
+        """
+        Выбирает конденсаторы, напряжения которых можно задать независимо (дерево конденсаторов).
+
+        Узлы объединяются (система непересекающихся множеств) уравнениями ветвей, задающими
+        разность потенциалов: источники напряжения, резисторы нулевого сопротивления, линии по
+        постоянному току. Затем конденсатор берётся, только если его узлы ещё не связаны.
+
+        Аргументы:
+            static (csc_matrix): Матрица G по постоянному току (_static_matrix).
+
+        Возвращает:
+            list: Ключи выбранных конденсаторов в порядке self.capacitors.
+        """
+        parent = list(range(self.node_count + 1))
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        def union(a, b):
+            a, b = find(a), find(b)
+            if a == b:
+                return False
+            parent[a] = b
+            return True
+
+        ground = self.node_count
+        rows = static.tocsr()
+        inductor_rows = set(self.inductors.values())
+        for k in range(self.node_count, len(self.unknowns)):
+            if k in inductor_rows:
+                continue
+            nodes = [node for node in rows.indices[rows.indptr[k]:rows.indptr[k + 1]] if node < self.node_count]
+            if len(nodes) == 1:
+                nodes.append(ground)
+            for node in nodes[1:]:
+                union(nodes[0], node)
+        return [key for key, (a, b) in self.capacitors.items()
+                if union(a if a >= 0 else ground, b if b >= 0 else ground)]
+
+    def step_operators(self, time_step: float, method: str = 'trapezoidal') -> tuple:
+        """
+        Факторизует матрицу шага по времени один раз для всего расчёта.
+
+        Уравнения портов линий с задержкой входят в G, поэтому матрица шага от истории линий не
+        зависит; для самой истории создаётся DelayHistory (шаг не должен превышать задержку линий).
+
+        Аргументы:
+            time_step (float): Шаг по времени.
+            method (str): 'trapezoidal' (метод трапеций) или 'backward_euler' (неявный метод Эйлера).
+
+        Возвращает:
+            tuple: (LU-разложение левой части, матрица правой части, вектор B u, шаг по времени,
+                    вес входа в начале шага, история линий DelayHistory или None) для march.
+        """
+        if method == 'trapezoidal':
+            lhs = self.C / time_step + self.G / 2
+            rhs_matrix = (self.C / time_step - self.G / 2).tocsr()
+            weight = 0.5
+        elif method == 'backward_euler':
+            lhs = self.C / time_step + self.G
+            rhs_matrix = (self.C / time_step).tocsr()
+            weight = 0.0
+        else:
+            raise ValueError(f"Unknown integration method: {method}")
+        history = DelayHistory(self.delay_lines, time_step) if self.delay_lines else None
+        return splu(csc_matrix(lhs)), rhs_matrix, self.B @ self.input_values, time_step, weight, history
+
+    def march(self, x: np.ndarray, steps: int, operators: tuple, projection, out: np.ndarray, start: int = 0) -> np.ndarray:
+        """
+        Выполняет steps шагов по времени, записывая projection @ x после каждого шага в столбцы out.
+
+        Значения источников, зависящих от времени, вычисляются заранее для всех шагов одним
+        векторным вызовом (inputs) и взвешиваются по методу: среднее начала и конца шага для
+        метода трапеций, конец шага для неявного метода Эйлера. Источники истории линий с задержкой
+        взвешиваются так же; после шага волны портов записываются в кольцевой буфер. Если история не
+        продолжает предыдущий вызов (номер шага не совпадает с start), она начинается заново.
+
+        Аргументы:
+            x (np.ndarray): Вектор неизвестных в начале.
+            steps (int): Число шагов.
+            operators (tuple): Результат step_operators.
+            projection: Разреженная матрица выбора выходов.
+            out (np.ndarray): Массив размера (число выходов, steps) для записи.
+            start (int): Номер шага, с которого начинается продвижение (x — решение в момент start * шаг).
+
+        Возвращает:
+            np.ndarray: Вектор неизвестных после последнего шага.
+        """
+        lu, rhs_matrix, forcing, time_step, weight, history = operators
+        if self.input_functions:
+            inputs = self.inputs((start + np.arange(steps + 1)) * time_step)
+            inputs = weight * inputs[:, :-1] + (1 - weight) * inputs[:, 1:]
+            B = self.B.tocsr()
+        if history is not None:
+            if history.step != start:
+                history.start(x, start)
+            previous = history.sources(start)
+        for k in range(steps):
+            if self.input_functions:
+                forcing = B @ inputs[:, k]
+            right = rhs_matrix @ x + forcing
+            if history is not None:
+                current = history.sources(start + k + 1)
+                right[history.rows] -= weight * previous + (1 - weight) * current
+                previous = current
+            x = lu.solve(right)
+            if history is not None:
+                history.record(start + k + 1, x)
+            out[:, k] = projection @ x
+        return x
+
+    def output_projection(self, outputs: list = None) -> tuple:
+        """
+        Возвращает матрицу выбора выходов и их имена.
+
+        Аргументы:
+            outputs (list, optional): Имена неизвестных; по умолчанию — переменные состояния.
+
+        Возвращает:
+            tuple: (разреженная матрица выбора в формате CSR, список имён выходов).
+        """
+        if outputs is None:
+            return self.state_projection().tocsr(), self.state_variables
+        projection = coo_matrix((np.ones(len(outputs)), (np.arange(len(outputs)), [self.index[name] for name in outputs])),
+                                shape=(len(outputs), len(self.unknowns)))
+        return projection.tocsr(), list(outputs)
+
+    def transient(self, end_time: float, time_step: float, initial_conditions: dict = None,
+                  method: str = 'trapezoidal', outputs: list = None) -> tuple:
+        """
+        Рассчитывает переходный процесс с постоянным шагом, используя одну LU-факторизацию на весь расчёт.
+
+        Аргументы:
+            end_time (float): Время окончания расчёта.
+            time_step (float): Шаг по времени.
+            initial_conditions (dict, optional): Начальные значения переменных состояния.
+            method (str): 'trapezoidal' (метод трапеций) или 'backward_euler' (неявный метод Эйлера).
+            outputs (list, optional): Имена неизвестных для записи; по умолчанию — переменные состояния.
+
+        Возвращает:
+            tuple: (массив моментов времени, массив значений размера (число выходов, число моментов), имена выходов).
+        """
+        operators = self.step_operators(time_step, method)
+        projection, outputs = self.output_projection(outputs)
+        steps = int(round(end_time / time_step))
+        x = self.initial_state(initial_conditions)
+        values = np.empty((len(outputs), steps + 1))
+        values[:, 0] = projection @ x
+        self.march(x, steps, operators, projection, values[:, 1:])
+        return np.arange(steps + 1) * time_step, values, list(outputs)
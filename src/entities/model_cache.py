@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import pickle
+
+class ModelCache:
+    """
+    Дисковый кэш производных моделей схемы, ключ которого — хэш топологии.
+
+    Ключ строится по соединениям элементов (имя элемента с префиксом типа и его узлы) без
+    значений R, L, C и источников. Поэтому схема с той же топологией, но другими значениями
+    элементов находит в кэше уже выведенные символьные уравнения и сразу переходит к численному
+    расчёту. Записи вытесняются по принципу LRU при превышении числа записей или объёма.
+
+    Атрибуты:
+        directory (str): Каталог кэша.
+        max_entries (int): Максимальное число записей.
+        max_bytes (int): Максимальный суммарный объём записей в байтах.
+        hits (int): Число попаданий в кэш.
+        misses (int): Число промахов.
+    """
+    VERSION = 1
+    SUFFIX = '.pkl'
+
+    def __init__(self, directory: str = None, max_entries: int = 64, max_bytes: int = 256 * 2**20) -> None:
+        """
+        Инициализирует кэш.
+
+        Аргументы:
+            directory (str, optional): Каталог кэша (по умолчанию ~/.cache/apec).
+            max_entries (int): Максимальное число записей.
+            max_bytes (int): Максимальный суммарный объём записей в байтах.
+        """
+        self.directory = directory or os.path.join(os.path.expanduser("~"), ".cache", "apec")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def topology_key(cls, nodes_list: dict, kind: str = 'state_equations') -> str:
+        """
+        Вычисляет ключ кэша по топологии схемы.
+
+        Аргументы:
+            nodes_list (dict): Словарь элементов из get_element_nodes_dict.
+            kind (str): Вид сохраняемой модели.
+
+        Возвращает:
+            str: Шестнадцатеричный SHA-256 хэш.
+        """
+        topology = [[key, value[0], value[1]] for key, value in nodes_list.items()]
+        payload = json.dumps([cls.VERSION, kind, topology], separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """
+        Возвращает путь к файлу записи.
+        """
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str):
+        """
+        Возвращает модель по ключу или None, если её нет в кэше.
+
+        Запись, которую не удаётся прочитать (обрезанный или повреждённый файл, другая версия
+        классов), удаляется и считается промахом: модель будет построена и сохранена заново.
+
+        Аргументы:
+            key (str): Ключ кэша.
+
+        Возвращает:
+            object | None: Сохранённая модель.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                model = pickle.load(file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            self.misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        os.utime(path)
+        self.hits += 1
+        return model
+
+    def put(self, key: str, model) -> None:
+        """
+        Сохраняет модель в кэш и вытесняет давно не использованные записи.
+
+        Аргументы:
+            key (str): Ключ кэша.
+            model: Сохраняемая модель (должна сериализоваться pickle).
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as file:
+            pickle.dump(model, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        self._evict()
+
+    def _entries(self) -> list:
+        """
+        Возвращает записи кэша в виде (время последнего доступа, размер, путь), от старых к новым.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SUFFIX):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(self.directory, name)))
+        return sorted(entries)
+
+    def _evict(self) -> None:
+        """
+        Удаляет самые давно использованные записи, пока кэш не уложится в ограничения.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            os.remove(path)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи кэша и сбрасывает счётчики.
+        """
+        for _, _, path in self._entries():
+            os.remove(path)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Возвращает статистику кэша.
+
+        Возвращает:
+            dict: Число попаданий, промахов, записей и их суммарный объём в байтах.
+        """
+        entries = self._entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
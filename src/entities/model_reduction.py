@@ -0,0 +1,227 @@
+import numpy as np
+from scipy.linalg import solve_continuous_lyapunov, lu_factor, lu_solve, svd, eigh
+from entities.state_space import StateSpaceModel
+
+def model_outputs(model: StateSpaceModel, time, states: np.ndarray, input_functions: dict = None) -> np.ndarray:
+    """
+    Вычисляет выходы y = C x + D u(t) модели для траектории x с учётом зависимостей входов от времени.
+
+    Аргументы:
+        model (StateSpaceModel): Модель.
+        time (array-like): Моменты времени.
+        states (np.ndarray): Значения переменных состояния размера (n, число моментов).
+        input_functions (dict, optional): Зависимости входов от времени по именам входов.
+
+    Возвращает:
+        np.ndarray: Выходы размера (число выходов, число моментов).
+    """
+    time = np.atleast_1d(np.asarray(time, dtype=float))
+    inputs = np.repeat(np.asarray(model.input_values, dtype=float)[:, None], time.size, axis=1)
+    for name, function in (input_functions or {}).items():
+        inputs[model.input_names.index(name)] = function(time)
+    return model.C @ states + model.D @ inputs
+
+class ReducedModel(StateSpaceModel):
+    """
+    Модель пониженного порядка z' = Ar z + Br u, y = Cr z + Dr u, приближающая исходную модель.
+
+    Переменные z не имеют физического смысла; выходы y — те же, что у исходной модели (по умолчанию
+    переменные состояния схемы). Состояние исходной модели восстанавливается как x ≈ basis z,
+    начальное состояние переносится как z0 = projection x0. Так как это StateSpaceModel, модель
+    подходит для simulate, frequency_response и LinearModel.
+
+    Атрибуты:
+        original (StateSpaceModel): Исходная модель.
+        basis (np.ndarray): Матрица перехода к исходным переменным размера (n, r).
+        projection (np.ndarray): Проекция исходного состояния размера (r, n).
+        method (str): Способ понижения порядка ('balanced' или 'krylov').
+        error_bound (float | None): Гарантированная оценка ошибки ‖H - Hr‖∞ (для 'balanced').
+        hankel_singular_values (np.ndarray | None): Сингулярные числа Ганкеля (для 'balanced').
+    """
+    def __init__(self, A, B, C, D, original: StateSpaceModel, basis: np.ndarray, projection: np.ndarray,
+                 method: str, error_bound: float = None, hankel_singular_values: np.ndarray = None) -> None:
+        """
+        Создаёт модель пониженного порядка по её матрицам и матрицам перехода.
+        """
+        super().__init__(A, B, C, D, [f"z{k + 1}" for k in range(np.shape(A)[0])], original.input_names,
+                         original.output_names, original.input_values, original.input_functions)
+        self.original = original
+        self.basis = basis
+        self.projection = projection
+        self.method = method
+        self.error_bound = error_bound
+        self.hankel_singular_values = hankel_singular_values
+
+    @property
+    def order(self) -> int:
+        """
+        Порядок модели.
+        """
+        return self.A.shape[0]
+
+    def reduce_state(self, initial_state) -> np.ndarray:
+        """
+        Переносит состояние исходной модели в переменные z.
+        """
+        return self.projection @ np.asarray(initial_state, dtype=float)
+
+    def outputs(self, time, states: np.ndarray, input_functions: dict = None) -> np.ndarray:
+        """
+        Вычисляет выходы y = Cr z + Dr u(t) для траектории z (см. model_outputs).
+        """
+        return model_outputs(self, time, states, input_functions)
+
+class OutputTrajectory:
+    """
+    Плотный выход решателя в выходных переменных модели: y(t) = C x(t) + D u(t).
+    """
+    def __init__(self, model: StateSpaceModel, solution, input_functions: dict = None) -> None:
+        self.model = model
+        self.solution = solution
+        self.input_functions = input_functions
+
+    def __call__(self, time) -> np.ndarray:
+        time = np.asarray(time, dtype=float)
+        states = np.asarray(self.solution(np.atleast_1d(time))).reshape(self.model.A.shape[0], -1)
+        values = model_outputs(self.model, time, states, self.input_functions)
+        return values[:, 0] if time.ndim == 0 else values
+
+def _square_root(gramian: np.ndarray) -> np.ndarray:
+    """
+    Возвращает множитель L с L Lᵀ = gramian для неотрицательно определённой матрицы.
+    """
+    values, vectors = eigh((gramian + gramian.T) / 2)
+    return vectors * np.sqrt(np.clip(values, 0.0, None))
+
+def balanced_truncation(model: StateSpaceModel, order: int = None, tolerance: float = None,
+                        match_dc: bool = False) -> ReducedModel:
+    """
+    Понижает порядок устойчивой модели сбалансированным усечением (алгоритм квадратного корня).
+
+    Грамианы управляемости P и наблюдаемости Q — решения уравнений Ляпунова A P + P Aᵀ = -B Bᵀ
+    и Aᵀ Q + Q A = -Cᵀ C; сингулярные числа Ганкеля σ — сингулярные числа Lqᵀ Lp. Сохраняются r
+    наибольших σ, ошибка частотной характеристики не больше 2 Σ_{i>r} σ_i. При match_dc=True
+    отброшенные состояния не обнуляются, а исключаются в установившемся режиме (сингулярное
+    возмущение): оценка ошибки та же, а статический коэффициент передачи совпадает с исходным.
+
+    Аргументы:
+        model (StateSpaceModel): Исходная модель (все собственные числа A в левой полуплоскости).
+        order (int, optional): Порядок модели.
+        tolerance (float, optional): Допустимая ошибка ‖H - Hr‖∞; порядок — наименьший, при котором
+            оценка ошибки не больше tolerance.
+        match_dc (bool): Сохранить статический коэффициент передачи.
+
+    Возвращает:
+        ReducedModel: Модель пониженного порядка.
+    """
+    A, B, C, D = model
+    if np.max(np.linalg.eigvals(A).real) >= 0:
+        raise ValueError("Balanced truncation needs a stable model (eigenvalues of A in the left half-plane); use 'krylov'")
+    Lp = _square_root(solve_continuous_lyapunov(A, -B @ B.T))
+    Lq = _square_root(solve_continuous_lyapunov(A.T, -C.T @ C))
+    U, sigma, Vt = svd(Lq.T @ Lp)
+    minimal = int(np.sum(sigma > sigma[0] * 1e-12)) if sigma.size and sigma[0] > 0 else 0
+    tails = np.concatenate([np.cumsum(sigma[:minimal][::-1])[::-1], [0.0]])
+    if order is None:
+        if tolerance is None:
+            raise ValueError("Either order or tolerance is required")
+        order = int(np.argmax(2 * tails <= tolerance))
+    order = min(int(order), minimal)
+    scale = 1.0 / np.sqrt(sigma[:minimal])
+    basis = Lp @ Vt[:minimal].T * scale
+    projection = (U[:, :minimal] * scale).T @ Lq.T
+    Ab, Bb, Cb = projection @ A @ basis, projection @ B, C @ basis
+    if match_dc and order < minimal:
+        keep, drop = slice(0, order), slice(order, minimal)
+        correction = np.linalg.solve(Ab[drop, drop], np.hstack([Ab[drop, keep], Bb[drop]]))
+        Ar = Ab[keep, keep] - Ab[keep, drop] @ correction[:, :order]
+        Br = Bb[keep] - Ab[keep, drop] @ correction[:, order:]
+        Cr = Cb[:, keep] - Cb[:, drop] @ correction[:, :order]
+        Dr = D - Cb[:, drop] @ correction[:, order:]
+    else:
+        Ar, Br, Cr, Dr = Ab[:order, :order], Bb[:order], Cb[:, :order], D
+    return ReducedModel(Ar, Br, Cr, Dr, model, basis[:, :order], projection[:order], 'balanced',
+                        error_bound=2 * tails[order], hankel_singular_values=sigma[:minimal])
+
+def krylov_reduction(model: StateSpaceModel, order: int, expansion_point: float = 0.0,
+                     energy=None) -> ReducedModel:
+    """
+    Понижает порядок модели согласованием моментов в подпространстве Крылова (в духе PRIMA).
+
+    Блочный алгоритм Арнольди строит базис V подпространства K((A - s0 I)⁻¹, (A - s0 I)⁻¹ B) по одной
+    LU-факторизации, ортонормированный в энергетическом скалярном произведении <x, y> = xᵀ E y,
+    E = diag(L, C) (Vᵀ E V = I), и модель проецируется конгруэнтно: Ar = Vᵀ E A V, Br = Vᵀ E B,
+    Cr = C V. У пассивной схемы E A + Aᵀ E ≤ 0 (энергия L и C не растёт без источников), поэтому
+    Ar + Arᵀ ≤ 0 и модель пониженного порядка устойчива при любом порядке; одностороннее
+    Vᵀ A V этого не гарантирует. Первые order / (число входов) моментов H(s) в точке s0 совпадают
+    с исходными; при s0 = 0 совпадает статический коэффициент передачи. Гарантированной оценки
+    ошибки нет; модель с собственными числами Ar в правой полуплоскости отклоняется.
+
+    Аргументы:
+        model (StateSpaceModel): Исходная модель.
+        order (int): Порядок модели.
+        expansion_point (float): Точка разложения s0 (рад/с); ненулевая нужна, если A вырождена.
+        energy (array-like, optional): Диагональ E — индуктивности и ёмкости переменных состояния
+            (CircuitSimulation.reduce задаёт её по схеме); по умолчанию E = I.
+
+    Возвращает:
+        ReducedModel: Модель пониженного порядка.
+    """
+    A, B, C, D = model
+    n = A.shape[0]
+    weights = np.ones(n) if energy is None else np.asarray(energy, dtype=float).reshape(n)
+    if np.any(weights <= 0):
+        raise ValueError("Energy weights must be positive")
+    try:
+        factor = lu_factor(A - expansion_point * np.eye(n), check_finite=True)
+    except (ValueError, np.linalg.LinAlgError) as error:
+        raise ValueError("A - s0 I is singular; choose a nonzero expansion_point") from error
+    if np.any(np.abs(np.diag(factor[0])) < 1e-14 * max(1.0, np.abs(A).max())):
+        raise ValueError("A - s0 I is singular; choose a nonzero expansion_point")
+    order = min(int(order), n)
+    basis = np.zeros((n, order))
+    size = 0
+    block = lu_solve(factor, B)
+    while size < order and block.shape[1]:
+        next_block = []
+        for vector in block.T:
+            scale = np.sqrt(vector @ (weights * vector))
+            for _ in range(2):
+                vector = vector - basis[:, :size] @ (basis[:, :size].T @ (weights * vector))
+            norm = np.sqrt(vector @ (weights * vector))
+            if norm > 1e-10 * scale and size < order:
+                basis[:, size] = vector / norm
+                next_block.append(basis[:, size])
+                size += 1
+        block = lu_solve(factor, np.array(next_block).T) if next_block else np.empty((n, 0))
+    basis = basis[:, :size]
+    projection = basis.T * weights
+    Ar = projection @ A @ basis
+    eigenvalues = np.linalg.eigvals(Ar)
+    if eigenvalues.size and eigenvalues.real.max() > 1e-9 * max(1.0, np.abs(eigenvalues).max()):
+        raise ValueError(f"Krylov projection is unstable (max Re λ = {eigenvalues.real.max():.3g}); "
+                         f"pass energy weights diag(L, C) or use 'balanced'")
+    return ReducedModel(Ar, projection @ B, C @ basis, D, model, basis, projection, 'krylov')
+
+def reduce_model(model: StateSpaceModel, order: int = None, tolerance: float = None, method: str = 'balanced',
+                 **options) -> ReducedModel:
+    """
+    Понижает порядок модели выбранным способом.
+
+    Аргументы:
+        model (StateSpaceModel): Исходная модель.
+        order (int, optional): Порядок модели.
+        tolerance (float, optional): Допустимая ошибка ‖H - Hr‖∞ (только для 'balanced').
+        method (str): 'balanced' — сбалансированное усечение, 'krylov' — согласование моментов.
+        options: match_dc для 'balanced', expansion_point и energy для 'krylov'.
+
+    Возвращает:
+        ReducedModel: Модель пониженного порядка.
+    """
+    if method == 'balanced':
+        return balanced_truncation(model, order, tolerance, **options)
+    if method == 'krylov':
+        if order is None:
+            raise ValueError("Krylov reduction needs an explicit order")
+        return krylov_reduction(model, order, **options)
+    raise ValueError(f"Unknown reduction method: {method}")
@@ -0,0 +1,333 @@
+import copy
+from collections import defaultdict
+from collections.abc import Mapping
+import numpy as np
+from entities.waveform import Waveform
+from entities.switch import Switch
+from entities.transmission_line import TransmissionLine, DelayLine
+
+class Netlist(Mapping):
+    """
+    Компактное представление схемы в массивах NumPy, построенное один раз из circuit.elements.
+
+    Тип элемента берётся из PREFIX элемента PySpice (или первой буквы имени SPICE), а не из
+    поиска подстроки в имени, поэтому имена вроде RLOAD или Line X1 классифицируются верно.
+    Элементы между парой узлов находятся по хэш-индексу за O(1).
+
+    Для совместимости Netlist ведёт себя как словарь get_element_nodes_dict: ключ — имя элемента
+    ("Line X1" для подцепей), значение — [узел+, узел-, значение] (для подцепей — [узел+, узел-]).
+    Линия с задержкой (элемент T) хранится как двухполюсник между узлами своих портов со значением Z0.
+
+    Атрибуты:
+        keys_list (list): Ключи элементов в порядке схемы.
+        node_names (list): Имена узлов; номер узла — индекс в этом списке.
+        node_index (dict): Номер узла по имени.
+        node_ids (np.ndarray): Номера узлов элементов размера (число элементов, 2).
+        type_codes (np.ndarray): Коды типов элементов (RESISTOR, INDUCTOR, ...).
+        element_values (np.ndarray): Значения элементов (NaN для подцепей).
+        index (dict): Номер элемента по ключу и по имени SPICE.
+        pairs (dict): Номера элементов по неупорядоченной паре номеров узлов.
+        waveforms (dict): Зависимости от времени источников SIN/PULSE/PWL по ключу элемента;
+            в element_values для них записано значение при t = 0.
+        switches (dict): Ключи (подцепи Switch) по ключу элемента; порядок задаёт биты маски
+            состояния ключей (бит i — i-й ключ замкнут).
+        delay_lines (dict): Время распространения τ линий с задержкой (элементов T) по ключу элемента;
+            в element_values для них записано волновое сопротивление Z0.
+        line_sections (set): Ключи элементов звеньев распределённых линий (TransmissionLine).
+    """
+    RESISTOR, INDUCTOR, CAPACITOR, VOLTAGE_SOURCE, CURRENT_SOURCE, SUBCIRCUIT, SWITCH, DELAY_LINE = range(8)
+    PREFIXES = {'R': RESISTOR, 'L': INDUCTOR, 'C': CAPACITOR, 'V': VOLTAGE_SOURCE, 'I': CURRENT_SOURCE, 'X': SUBCIRCUIT,
+                'T': DELAY_LINE}
+    VALUE_ATTRIBUTES = {'R': 'resistance', 'L': 'inductance', 'C': 'capacitance', 'V': 'dc_value', 'I': 'dc_value',
+                        'T': 'impedance'}
+    SUBCIRCUIT_KEY = "Line {}"
+    SWITCH_KEY = "Switch {}"
+
+    def __init__(self, keys: list, nodes: list, types: list, values: list, waveforms: dict = None,
+                 switches: dict = None, delay_lines: dict = None, line_sections: set = None) -> None:
+        """
+        Строит массивы и индексы по списку элементов.
+
+        Аргументы:
+            keys (list): Ключи элементов.
+            nodes (list): Пары имён узлов элементов.
+            types (list): Коды типов элементов.
+            values (list): Значения элементов (None для подцепей).
+            waveforms (dict, optional): Зависимости от времени источников по ключу элемента.
+            switches (dict, optional): Определения ключей (Switch) по ключу элемента.
+            delay_lines (dict, optional): Время распространения линий с задержкой по ключу элемента.
+            line_sections (set, optional): Ключи элементов звеньев распределённых линий.
+        """
+        self.keys_list = list(keys)
+        self.node_index = {}
+        ids = [self.node_index.setdefault(node, len(self.node_index)) for pair in nodes for node in pair]
+        self.node_names = list(self.node_index)
+        self.node_ids = np.array(ids, dtype=np.int32).reshape(-1, 2)
+        self.type_codes = np.array(types, dtype=np.int8)
+        self.element_values = np.array([np.nan if value is None else value for value in values], dtype=float)
+        self.index = {}
+        for i, key in enumerate(self.keys_list):
+            self.index[key] = i
+            if ' ' in key:
+                self.index.setdefault(key.split()[-1], i)
+        self.pairs = defaultdict(list)
+        ordered = np.sort(self.node_ids, axis=1)
+        for i, pair in enumerate(zip(ordered[:, 0].tolist(), ordered[:, 1].tolist())):
+            self.pairs[pair].append(i)
+        self.pairs = {pair: tuple(elements) for pair, elements in self.pairs.items()}
+        self.waveforms = dict(waveforms or {})
+        self.switches = dict(switches or {})
+        self.delay_lines = dict(delay_lines or {})
+        self.line_sections = set(line_sections or ())
+
+    @classmethod
+    def from_circuit(cls, circuit) -> 'Netlist':
+        """
+        Строит Netlist из элементов схемы PySpice.
+
+        Источники без dc_value (SIN, PULSE, PWL) получают зависимость от времени (Waveform),
+        а их значением считается значение при t = 0. Распределённые линии (TransmissionLine с
+        погонными параметрами) раскрываются в звенья с ключами в стиле ngspice, как в read_netlist:
+        элемент R1 вызова X1 — R.X1.R1, внутренний узел b1 — X1.b1. Линия с задержкой (DelayLine)
+        раскрывается так же: её элемент T1 в вызове X1 — T.X1.T1.
+
+        Аргументы:
+            circuit: Объект схемы PySpice.
+
+        Возвращает:
+            Netlist: Представление схемы.
+        """
+        keys, nodes, types, values = [], [], [], []
+        waveforms = {}
+        switches = {}
+        delay_lines = {}
+        line_sections = set()
+        for element in circuit.elements:
+            if element.PREFIX not in cls.PREFIXES:
+                raise ValueError(f"Unsupported element {element.name} with prefix {element.PREFIX}")
+            definition = circuit._subcircuits.get(element.subcircuit_name) if element.PREFIX == 'X' else None
+            if isinstance(definition, Switch):
+                key = cls.SWITCH_KEY.format(element.name)
+                switches[key] = definition
+                keys.append(key)
+                values.append(None)
+                nodes.append([str(node) for node in element.node_names[:2]])
+                types.append(cls.SWITCH)
+                continue
+            if isinstance(definition, DelayLine) or (isinstance(definition, TransmissionLine) and definition.distributed):
+                pins = dict(zip(definition.NODES, (str(node) for node in element.node_names)))
+                for inner in definition.elements:
+                    key = f"{inner.PREFIX}.{element.name}.{inner.name}"
+                    keys.append(key)
+                    nodes.append([pins.get(node, node if node == '0' else f"{element.name}.{node}")
+                                  for node in cls._element_nodes(inner)])
+                    types.append(cls.PREFIXES[inner.PREFIX])
+                    values.append(float(getattr(inner, cls.VALUE_ATTRIBUTES[inner.PREFIX])))
+                    if inner.PREFIX == 'T':
+                        delay_lines[key] = cls._time_delay(inner)
+                    else:
+                        line_sections.add(key)
+                continue
+            if element.PREFIX == 'X':
+                keys.append(cls.SUBCIRCUIT_KEY.format(element.name))
+                values.append(None)
+            elif element.PREFIX in ('V', 'I') and getattr(element, 'dc_value', None) is None:
+                waveform = Waveform.from_element(element)
+                waveforms[element.name] = waveform
+                keys.append(element.name)
+                values.append(float(waveform(0.0)))
+            else:
+                keys.append(element.name)
+                values.append(float(getattr(element, cls.VALUE_ATTRIBUTES[element.PREFIX])))
+                if element.PREFIX == 'T':
+                    delay_lines[element.name] = cls._time_delay(element)
+            nodes.append(cls._element_nodes(element))
+            types.append(cls.PREFIXES[element.PREFIX])
+        return cls(keys, nodes, types, values, waveforms, switches, delay_lines, line_sections)
+
+    @staticmethod
+    def _element_nodes(element) -> list:
+        """
+        Возвращает пару имён узлов элемента; для линии T — узлы её портов (опорные узлы должны быть землёй).
+        """
+        names = [str(node) for node in element.node_names]
+        if element.PREFIX != 'T':
+            return names[:2]
+        if names[1] != '0' or names[3] != '0':
+            raise ValueError(f"Delay line {element.name} must have both ports referenced to ground")
+        return [names[0], names[2]]
+
+    @staticmethod
+    def _time_delay(element) -> float:
+        """
+        Возвращает время распространения линии T (задаётся параметром TD).
+        """
+        if element.time_delay is None:
+            raise ValueError(f"Delay line {element.name} must be given by Z0 and TD")
+        return float(element.time_delay)
+
+    @classmethod
+    def from_nodes_dict(cls, nodes_dict: dict) -> 'Netlist':
+        """
+        Строит Netlist из словаря get_element_nodes_dict; тип берётся из первой буквы имени SPICE.
+
+        Аргументы:
+            nodes_dict (dict): Словарь элементов.
+
+        Возвращает:
+            Netlist: Представление схемы.
+        """
+        if isinstance(nodes_dict, cls):
+            return nodes_dict
+        keys, nodes, types, values = [], [], [], []
+        for key, value in nodes_dict.items():
+            keys.append(key)
+            nodes.append(list(value[:2]))
+            types.append(cls.PREFIXES[key.split()[-1][0].upper()])
+            values.append(value[2] if len(value) > 2 else None)
+        return cls(keys, nodes, types, values)
+
+    def __getitem__(self, key: str) -> list:
+        """
+        Возвращает [узел+, узел-, значение] элемента (для подцепей и ключей — [узел+, узел-]).
+        """
+        i = self.index[key]
+        a, b = self.node_ids[i]
+        if self.type_codes[i] in (self.SUBCIRCUIT, self.SWITCH):
+            return [self.node_names[a], self.node_names[b]]
+        return [self.node_names[a], self.node_names[b], self.element_values[i].item()]
+
+    def __iter__(self):
+        """
+        Перебирает ключи элементов в порядке схемы.
+        """
+        return iter(self.keys_list)
+
+    def __len__(self) -> int:
+        """
+        Возвращает число элементов.
+        """
+        return len(self.keys_list)
+
+    def __contains__(self, key) -> bool:
+        """
+        Проверяет наличие элемента по ключу или имени SPICE.
+        """
+        return key in self.index
+
+    def type_of(self, key: str) -> int:
+        """
+        Возвращает код типа элемента по ключу или имени SPICE.
+        """
+        return int(self.type_codes[self.index[key]])
+
+    def is_type(self, key: str, *codes) -> bool:
+        """
+        Проверяет, относится ли элемент к одному из типов codes.
+        """
+        return int(self.type_codes[self.index[key]]) in codes
+
+    def keys_of_type(self, *codes) -> list:
+        """
+        Возвращает ключи элементов заданных типов в порядке схемы.
+        """
+        mask = np.isin(self.type_codes, codes)
+        return [self.keys_list[i] for i in np.flatnonzero(mask)]
+
+    def elements_between(self, node_a: str, node_b: str) -> list:
+        """
+        Возвращает ключи элементов, соединяющих два узла (в любом направлении), в порядке схемы.
+        """
+        a = self.node_index.get(node_a)
+        b = self.node_index.get(node_b)
+        if a is None or b is None:
+            return []
+        return [self.keys_list[i] for i in self.pairs.get((min(a, b), max(a, b)), ())]
+
+    def with_values(self, values: dict) -> 'Netlist':
+        """
+        Возвращает схему с новыми значениями элементов; узлы, типы и индексы общие с исходной.
+
+        Аргументы:
+            values (dict): Новые значения по ключам или именам SPICE элементов.
+
+        Возвращает:
+            Netlist: Копия схемы с новым массивом element_values.
+        """
+        netlist = copy.copy(self)
+        netlist.element_values = self.element_values.copy()
+        for key, value in values.items():
+            i = self.index[key]
+            if self.type_codes[i] in (self.SUBCIRCUIT, self.SWITCH):
+                raise ValueError(f"Element {key} has no value")
+            if self.keys_list[i] in self.waveforms:
+                raise ValueError(f"Source {key} depends on time; its waveform cannot be replaced by a value")
+            netlist.element_values[i] = float(value)
+        return netlist
+
+    def configuration(self, mask: int) -> 'Netlist':
+        """
+        Возвращает схему без ключей для состояния ключей mask (бит i — i-й ключ из switches замкнут).
+
+        Замкнутый ключ становится коротким замыканием ("Line <имя>") или резистором R<имя> = r_on,
+        разомкнутый — резистором R<имя> = r_off или удаляется.
+
+        Аргументы:
+            mask (int): Маска состояния ключей.
+
+        Возвращает:
+            Netlist: Схема для этого состояния ключей.
+        """
+        keys, nodes, types, values = [], [], [], []
+        bits = {key: bool(mask >> bit & 1) for bit, key in enumerate(self.switches)}
+        for i, key in enumerate(self.keys_list):
+            a, b = (self.node_names[node] for node in self.node_ids[i])
+            kind = int(self.type_codes[i])
+            value = None if np.isnan(self.element_values[i]) else self.element_values[i].item()
+            if kind == self.SWITCH:
+                switch = self.switches[key]
+                name = key.split()[-1]
+                resistance = switch.r_on if bits[key] else switch.r_off
+                if resistance is None:
+                    continue
+                if resistance == 0:
+                    key, kind, value = self.SUBCIRCUIT_KEY.format(name), self.SUBCIRCUIT, None
+                else:
+                    key, kind, value = f"R{name}", self.RESISTOR, resistance
+            keys.append(key)
+            nodes.append([a, b])
+            types.append(kind)
+            values.append(value)
+        return Netlist(keys, nodes, types, values, self.waveforms, delay_lines=self.delay_lines,
+                       line_sections=self.line_sections)
+
+    def input_waveforms(self) -> dict:
+        """
+        Возвращает зависимости от времени по именам входов (U_V... для источников напряжения, I_I... для тока).
+        """
+        prefixes = {self.VOLTAGE_SOURCE: 'U', self.CURRENT_SOURCE: 'I'}
+        return {f"{prefixes[self.type_of(key)]}_{key}": waveform for key, waveform in self.waveforms.items()}
+
+    def breakpoints(self, start: float, stop: float) -> np.ndarray:
+        """
+        Возвращает отсортированные точки излома всех источников внутри интервала (start, stop).
+        """
+        points = [waveform.breakpoints(start, stop) for waveform in self.waveforms.values()]
+        return np.unique(np.concatenate(points)) if points else np.empty(0)
+
+    def shortest_period(self) -> float:
+        """
+        Возвращает наименьший характерный период источников (None, если источники постоянные).
+        """
+        periods = [waveform.period for waveform in self.waveforms.values() if waveform.period]
+        return min(periods) if periods else None
+
+    def adjacency(self) -> dict:
+        """
+        Возвращает граф соединений между узлами (как get_node_connections).
+        """
+        connections = defaultdict(set)
+        for a, b in self.node_ids.tolist():
+            connections[self.node_names[a]].add(self.node_names[b])
+            connections[self.node_names[b]].add(self.node_names[a])
+        return connections
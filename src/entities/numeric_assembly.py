@@ -0,0 +1,306 @@
+import numpy as np
+from scipy.sparse import coo_matrix, csc_matrix, csr_matrix, hstack
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+from entities.netlist import Netlist
+from entities.state_space import StateSpaceModel
+
+class NumericAssembly:
+    """
+    Численная сборка уравнений состояния схемы без символьных преобразований.
+
+    Законы Кирхгофа записываются сразу матрицами коэффициентов, линейными по неизвестным:
+
+        M z = P s + Q u,    s' = S z,
+
+    где s — переменные состояния (токи I_L, напряжения U_C), u — источники, z — алгебраические
+    переменные: потенциалы узлов, токи источников напряжения, линий и конденсаторов. Строки M —
+    первый закон Кирхгофа для каждого узла и уравнения ветвей (V(n+) - V(n-) = U для источников
+    напряжения и конденсаторов, 0 для линий); второй закон выполняется автоматически через
+    потенциалы узлов. Алгебраические переменные исключаются одной LU-факторизацией M:
+
+        A = S M⁻¹ P,    B = S M⁻¹ Q.
+
+    Знаки совпадают с бэкендом 'mna': U = V(n+) - V(n-), ток — от n+ к n- через элемент.
+
+    Атрибуты:
+        M (csc_matrix): Матрица алгебраической системы.
+        P, Q (csc_matrix): Коэффициенты при переменных состояния и источниках.
+        S (csc_matrix): Выражение производных через алгебраические переменные.
+        unknowns (list): Имена алгебраических переменных.
+        state_names (list): Имена переменных состояния (в порядке элементов схемы).
+        input_names (list): Имена входов (U_V... и I_I...).
+        input_values (np.ndarray): Значения источников.
+        input_functions (dict): Зависимости от времени источников SIN/PULSE/PWL по именам входов.
+    """
+    DENSE_LIMIT = 400
+
+    def __init__(self, element_nodes: dict) -> None:
+        """
+        Собирает матрицы M, P, Q, S по элементам схемы.
+
+        Аргументы:
+            element_nodes (dict): Netlist или словарь элементов из get_element_nodes_dict.
+        """
+        netlist = Netlist.from_nodes_dict(element_nodes)
+        if netlist.switches:
+            raise ValueError("Switches must be resolved with Netlist.configuration before assembly")
+        if netlist.delay_lines:
+            raise ValueError("Delay lines have no state equations; use backend 'mna'")
+        self.input_functions = netlist.input_waveforms()
+        ground = netlist.node_index.get('0', -1)
+        node_column = {}
+        for node in range(len(netlist.node_names)):
+            if node != ground:
+                node_column[node] = len(node_column)
+        node_column[ground] = -1
+        self.unknowns = [f"U_{netlist.node_names[node]}" for node, column in node_column.items() if column >= 0]
+        self.state_names = []
+        self.input_names = []
+        input_values = []
+        state_column = {}
+        for key in netlist:
+            if netlist.is_type(key, Netlist.INDUCTOR):
+                state_column[key] = len(self.state_names)
+                self.state_names.append(f"I_{key}")
+            elif netlist.is_type(key, Netlist.CAPACITOR):
+                state_column[key] = len(self.state_names)
+                self.state_names.append(f"U_{key}")
+        m = {'rows': [], 'cols': [], 'vals': [], 'owners': []}
+        p = {'rows': [], 'cols': [], 'vals': [], 'owners': []}
+        q = {'rows': [], 'cols': [], 'vals': [], 'owners': []}
+        s = {'rows': [], 'cols': [], 'vals': [], 'owners': []}
+        self._nominal = {}
+
+        def stamp(matrix, row, col, value, owner=None):
+            # owner — элемент, значение которого входит в коэффициент как 1 / value (см. ensemble).
+            if row >= 0 and col >= 0:
+                matrix['rows'].append(row)
+                matrix['cols'].append(col)
+                matrix['vals'].append(value)
+                matrix['owners'].append(owner)
+
+        def branch_unknown(name, a, b):
+            k = len(self.unknowns)
+            self.unknowns.append(name)
+            stamp(m, a, k, 1.0)
+            stamp(m, b, k, -1.0)
+            stamp(m, k, a, 1.0)
+            stamp(m, k, b, -1.0)
+            return k
+
+        for key, (a, b), kind, value in zip(netlist.keys_list, netlist.node_ids.tolist(),
+                                            netlist.type_codes.tolist(), netlist.element_values.tolist()):
+            a = node_column[a]
+            b = node_column[b]
+            if kind == Netlist.SUBCIRCUIT or (kind == Netlist.RESISTOR and value == 0):
+                branch_unknown(f"I_{key.split()[-1]}", a, b)
+            elif kind == Netlist.RESISTOR:
+                self._nominal[key] = value
+                for row, col, sign in ((a, a, 1.0), (b, b, 1.0), (a, b, -1.0), (b, a, -1.0)):
+                    stamp(m, row, col, sign / value, key)
+            elif kind == Netlist.VOLTAGE_SOURCE:
+                k = branch_unknown(f"I_{key}", a, b)
+                stamp(q, k, len(self.input_names), 1.0)
+                self.input_names.append(f"U_{key}")
+                input_values.append(value)
+            elif kind == Netlist.CURRENT_SOURCE:
+                stamp(q, a, len(self.input_names), -1.0)
+                stamp(q, b, len(self.input_names), 1.0)
+                self.input_names.append(f"I_{key}")
+                input_values.append(value)
+            elif kind == Netlist.CAPACITOR:
+                k = branch_unknown(f"I_{key}", a, b)
+                self._nominal[key] = value
+                stamp(p, k, state_column[key], 1.0)
+                stamp(s, state_column[key], k, 1.0 / value, key)
+            elif kind == Netlist.INDUCTOR:
+                self._nominal[key] = value
+                stamp(p, a, state_column[key], -1.0)
+                stamp(p, b, state_column[key], 1.0)
+                stamp(s, state_column[key], a, 1.0 / value, key)
+                stamp(s, state_column[key], b, -1.0 / value, key)
+        n = len(self.unknowns)
+        self.M = csc_matrix(coo_matrix((m['vals'], (m['rows'], m['cols'])), shape=(n, n)))
+        self.P = csc_matrix(coo_matrix((p['vals'], (p['rows'], p['cols'])), shape=(n, len(self.state_names))))
+        self.Q = csc_matrix(coo_matrix((q['vals'], (q['rows'], q['cols'])), shape=(n, len(self.input_names))))
+        self.S = csc_matrix(coo_matrix((s['vals'], (s['rows'], s['cols'])), shape=(len(self.state_names), n)))
+        self.input_values = np.array(input_values, dtype=float)
+        self._stamps = {'M': m, 'S': s}
+
+    def eliminate(self, method: str = 'auto') -> tuple:
+        """
+        Исключает алгебраические переменные и возвращает матрицы A и B системы x' = A x + B u.
+
+        Аргументы:
+            method (str): 'dense' (numpy.linalg.solve), 'sparse' (LU-разложение scipy.sparse)
+                или 'auto' — плотный расчёт для систем до DENSE_LIMIT неизвестных.
+
+        Возвращает:
+            tuple: (A, B) в виде массивов NumPy.
+        """
+        product = self.S @ self._solve(np.hstack([self.P.toarray(), self.Q.toarray()]), method)
+        states = len(self.state_names)
+        return product[:, :states], product[:, states:]
+
+    def eliminate_sparse(self) -> tuple:
+        """
+        Исключает алгебраические переменные с сохранением разреженности: A и B в виде csr_matrix.
+
+        Матрица M распадается на независимые блоки — связные компоненты графа её ненулевых элементов;
+        в линии и лестничной цепи каждый блок — несколько узлов между соседними L и C. Столбец
+        M⁻¹ [P Q] отличен от нуля только в блоках, которых касается столбец [P Q], поэтому столбцы,
+        касающиеся разных блоков, решаются одной правой частью (сжатие столбцов, как при численной
+        оценке разреженного якобиана). Решений с LU-разложением M столько, сколько столбцов касается
+        одного блока, — для линии их несколько при любом числе звеньев, и время исключения растёт
+        линейно, а не кубически.
+
+        Возвращает:
+            tuple: (A, B) в виде csr_matrix.
+        """
+        states = len(self.state_names)
+        right = csc_matrix(hstack([self.P, self.Q], format='csc'))
+        n, columns = right.shape
+        if not n:
+            product = csr_matrix((states, columns))
+            return product[:, :states], product[:, states:]
+        pattern = abs(self.M) + abs(self.M).T
+        count, labels = connected_components(pattern, directed=False)
+        colors = np.empty(columns, dtype=int)
+        taken = []
+        for column in range(columns):
+            blocks = set(labels[right.indices[right.indptr[column]:right.indptr[column + 1]]].tolist())
+            color = next((k for k, used in enumerate(taken) if used.isdisjoint(blocks)), len(taken))
+            if color == len(taken):
+                taken.append(set())
+            taken[color].update(blocks)
+            colors[column] = color
+        compression = csc_matrix((np.ones(columns), (np.arange(columns), colors)), shape=(columns, len(taken)))
+        solution = self._solve((right @ compression).toarray(), 'sparse')
+        owner = np.full((len(taken), count), -1)
+        for column in range(columns):
+            owner[colors[column], labels[right.indices[right.indptr[column]:right.indptr[column + 1]]]] = column
+        rows, groups = np.nonzero(solution)
+        columns_of = owner[groups, labels[rows]]
+        keep = columns_of >= 0
+        X = csc_matrix((solution[rows[keep], groups[keep]], (rows[keep], columns_of[keep])), shape=(n, columns))
+        product = csr_matrix(self.S @ X)
+        return product[:, :states], product[:, states:]
+
+    def ensemble(self, values: dict) -> tuple:
+        """
+        Строит матрицы A и вынуждающие члены B u сразу для ансамбля значений элементов.
+
+        Топология ансамбля общая, поэтому коэффициенты M и S каждого члена получаются из записанных
+        при сборке коэффициентов умножением на nominal / value (сопротивления, индуктивности и ёмкости
+        входят в них как 1 / value), а исключение A = S M⁻¹ P, B = S M⁻¹ Q выполняется одним пакетным
+        решением NumPy для всех членов.
+
+        Аргументы:
+            values (dict): Массивы значений по именам элементов (R, L, C, источники); массивы
+                приводятся к общему размеру ансамбля, не заданные элементы берут номинальные значения.
+
+        Возвращает:
+            tuple: (A размера (ансамбль, n, n), B u размера (ансамбль, n)).
+        """
+        arrays = {key: np.asarray(value, dtype=float) for key, value in values.items()}
+        unknown = [key for key in arrays if key not in self._nominal and f"U_{key}" not in self.input_names
+                   and f"I_{key}" not in self.input_names]
+        if unknown:
+            raise KeyError(f"Unknown element: {', '.join(unknown)}")
+        size = max((array.size for array in arrays.values()), default=1)
+        for key in arrays:
+            if key in self._nominal and (self._nominal[key] == 0 or np.any(arrays[key] == 0)):
+                raise ValueError(f"Element {key} switches between zero and non-zero values; "
+                                 f"the ensemble needs a common topology")
+
+        def batch(stamps, shape):
+            scale = np.ones((size, len(stamps['vals'])))
+            for column, owner in enumerate(stamps['owners']):
+                if owner in arrays:
+                    scale[:, column] = self._nominal[owner] / np.broadcast_to(arrays[owner], (size,))
+            matrix = np.zeros((size, *shape))
+            np.add.at(matrix, (slice(None), np.array(stamps['rows'], dtype=int), np.array(stamps['cols'], dtype=int)),
+                      scale * np.array(stamps['vals']))
+            return matrix
+
+        n = len(self.unknowns)
+        states = len(self.state_names)
+        inputs = np.array([np.broadcast_to(arrays.get(name[2:], value), (size,))
+                           for name, value in zip(self.input_names, self.input_values)]).reshape(-1, size)
+        # Правые части члена ансамбля: столбцы P и столбец Q u.
+        right = np.concatenate([np.broadcast_to(self.P.toarray(), (size, n, states)),
+                                (self.Q.toarray() @ inputs).T[..., None]], axis=-1)
+        if n:
+            try:
+                right = np.linalg.solve(batch(self._stamps['M'], (n, n)), right)
+            except np.linalg.LinAlgError as error:
+                raise ValueError("Algebraic part of the circuit is singular for some ensemble members") from error
+        product = batch(self._stamps['S'], (states, n)) @ right
+        return product[..., :states], product[..., states]
+
+    def _solve(self, right: np.ndarray, method: str) -> np.ndarray:
+        """
+        Решает M z = right для матрицы правых частей (см. eliminate).
+        """
+        n = len(self.unknowns)
+        if method == 'auto':
+            method = 'dense' if n <= self.DENSE_LIMIT else 'sparse'
+        try:
+            if method == 'dense':
+                return np.linalg.solve(self.M.toarray(), right) if n else right
+            elif method == 'sparse':
+                return splu(self.M).solve(right) if n else right
+        except (np.linalg.LinAlgError, RuntimeError) as error:
+            raise ValueError("Algebraic part of the circuit is singular: loops of capacitors and voltage sources "
+                             "or cut sets of inductors and current sources are not supported") from error
+        raise ValueError(f"Unknown elimination method: {method}")
+
+    def output_matrices(self, outputs: list, method: str = 'auto') -> tuple:
+        """
+        Выражает выходы через состояния и источники: y = C x + D u.
+
+        Выход — переменная состояния или алгебраическая переменная из unknowns (потенциал узла U_<узел>,
+        ток источника напряжения, линии или конденсатора I_<элемент>).
+
+        Аргументы:
+            outputs (list): Имена выходов.
+            method (str): Способ решения алгебраической системы (см. eliminate).
+
+        Возвращает:
+            tuple: (C, D) в виде массивов NumPy.
+        """
+        states = len(self.state_names)
+        C = np.zeros((len(outputs), states))
+        D = np.zeros((len(outputs), len(self.input_names)))
+        algebraic = []
+        for row, name in enumerate(outputs):
+            if name in self.state_names:
+                C[row, self.state_names.index(name)] = 1.0
+            elif name in self.unknowns:
+                algebraic.append((row, self.unknowns.index(name)))
+            else:
+                raise KeyError(f"Unknown output: {name}")
+        if algebraic:
+            solution = self._solve(np.hstack([self.P.toarray(), self.Q.toarray()]), method)
+            for row, column in algebraic:
+                C[row] = solution[column, :states]
+                D[row] = solution[column, states:]
+        return C, D
+
+    def state_space(self, method: str = 'auto', outputs: list = None) -> StateSpaceModel:
+        """
+        Строит линейную модель в пространстве состояний.
+
+        Аргументы:
+            method (str): Способ исключения алгебраических переменных (см. eliminate).
+            outputs (list, optional): Имена выходов (см. output_matrices); по умолчанию — переменные состояния.
+
+        Возвращает:
+            StateSpaceModel: Модель с матрицами A, B, C, D (по умолчанию C = I, D = 0).
+        """
+        A, B = self.eliminate(method)
+        outputs = self.state_names if outputs is None else list(outputs)
+        C, D = self.output_matrices(outputs, method)
+        return StateSpaceModel(A, B, C, D, self.state_names, self.input_names, outputs, self.input_values,
+                               self.input_functions)
@@ -0,0 +1,249 @@
+import numpy as np
+from scipy.linalg import expm, hessenberg
+
+def solve_linear_system(A: np.ndarray, forcing: np.ndarray, initial_state: np.ndarray, time_points) -> np.ndarray:
+    """
+    Точно решает x' = A x + f с постоянным f во всех моментах времени сразу.
+
+    Поддерживает пакеты систем: A размера (..., n, n), f и x0 размера (..., n).
+    Используются собственные числа и векторы A; для систем с плохо обусловленным
+    базисом собственных векторов — матричная экспонента расширенной системы.
+
+    Аргументы:
+        A (np.ndarray): Матрица (или пакет матриц) системы.
+        forcing (np.ndarray): Постоянная вынуждающая составляющая B u.
+        initial_state (np.ndarray): Состояние при t = 0.
+        time_points (array-like): Моменты времени.
+
+    Возвращает:
+        np.ndarray: Массив размера (..., n, число моментов времени).
+    """
+    A = np.asarray(A, dtype=float)
+    t = np.asarray(time_points, dtype=float)
+    n = A.shape[-1]
+    batch = A.shape[:-2]
+    forcing = np.broadcast_to(np.asarray(forcing, dtype=float), batch + (n,))
+    x0 = np.broadcast_to(np.asarray(initial_state, dtype=float), batch + (n,))
+    eigenvalues, eigenvectors = np.linalg.eig(A)
+    good = np.linalg.cond(eigenvectors) < 1e8
+    result = np.empty(batch + (n, t.size))
+    if np.any(good):
+        V = eigenvectors[good]
+        lam = eigenvalues[good]
+        z0 = np.linalg.solve(V, x0[good][..., None])
+        w = np.linalg.solve(V, forcing[good][..., None])
+        lt = lam[..., None] * t
+        small = np.abs(lam) < 1e-12
+        safe = np.where(small, 1.0, lam)
+        phi = np.where(small[..., None], t, np.expm1(lt) / safe[..., None])
+        result[good] = (V @ (np.exp(lt) * z0 + phi * w)).real
+    if not np.all(good):
+        bad = ~good
+        augmented = np.zeros(A[bad].shape[:-2] + (n + 1, n + 1))
+        augmented[..., :n, :n] = A[bad]
+        augmented[..., :n, n] = forcing[bad]
+        transitions = expm(augmented[..., None, :, :] * t[:, None, None])
+        x = transitions[..., :n, :n] @ x0[bad][..., None, :, None] + transitions[..., :n, n:]
+        result[bad] = np.swapaxes(x[..., 0], -1, -2)
+    return result
+
+def solve_shifted_hessenberg(H: np.ndarray, shifts: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    Решает (s I - H) X = R для верхней хессенберговой матрицы H сразу при всех сдвигах s.
+
+    Исключение Гаусса с выбором главного элемента затрагивает только соседние строки, поэтому
+    стоимость одного сдвига — O(n²) вместо O(n³) у общего решателя. Цикл идёт по строкам,
+    а все сдвиги обрабатываются одним векторным действием NumPy.
+
+    Аргументы:
+        H (np.ndarray): Верхняя хессенбергова матрица размера (n, n).
+        shifts (np.ndarray): Комплексные сдвиги размера (k,).
+        rhs (np.ndarray): Правая часть размера (n, m).
+
+    Возвращает:
+        np.ndarray: Решения размера (k, n, m).
+    """
+    n = H.shape[0]
+    shifts = np.asarray(shifts, dtype=complex)
+    T = np.empty((shifts.size, n, n), dtype=complex)
+    T[:] = -H
+    T[:, np.arange(n), np.arange(n)] += shifts[:, None]
+    X = np.empty((shifts.size,) + rhs.shape, dtype=complex)
+    X[:] = rhs
+    for k in range(n - 1):
+        swap = np.abs(T[:, k + 1, k]) > np.abs(T[:, k, k])
+        if np.any(swap):
+            T[swap, k:k + 2, k:] = T[swap, k:k + 2, k:][:, ::-1]
+            X[swap, k:k + 2] = X[swap, k:k + 2][:, ::-1]
+        factor = T[:, k + 1, k] / T[:, k, k]
+        T[:, k + 1, k:] -= factor[:, None] * T[:, k, k:]
+        X[:, k + 1] -= factor[:, None] * X[:, k]
+    for k in range(n - 1, -1, -1):
+        if k < n - 1:
+            X[:, k] -= np.einsum('kj,kjm->km', T[:, k, k + 1:], X[:, k + 1:])
+        X[:, k] /= T[:, k, k][:, None]
+    return X
+
+class StateSpaceModel:
+    """
+    Линейная модель схемы в пространстве состояний:
+
+        x' = A x + B u,
+        y  = C x + D u,
+
+    где x — переменные состояния (токи через L, напряжения на C), u — источники постоянного
+    тока и напряжения. Переходный процесс вычисляется точно (через собственные числа матрицы A
+    или матричную экспоненту) сразу во всех заданных моментах времени, без выбора шага.
+    Источники SIN, PULSE и PWL перечислены в input_functions: simulate считает входы постоянными
+    и для них требует явных значений.
+
+    Атрибуты:
+        A, B, C, D (np.ndarray): Матрицы модели.
+        state_names (list): Имена переменных состояния.
+        input_names (list): Имена входов (напряжения/токи источников).
+        output_names (list): Имена выходов.
+        input_values (np.ndarray): Значения источников, заданные в схеме (для SIN/PULSE/PWL — при t = 0).
+        input_functions (dict): Зависимости входов от времени по именам входов.
+    """
+    HESSENBERG_CHUNK = 2**22
+
+    def __init__(self, A: np.ndarray, B: np.ndarray, C: np.ndarray, D: np.ndarray,
+                 state_names: list, input_names: list, output_names: list, input_values=None,
+                 input_functions: dict = None) -> None:
+        """
+        Инициализирует модель в пространстве состояний.
+
+        Аргументы:
+            A, B, C, D (np.ndarray): Матрицы модели.
+            state_names (list): Имена переменных состояния.
+            input_names (list): Имена входов.
+            output_names (list): Имена выходов.
+            input_values (array-like, optional): Значения входов по умолчанию.
+            input_functions (dict, optional): Зависимости входов от времени (Netlist.input_waveforms).
+        """
+        # Размеры задаются по именам: схема без L и C даёт модель без переменных состояния (y = D u).
+        n = len(state_names)
+        self.A = np.asarray(A, dtype=float).reshape(n, n)
+        self.B = np.asarray(B, dtype=float).reshape(n, len(input_names))
+        self.C = np.asarray(C, dtype=float).reshape(len(output_names), n)
+        self.D = np.asarray(D, dtype=float).reshape(len(output_names), len(input_names))
+        self.state_names = list(state_names)
+        self.input_names = list(input_names)
+        self.output_names = list(output_names)
+        if input_values is None:
+            input_values = np.zeros(self.B.shape[1])
+        self.input_values = np.asarray(input_values, dtype=float)
+        self.input_functions = dict(input_functions or {})
+
+    def __iter__(self):
+        """
+        Позволяет распаковать модель: A, B, C, D = model.
+        """
+        return iter((self.A, self.B, self.C, self.D))
+
+    def _resolve_inputs(self, inputs) -> np.ndarray:
+        """
+        Возвращает вектор входов: значения из схемы, заменённые переданными.
+
+        Аргументы:
+            inputs (dict | array-like | None): Значения входов по имени или вектором.
+
+        Возвращает:
+            np.ndarray: Вектор входов.
+        """
+        if inputs is None:
+            return self.input_values
+        if isinstance(inputs, dict):
+            u = self.input_values.copy()
+            for name, value in inputs.items():
+                u[self.input_names.index(name)] = value
+            return u
+        return np.asarray(inputs, dtype=float)
+
+    def simulate(self, time_points, initial_state, inputs=None) -> np.ndarray:
+        """
+        Точно решает x' = A x + B u при постоянных входах во всех моментах времени сразу.
+
+        Входы с зависимостью от времени (input_functions) нельзя заменить значением при t = 0:
+        их значения нужно передать в inputs явно, иначе возбуждается ValueError.
+
+        Аргументы:
+            time_points (array-like): Моменты времени (отсчитываются от t = 0).
+            initial_state (array-like): Значения переменных состояния при t = 0.
+            inputs (dict | array-like, optional): Значения источников; по умолчанию — из схемы.
+
+        Возвращает:
+            np.ndarray: Массив размера (число переменных состояния, число моментов времени).
+        """
+        varying = [name for name in self.input_functions
+                   if inputs is None or isinstance(inputs, dict) and name not in inputs]
+        if varying:
+            raise ValueError(f"Inputs {', '.join(varying)} vary in time; pass constant values explicitly "
+                             f"or use CircuitSimulation.analyze()")
+        forcing = self.B @ self._resolve_inputs(inputs)
+        return solve_linear_system(self.A, forcing, initial_state, time_points)
+
+    def output(self, states: np.ndarray, inputs=None) -> np.ndarray:
+        """
+        Вычисляет выходы y = C x + D u для траектории состояний.
+
+        Аргументы:
+            states (np.ndarray): Массив состояний размера (n, число моментов времени).
+            inputs (dict | array-like, optional): Значения источников; по умолчанию — из схемы.
+
+        Возвращает:
+            np.ndarray: Массив выходов размера (число выходов, число моментов времени).
+        """
+        return self.C @ states + (self.D @ self._resolve_inputs(inputs))[:, None]
+
+    def frequency_response(self, frequencies, inputs=None, outputs=None, method: str = 'auto') -> np.ndarray:
+        """
+        Вычисляет частотную характеристику H(jω) = C (jω I - A)⁻¹ B + D сразу на всех частотах.
+
+        Способ 'eig' разлагает A = V Λ V⁻¹ один раз, после чего каждая частота стоит O(n) на пару
+        вход-выход: H = (C V) diag(1 / (jω - λ)) (V⁻¹ B) + D. При плохо обусловленном базисе собственных
+        векторов (кратные собственные числа) способ 'hessenberg' приводит A к форме Хессенберга
+        A = Q H Qᵀ и решает системы (jω I - H) пакетом по O(n²) на частоту.
+
+        Аргументы:
+            frequencies (array-like): Частоты в герцах.
+            inputs (str | list, optional): Имя входа или список имён (по умолчанию — все входы).
+            outputs (str | list, optional): Имя выхода или список имён (по умолчанию — все выходы).
+            method (str): 'eig', 'hessenberg' или 'auto' — 'eig', если базис собственных векторов
+                обусловлен не хуже 1e8.
+
+        Возвращает:
+            np.ndarray: Комплексный массив размера (число выходов, число входов, число частот);
+            оси, заданные одним именем, опускаются.
+        """
+        input_list = self.input_names if inputs is None else [inputs] if isinstance(inputs, str) else list(inputs)
+        output_list = self.output_names if outputs is None else [outputs] if isinstance(outputs, str) else list(outputs)
+        columns = [self.input_names.index(name) for name in input_list]
+        rows = [self.output_names.index(name) for name in output_list]
+        B = self.B[:, columns]
+        C = self.C[rows]
+        D = self.D[np.ix_(rows, columns)]
+        s = 2j * np.pi * np.asarray(frequencies, dtype=float).ravel()
+        eigenvalues = eigenvectors = None
+        if method in ('auto', 'eig'):
+            eigenvalues, eigenvectors = np.linalg.eig(self.A)
+            if method == 'auto' and eigenvectors.size and np.linalg.cond(eigenvectors) >= 1e8:
+                method = 'hessenberg'
+        if method in ('auto', 'eig'):
+            left = C @ eigenvectors
+            right = np.linalg.solve(eigenvectors, B)
+            response = np.einsum('pn,nf,nm->pmf', left, 1.0 / (s - eigenvalues[:, None]), right)
+        elif method == 'hessenberg':
+            H, Q = hessenberg(self.A, calc_q=True)
+            chunk = max(1, self.HESSENBERG_CHUNK // max(1, H.size))
+            solutions = np.concatenate([solve_shifted_hessenberg(H, s[start:start + chunk], Q.T @ B)
+                                        for start in range(0, s.size, chunk)])
+            response = np.einsum('pn,fnm->pmf', C @ Q, solutions)
+        else:
+            raise ValueError(f"Unknown method: {method}")
+        response = response + D[:, :, None]
+        if isinstance(inputs, str):
+            response = response[:, 0]
+        if isinstance(outputs, str):
+            response = response[0]
+        return response
@@ -0,0 +1,83 @@
+import numpy as np
+from scipy.optimize import brentq
+from PySpice.Spice.Netlist import SubCircuit
+from PySpice.Unit import *
+
+class Switch(SubCircuit):
+    """
+    Идеальный ключ как подцепь: замкнут, пока управляющий сигнал control(t) больше threshold.
+
+    Замкнутый ключ — короткое замыкание (или сопротивление r_on), разомкнутый — разрыв (или
+    сопротивление r_off). Управление задаётся зависимостью от времени (например, PulseWaveform
+    для ШИМ), поэтому моменты переключения известны заранее и находятся точно, без поиска событий
+    по шагам решателя. Каждый ключ — отдельная подцепь со своим управлением:
+
+        circuit.subcircuit(Switch('S1', PulseWaveform(0, 1, 0, 0, 0, 5e-6, 1e-5)))
+        circuit.X('S1', 'S1', 'in', 'sw')
+
+    Атрибуты:
+        NODES (tuple): Кортеж с именами узлов ('n1', 'n2').
+        control (Waveform): Управляющий сигнал.
+        r_on (float): Сопротивление замкнутого ключа (0 — короткое замыкание).
+        r_off (float | None): Сопротивление разомкнутого ключа (None — разрыв).
+        threshold (float): Порог управляющего сигнала.
+    """
+    NODES = ('n1', 'n2')
+
+    def __init__(self, subcircuit_name: str, control, r_on: float = 0.0, r_off: float = None, threshold: float = 0.5) -> None:
+        """
+        Инициализирует подцепь ключа с заданным именем и управлением.
+
+        Аргументы:
+            subcircuit_name (str): Имя подцепи.
+            control (Waveform): Управляющий сигнал.
+            r_on (float): Сопротивление замкнутого ключа.
+            r_off (float, optional): Сопротивление разомкнутого ключа (None — разрыв).
+            threshold (float): Порог управляющего сигнала.
+        """
+        super().__init__(subcircuit_name, *self.NODES)
+        self.R(1, 'n1', 'n2', r_on @ u_Ohm)
+        self.control = control
+        self.r_on = float(r_on)
+        self.r_off = None if r_off is None else float(r_off)
+        self.threshold = float(threshold)
+
+    def closed(self, time):
+        """
+        Возвращает состояние ключа (True — замкнут) в момент или массиве моментов времени.
+        """
+        return np.asarray(self.control(time)) > self.threshold
+
+    def switching_times(self, start: float, stop: float) -> np.ndarray:
+        """
+        Возвращает моменты возможного переключения внутри интервала (start, stop).
+
+        Между точками излома управляющий сигнал непрерывен: на каждом таком отрезке ищутся
+        пересечения порога (для синусоиды — с шагом в восьмую часть периода, для кусочно-линейных
+        сигналов — по концам отрезка), корень уточняется методом Брента. Сами точки излома тоже
+        возвращаются: в них сигнал может перескочить через порог.
+
+        Аргументы:
+            start (float): Начало интервала.
+            stop (float): Конец интервала.
+
+        Возвращает:
+            np.ndarray: Отсортированные моменты времени.
+        """
+        breakpoints = self.control.breakpoints(start, stop)
+        edges = np.concatenate([[start], breakpoints, [stop]])
+        times = [breakpoints]
+        period = self.control.period
+
+        def level(t):
+            return float(self.control(t)) - self.threshold
+
+        for left, right in zip(edges[:-1], edges[1:]):
+            count = 2 if not period else max(2, int(np.ceil(8 * (right - left) / period)) + 1)
+            inset = 1e-9 * (right - left)
+            samples = np.linspace(left + inset, right - inset, count)
+            values = np.asarray(self.control(samples)) - self.threshold
+            for a, b, va, vb in zip(samples[:-1], samples[1:], values[:-1], values[1:]):
+                if va * vb < 0:
+                    times.append([brentq(level, a, b, xtol=1e-15 + 1e-12 * abs(b))])
+        return np.unique(np.concatenate(times))
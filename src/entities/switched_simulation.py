@@ -0,0 +1,176 @@
+import numpy as np
+from scipy.integrate import OdeSolution
+from time import perf_counter
+from entities.circuit_simulation import CircuitSimulation
+from entities.compiled_model import LinearModel
+from entities.model_cache import ModelCache
+from entities.netlist import Netlist
+from entities.transient_result import TransientResult
+from utilits.plotting import solve_piecewise
+from utilits.stiffness import select_solver_settings
+
+class SwitchedSimulation:
+    """
+    Переходный процесс схемы с идеальными ключами (Switch), меняющими топологию во времени.
+
+    Интегрирование идёт от события к событию: моменты переключения известны заранее из управляющих
+    сигналов ключей, на каждом отрезке между ними действует одна конфигурация — маска состояния
+    ключей (бит i — i-й ключ замкнут). Модель конфигурации строится один раз (символьно в бэкенде
+    'kirchhoff' или численно в бэкенде 'numeric') и хранится в кэше по маске, поэтому при тысячах
+    переключений ШИМ схема анализируется столько раз, сколько у неё различных конфигураций.
+
+    Модели всех конфигураций приводятся к направлениям элементов (U = V(n+) - V(n-), ток от n+ к n-),
+    чтобы состояние передавалось через переключение без смены знаков.
+
+    Атрибуты:
+        netlist (Netlist): Схема с ключами.
+        backend (str): Бэкенд построения модели конфигурации ('kirchhoff' или 'numeric').
+        cache (ModelCache | None): Дисковый кэш символьных уравнений конфигураций.
+        state_variables (list): Переменные состояния (общие для всех конфигураций).
+        models (dict): Кэш моделей: маска -> (LinearModel, собственные числа A).
+        analysis_times (dict): Время построения модели каждой конфигурации в секундах.
+        events (int): Число переключений в последнем расчёте.
+        cache_hits (int): Число отрезков последнего расчёта, взявших модель из кэша.
+        initial_conditions (dict | None): Начальные условия в направлениях элементов.
+    """
+    BACKENDS = ('kirchhoff', 'numeric')
+
+    def __init__(self, circuit, backend: str = 'numeric', cache: ModelCache = None) -> None:
+        """
+        Разбирает схему; модели конфигураций строятся при первом использовании.
+
+        Аргументы:
+            circuit: Схема PySpice с ключами (подцепи Switch) или Netlist.
+            backend (str): 'numeric' — численная сборка каждой конфигурации, 'kirchhoff' — символьный анализ
+                (генератор уравнений Кирхгофа поддерживает не все топологии преобразователей).
+            cache (ModelCache, optional): Дисковый кэш символьных уравнений по хэшу топологии конфигурации.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.netlist = circuit if isinstance(circuit, Netlist) else Netlist.from_circuit(circuit)
+        if not self.netlist.switches:
+            raise ValueError("Circuit has no switches; use CircuitSimulation")
+        self.backend = backend
+        self.cache = cache
+        self.state_variables = [f"{'I' if self.netlist.is_type(key, Netlist.INDUCTOR) else 'U'}_{key}"
+                                for key in self.netlist.keys_of_type(Netlist.INDUCTOR, Netlist.CAPACITOR)]
+        self.models = {}
+        self.analysis_times = {}
+        self.events = 0
+        self.cache_hits = 0
+        self.initial_conditions = None
+
+    def switch_state(self, time: float) -> int:
+        """
+        Возвращает маску состояния ключей в момент времени time.
+        """
+        mask = 0
+        for bit, switch in enumerate(self.netlist.switches.values()):
+            if switch.closed(time):
+                mask |= 1 << bit
+        return mask
+
+    def configuration(self, mask: int) -> CircuitSimulation:
+        """
+        Возвращает анализ схемы для состояния ключей mask (без кэширования).
+        """
+        return CircuitSimulation(self.netlist.configuration(mask), backend=self.backend, cache=self.cache)
+
+    def model(self, mask: int) -> tuple:
+        """
+        Возвращает модель конфигурации из кэша, строя её при первом обращении.
+
+        Аргументы:
+            mask (int): Маска состояния ключей.
+
+        Возвращает:
+            tuple: (LinearModel в направлениях элементов, собственные числа матрицы A).
+        """
+        if mask not in self.models:
+            start = perf_counter()
+            simulation = self.configuration(mask)
+            model = simulation.to_state_space()
+            self.models[mask] = (LinearModel(model, self.netlist.input_waveforms()), np.linalg.eigvals(model.A))
+            self.analysis_times[mask] = perf_counter() - start
+        return self.models[mask]
+
+    def schedule(self, start: float, stop: float) -> tuple:
+        """
+        Разбивает интервал на отрезки постоянной конфигурации.
+
+        Аргументы:
+            start (float): Начало интервала.
+            stop (float): Конец интервала.
+
+        Возвращает:
+            tuple: (границы отрезков размера (k + 1,), маски отрезков размера (k,)).
+        """
+        times = [switch.switching_times(start, stop) for switch in self.netlist.switches.values()]
+        edges = np.unique(np.concatenate([[start, stop], *times]))
+        masks = [self.switch_state(0.5 * (left + right)) for left, right in zip(edges[:-1], edges[1:])]
+        keep = [0] + [k for k in range(1, len(masks)) if masks[k] != masks[k - 1]]
+        return np.append(edges[keep], stop), np.array([masks[k] for k in keep])
+
+    def set_initial_conditions(self, initial_conditions: dict = None) -> None:
+        """
+        Устанавливает начальные условия для индуктивностей и конденсаторов (в направлениях элементов).
+
+        Не заданные значения берутся из рабочей точки по постоянному току для состояния ключей при t = 0.
+
+        Аргументы:
+            initial_conditions (dict, optional): Начальные условия по именам элементов ('L1', 'C1').
+        """
+        initial_conditions = initial_conditions or {}
+        self.initial_conditions = {}
+        for key, value in initial_conditions.items():
+            prefix = 'I' if self.netlist.is_type(key, Netlist.INDUCTOR) else 'U'
+            self.initial_conditions[f"{prefix}_{key}"] = value
+        missing = [name for name in self.state_variables if name not in self.initial_conditions]
+        if missing:
+            operating_point = self.configuration(self.switch_state(0.0)).operating_point()
+            for name in missing:
+                self.initial_conditions[name] = operating_point[name]
+
+    def analyze(self, end_time: float, method: str = None, max_step: float = None) -> TransientResult:
+        """
+        Рассчитывает переходный процесс от события к событию.
+
+        На каждом отрезке постоянной конфигурации решатель запускается заново с модели из кэша и
+        состояния в конце предыдущего отрезка; внутри отрезка он перезапускается и в точках излома
+        источников. Метод и максимальный шаг выбираются по собственным числам модели конфигурации.
+
+        Аргументы:
+            end_time (float): Время окончания расчёта.
+            method (str, optional): Метод solve_ivp (по умолчанию — по жёсткости конфигурации).
+            max_step (float, optional): Максимальный шаг solve_ivp.
+
+        Возвращает:
+            TransientResult: Моменты времени, значения переменных состояния и плотный выход.
+        """
+        if self.initial_conditions is None:
+            raise ValueError("Initial conditions are not set")
+        edges, masks = self.schedule(0.0, float(end_time))
+        self.events = len(masks) - 1
+        self.cache_hits = 0
+        state = np.array([self.initial_conditions[name] for name in self.state_variables], dtype=float)
+        times, values, interpolants, ts = [], [], [], [edges[:1]]
+        for k, (left, right, mask) in enumerate(zip(edges[:-1], edges[1:], masks.tolist())):
+            self.cache_hits += mask in self.models
+            model, eigenvalues = self.model(mask)
+            settings = select_solver_settings(eigenvalues, end_time=end_time, method=method, max_step=max_step,
+                                              source_period=self.netlist.shortest_period())
+            options = {'method': settings['method'], 'max_step': settings['max_step']}
+            if settings['method'] in ('Radau', 'BDF', 'LSODA'):
+                options['jac'] = model.jacobian
+            solution = solve_piecewise(model.rhs, (left, right), state, self.netlist.breakpoints(left, right),
+                                       dense_output=True, **options)
+            if not solution.success:
+                raise RuntimeError(solution.message)
+            keep = slice(1 if k else 0, None)
+            times.append(solution.t[keep])
+            values.append(solution.y[:, keep])
+            interpolants.extend(solution.sol.interpolants)
+            ts.append(solution.sol.ts[1:])
+            state = solution.y[:, -1]
+        return TransientResult(np.concatenate(times), np.hstack(values), self.state_variables,
+                               interpolant=OdeSolution(np.concatenate(ts), interpolants))
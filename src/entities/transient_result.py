@@ -0,0 +1,91 @@
+import numpy as np
+
+class TransientResult:
+    """
+    Результат расчёта переходного процесса без привязки к графическому интерфейсу.
+
+    Хранит моменты времени и значения всех переменных состояния в непрерывных (C-contiguous)
+    массивах NumPy. Значения в произвольные моменты времени вычисляются без повторного решения:
+    по плотному выходу решателя (scipy OdeSolution) или, если его нет (расчёт с постоянным шагом),
+    линейной интерполяцией между узлами сетки. Графики строятся только по запросу (plot).
+
+    Атрибуты:
+        time (np.ndarray): Моменты времени размера (число моментов,).
+        values (np.ndarray): Значения размера (число переменных, число моментов).
+        names (list): Имена переменных состояния.
+        interpolant (callable | None): Плотный выход решателя: interpolant(t) -> массив (число переменных, len(t)).
+    """
+    def __init__(self, time, values, names: list, interpolant=None) -> None:
+        """
+        Инициализирует результат расчёта.
+
+        Аргументы:
+            time (array-like): Моменты времени.
+            values (array-like): Значения размера (число переменных, число моментов).
+            names (list): Имена переменных состояния.
+            interpolant (callable, optional): Плотный выход решателя.
+        """
+        self.time = np.ascontiguousarray(time, dtype=float)
+        self.values = np.ascontiguousarray(values, dtype=float).reshape(-1, self.time.size)
+        self.names = list(names)
+        self.interpolant = interpolant
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Возвращает значения одной переменной по времени (представление без копирования).
+        """
+        return self.values[self.names.index(name)]
+
+    def __contains__(self, name: str) -> bool:
+        """
+        Проверяет, есть ли переменная в результате.
+        """
+        return name in self.names
+
+    def __len__(self) -> int:
+        """
+        Возвращает число моментов времени.
+        """
+        return self.time.size
+
+    def as_dict(self) -> dict:
+        """
+        Возвращает значения в виде словаря {имя: массив по времени}.
+        """
+        return dict(zip(self.names, self.values))
+
+    def __call__(self, time_points) -> np.ndarray:
+        """
+        Вычисляет значения всех переменных в произвольные моменты времени.
+
+        Аргументы:
+            time_points (float | array-like): Моменты времени в пределах расчёта.
+
+        Возвращает:
+            np.ndarray: Массив размера (число переменных, len(time_points)) или (число переменных,) для скаляра.
+        """
+        t = np.asarray(time_points, dtype=float)
+        if self.interpolant is not None:
+            return np.asarray(self.interpolant(t))
+        flat = np.atleast_1d(t)
+        right = np.clip(np.searchsorted(self.time, flat, side='right'), 1, self.time.size - 1)
+        left = right - 1
+        span = self.time[right] - self.time[left]
+        weight = np.where(span > 0, (flat - self.time[left]) / np.where(span > 0, span, 1.0), 0.0)
+        result = self.values[:, left] * (1 - weight) + self.values[:, right] * weight
+        return result[:, 0] if t.ndim == 0 else result
+
+    def plot(self, names: list = None, show: bool = True):
+        """
+        Строит графики переменных по времени. matplotlib импортируется только здесь.
+
+        Аргументы:
+            names (list, optional): Имена переменных для графика; по умолчанию — все.
+            show (bool): Показать окно с графиком (plt.show).
+
+        Возвращает:
+            matplotlib.axes.Axes: Оси графика.
+        """
+        from utilits.plotting import plot_time_series
+        names = self.names if names is None else names
+        return plot_time_series(self.time, {name: self[name] for name in names}, show=show)
@@ -0,0 +1,161 @@
+import json
+import os
+import numpy as np
+from entities.transient_result import TransientResult
+
+class TransientStore:
+    """
+    Хранилище переходного процесса на диске: по одному файлу .npy на переменную (столбцовый формат).
+
+    Файлы создаются сразу на всю длину расчёта и заполняются окнами по времени через memory-mapping,
+    поэтому в памяти находится только текущее окно. Файл meta.json (записывается атомарно после
+    каждого окна) хранит число записанных отсчётов и полное состояние решателя в конце последнего
+    окна: по нему прерванный расчёт продолжается, а читатели отображают уже записанную часть
+    файлов в память без копирования, не дожидаясь окончания расчёта.
+
+    Атрибуты:
+        directory (str): Каталог хранилища.
+        names (list): Имена переменных.
+        time_step (float): Шаг по времени между отсчётами.
+        sample_count (int): Полное число отсчётов расчёта.
+        count (int): Число уже записанных отсчётов.
+        state (np.ndarray | None): Состояние решателя в последнем записанном отсчёте.
+    """
+    META = 'meta.json'
+    SUFFIX = '.npy'
+    VERSION = 1
+
+    def __init__(self, directory: str) -> None:
+        """
+        Инициализирует хранилище в каталоге (файлы не создаются и не читаются).
+
+        Аргументы:
+            directory (str): Каталог хранилища.
+        """
+        self.directory = directory
+        self.names = []
+        self.time_step = None
+        self.sample_count = 0
+        self.count = 0
+        self.state = None
+        self._columns = None
+
+    def exists(self) -> bool:
+        """
+        Проверяет, есть ли в каталоге сохранённый расчёт.
+        """
+        return os.path.exists(os.path.join(self.directory, self.META))
+
+    def _path(self, name: str) -> str:
+        """
+        Возвращает путь к файлу переменной.
+        """
+        return os.path.join(self.directory, name + self.SUFFIX)
+
+    def create(self, names: list, time_step: float, sample_count: int) -> None:
+        """
+        Создаёт файлы переменных на всю длину расчёта; прежние данные в каталоге перезаписываются.
+
+        Аргументы:
+            names (list): Имена переменных.
+            time_step (float): Шаг по времени между отсчётами.
+            sample_count (int): Полное число отсчётов.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if self.exists():
+            os.remove(os.path.join(self.directory, self.META))
+        self.names = list(names)
+        self.time_step = float(time_step)
+        self.sample_count = int(sample_count)
+        self.count = 0
+        self.state = None
+        self._columns = [np.lib.format.open_memmap(self._path(name), mode='w+', dtype=float, shape=(self.sample_count,))
+                         for name in self.names]
+        self._write_meta()
+
+    def open(self, writable: bool = False) -> 'TransientStore':
+        """
+        Читает meta.json и отображает файлы переменных в память.
+
+        Аргументы:
+            writable (bool): Открыть файлы для продолжения записи.
+
+        Возвращает:
+            TransientStore: Это же хранилище.
+        """
+        with open(os.path.join(self.directory, self.META)) as file:
+            meta = json.load(file)
+        if meta['version'] != self.VERSION:
+            raise ValueError(f"Unsupported store version: {meta['version']}")
+        self.names = meta['names']
+        self.time_step = meta['time_step']
+        self.sample_count = meta['sample_count']
+        self.count = meta['count']
+        self.state = None if meta['state'] is None else np.array(meta['state'], dtype=float)
+        self._columns = [np.load(self._path(name), mmap_mode='r+' if writable else 'r') for name in self.names]
+        return self
+
+    def _write_meta(self) -> None:
+        """
+        Атомарно записывает meta.json (через временный файл и os.replace).
+        """
+        meta = {
+            'version': self.VERSION,
+            'names': self.names,
+            'time_step': self.time_step,
+            'sample_count': self.sample_count,
+            'count': self.count,
+            'state': None if self.state is None else self.state.tolist(),
+        }
+        path = os.path.join(self.directory, self.META)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as file:
+            json.dump(meta, file)
+        os.replace(temporary, path)
+
+    def append(self, values: np.ndarray, state: np.ndarray) -> None:
+        """
+        Дописывает окно отсчётов и сохраняет состояние решателя на его конце.
+
+        Данные сбрасываются на диск до обновления meta.json, поэтому после сбоя записанное
+        число отсчётов никогда не опережает данные.
+
+        Аргументы:
+            values (np.ndarray): Значения размера (число переменных, число отсчётов окна).
+            state (np.ndarray): Состояние решателя в последнем отсчёте окна.
+        """
+        values = np.asarray(values, dtype=float)
+        stop = self.count + values.shape[1]
+        if stop > self.sample_count:
+            raise ValueError("Window exceeds the length of the run")
+        for column, row in zip(self._columns, values):
+            column[self.count:stop] = row
+            column.flush()
+        self.count = stop
+        self.state = np.array(state, dtype=float)
+        self._write_meta()
+
+    @property
+    def complete(self) -> bool:
+        """
+        Записаны ли все отсчёты расчёта.
+        """
+        return self.count >= self.sample_count
+
+    def time(self) -> np.ndarray:
+        """
+        Возвращает моменты времени записанных отсчётов.
+        """
+        return np.arange(self.count) * self.time_step
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Возвращает записанные значения переменной — отображение файла в память без копирования.
+        """
+        return self._columns[self.names.index(name)][:self.count]
+
+    def to_result(self) -> TransientResult:
+        """
+        Загружает записанную часть расчёта в память в виде TransientResult.
+        """
+        return TransientResult(self.time(), [self[name] for name in self.names], self.names)
@@ -1,32 +1,139 @@
 import PySpice.Logging.Logging as Logging
 logger = Logging.setup_logging()
+import numpy as np
 from PySpice.Spice.Netlist import Circuit, SubCircuit
 from PySpice.Unit import *
 
 class TransmissionLine(SubCircuit):
     """
-    Класс, описывающий линию передачи как подцепь с одним резистором.
+    Класс, описывающий линию передачи как подцепь.
+
+    Без погонных параметров линия — короткое замыкание (один резистор 0 Ом, ключ "Line X1" в Netlist).
+    С погонными параметрами R, L, G, C линия длины length разбивается на sections одинаковых
+    Г-образных звеньев: последовательные R·Δx и L·Δx, затем параллельные C·Δx и G·Δx на землю
+    (узел 0), Δx = length / sections. Такая линия раскрывается в Netlist.from_circuit в элементы
+    с именами в стиле ngspice (L.X1.L3, внутренние узлы X1.b3), как подцепи read_netlist. Звеньев
+    должно быть много на длину волны самой высокой частоты сигнала (не меньше 10–20).
 
     Аргументы:
         subcircuit_name (str): Имя подцепи (используется для идентификации).
 
     Атрибуты:
         NODES (tuple): Кортеж с именами узлов ('n1', 'n2').
+        resistance, inductance, conductance, capacitance (float): Погонные параметры (Ом/м, Гн/м, См/м, Ф/м).
+        length (float): Длина линии.
+        sections (int): Число звеньев.
+        distributed (bool): Линия с погонными параметрами (иначе — короткое замыкание).
     """
     NODES = ('n1', 'n2')
 
-    def __init__(self, subcircuit_name: str) -> None:
+    def __init__(self, subcircuit_name: str, resistance: float = 0.0, inductance: float = 0.0,
+                 conductance: float = 0.0, capacitance: float = 0.0, length: float = 1.0, sections: int = 1) -> None:
         """
         Инициализирует подцепь TransmissionLine с заданным именем.
 
         Аргументы:
             subcircuit_name (str): Имя подцепи.
+            resistance (float): Погонное сопротивление.
+            inductance (float): Погонная индуктивность.
+            conductance (float): Погонная проводимость утечки.
+            capacitance (float): Погонная ёмкость.
+            length (float): Длина линии.
+            sections (int): Число звеньев.
 
         Возвращает:
             None
         """
         super().__init__(subcircuit_name, *self.NODES)
-        self.R(1, 'n1', 'n2', 0 @ u_Ohm)
+        self.resistance = float(resistance)
+        self.inductance = float(inductance)
+        self.conductance = float(conductance)
+        self.capacitance = float(capacitance)
+        self.length = float(length)
+        self.sections = int(sections)
+        self.distributed = any(value > 0 for value in (resistance, inductance, conductance, capacitance))
+        if not self.distributed:
+            self.R(1, 'n1', 'n2', 0 @ u_Ohm)
+            return
+        if self.capacitance <= 0 or (self.resistance <= 0 and self.inductance <= 0):
+            raise ValueError("A distributed line needs capacitance and resistance or inductance per unit length")
+        if self.sections < 1 or self.length <= 0:
+            raise ValueError("A distributed line needs a positive length and at least one section")
+        dx = self.length / self.sections
+        start = 'n1'
+        for k in range(1, self.sections + 1):
+            end = 'n2' if k == self.sections else f"b{k}"
+            middle = f"a{k}" if self.resistance > 0 and self.inductance > 0 else end
+            if self.resistance > 0:
+                self.R(k, start, middle, self.resistance * dx @ u_Ohm)
+            if self.inductance > 0:
+                self.L(k, middle if self.resistance > 0 else start, end, self.inductance * dx @ u_H)
+            self.C(k, end, self.gnd, self.capacitance * dx @ u_F)
+            if self.conductance > 0:
+                self.R(f"G{k}", end, self.gnd, 1 / (self.conductance * dx) @ u_Ohm)
+            start = end
+
+    @property
+    def characteristic_impedance(self) -> float:
+        """
+        Волновое сопротивление линии без потерь √(L / C).
+        """
+        return float(np.sqrt(self.inductance / self.capacitance)) if self.capacitance > 0 else 0.0
+
+    @property
+    def delay(self) -> float:
+        """
+        Время распространения по линии без потерь length · √(L C).
+        """
+        return self.length * float(np.sqrt(self.inductance * self.capacitance))
+
+    def delay_line(self, subcircuit_name: str = None) -> 'DelayLine':
+        """
+        Возвращает модель этой линии без потерь с задержкой (DelayLine) с теми же Z0 и τ.
+
+        Аргументы:
+            subcircuit_name (str, optional): Имя новой подцепи (по умолчанию — имя этой линии).
+
+        Возвращает:
+            DelayLine: Подцепь линии с задержкой.
+        """
+        return DelayLine(subcircuit_name or self.name, self.characteristic_impedance, self.delay)
+
+class DelayLine(SubCircuit):
+    """
+    Класс, описывающий линию передачи без потерь моделью Бержерона (методом характеристик) как подцепь.
 
+    Линия задаётся волновым сопротивлением Z0 и временем распространения τ и содержит один элемент
+    SPICE T (T1 n1 0 n2 0 Z0=... TD=...), оба порта отсчитываются от земли. В отличие от звеньев
+    TransmissionLine у неё нет переменных состояния: каждый порт — проводимость 1/Z0 и источник тока,
+    заданный волной, вышедшей из другого порта за τ до этого (DelayHistory). Поддерживается бэкендом
+    'mna'; шаг по времени не должен превышать τ.
 
+    Аргументы:
+        subcircuit_name (str): Имя подцепи (используется для идентификации).
+
+    Атрибуты:
+        NODES (tuple): Кортеж с именами узлов ('n1', 'n2').
+        impedance (float): Волновое сопротивление Z0, Ом.
+        delay (float): Время распространения τ, с.
+    """
+    NODES = ('n1', 'n2')
+
+    def __init__(self, subcircuit_name: str, impedance: float, delay: float) -> None:
+        """
+        Инициализирует подцепь DelayLine с заданным именем.
+
+        Аргументы:
+            subcircuit_name (str): Имя подцепи.
+            impedance (float): Волновое сопротивление Z0.
+            delay (float): Время распространения τ.
 
+        Возвращает:
+            None
+        """
+        super().__init__(subcircuit_name, *self.NODES)
+        self.impedance = float(impedance)
+        self.delay = float(delay)
+        if self.impedance <= 0 or self.delay <= 0:
+            raise ValueError("A delay line needs a positive impedance and delay")
+        self.TransmissionLine(1, 'n1', self.gnd, 'n2', self.gnd, impedance=self.impedance, time_delay=self.delay)
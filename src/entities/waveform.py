@@ -0,0 +1,142 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from PySpice.Spice.HighLevelElement import SinusoidalMixin, PulseMixin, PieceWiseLinearMixin
+
+class Waveform(ABC):
+    """
+    Зависимость значения источника от времени (SIN, PULSE, PWL в терминах SPICE).
+
+    Значение вычисляется векторно: вызов с массивом моментов времени возвращает массив значений
+    одной операцией NumPy. Точки излома (фронты импульсов, узлы PWL, начало синусоиды после
+    задержки) возвращает breakpoints(): решатель останавливается в них и начинает шаг заново,
+    а не дробит шаг, пытаясь разрешить разрыв.
+
+    Атрибуты:
+        period (float | None): Характерный период (для синусоиды — период колебаний), по которому
+            ограничивается максимальный шаг решателя; None, если ограничение не нужно.
+    """
+    period = None
+
+    @abstractmethod
+    def __call__(self, time):
+        """
+        Возвращает значение источника в момент (или массив моментов) времени.
+        """
+
+    def breakpoints(self, start: float, stop: float) -> np.ndarray:
+        """
+        Возвращает отсортированные точки излома внутри интервала (start, stop).
+        """
+        return np.empty(0)
+
+    @staticmethod
+    def from_element(element) -> 'Waveform':
+        """
+        Строит зависимость от времени по источнику PySpice.
+
+        Аргументы:
+            element: Источник SinusoidalVoltageSource, PulseVoltageSource, PieceWiseLinearVoltageSource
+                или соответствующий источник тока.
+
+        Возвращает:
+            Waveform: Зависимость значения источника от времени.
+        """
+        if isinstance(element, SinusoidalMixin):
+            return SineWaveform(float(element.offset), float(element.amplitude), float(element.frequency),
+                                float(element.delay), float(element.damping_factor))
+        if isinstance(element, PulseMixin):
+            return PulseWaveform(float(element.initial_value), float(element.pulsed_value), float(element.delay_time),
+                                 float(element.rise_time), float(element.fall_time), float(element.pulse_width),
+                                 float(element.period))
+        if isinstance(element, PieceWiseLinearMixin):
+            values = [float(value) for value in element.values]
+            return PiecewiseLinearWaveform(values[0::2], values[1::2],
+                                           None if element.repeat_time is None else float(element.repeat_time),
+                                           0.0 if element.delay_time is None else float(element.delay_time))
+        raise ValueError(f"Unsupported source waveform of {element.name}: {type(element).__name__}")
+
+class SineWaveform(Waveform):
+    """
+    Затухающая синусоида SIN(VO VA FREQ TD THETA):
+    VO при t < TD, иначе VO + VA exp(-THETA (t - TD)) sin(2π FREQ (t - TD)).
+    """
+    def __init__(self, offset: float, amplitude: float, frequency: float, delay: float = 0.0, damping: float = 0.0) -> None:
+        self.offset = offset
+        self.amplitude = amplitude
+        self.frequency = frequency
+        self.delay = delay
+        self.damping = damping
+        self.period = 1.0 / frequency if frequency > 0 else None
+
+    def __call__(self, time):
+        shifted = np.maximum(np.asarray(time, dtype=float) - self.delay, 0.0)
+        return self.offset + self.amplitude * np.exp(-self.damping * shifted) * np.sin(2 * np.pi * self.frequency * shifted)
+
+    def breakpoints(self, start: float, stop: float) -> np.ndarray:
+        return np.array([self.delay]) if start < self.delay < stop else np.empty(0)
+
+class PulseWaveform(Waveform):
+    """
+    Трапециевидные импульсы PULSE(V1 V2 TD TR TF PW PER). Нулевые TR и TF — мгновенный фронт;
+    нулевой PER — одиночный импульс.
+    """
+    def __init__(self, initial: float, pulsed: float, delay: float, rise: float, fall: float, width: float, period: float) -> None:
+        self.initial = initial
+        self.pulsed = pulsed
+        self.delay = delay
+        self.rise = rise
+        self.fall = fall
+        self.width = width
+        self.pulse_period = period if period > 0 else np.inf
+        self.edges = np.array([0.0, rise, rise + width, rise + width + fall])
+
+    def __call__(self, time):
+        time = np.asarray(time, dtype=float)
+        phase = time - self.delay
+        if np.isfinite(self.pulse_period):
+            phase = np.where(phase >= 0, np.mod(phase, self.pulse_period), phase)
+        level = np.interp(phase, self.edges, [0.0, 1.0, 1.0, 0.0])
+        if self.rise == 0:
+            level = np.where((phase >= 0) & (phase < self.width), 1.0, level)
+        if self.fall == 0:
+            level = np.where(phase >= self.rise + self.width, 0.0, level)
+        return self.initial + (self.pulsed - self.initial) * level
+
+    def breakpoints(self, start: float, stop: float) -> np.ndarray:
+        if np.isfinite(self.pulse_period):
+            first = max(0, int(np.floor((start - self.delay) / self.pulse_period)))
+            last = max(first, int(np.ceil((stop - self.delay) / self.pulse_period)))
+            points = (self.delay + self.pulse_period * np.arange(first, last + 1)[:, None] + self.edges).ravel()
+        else:
+            points = self.delay + self.edges
+        points = np.unique(points)
+        return points[(points > start) & (points < stop)]
+
+class PiecewiseLinearWaveform(Waveform):
+    """
+    Кусочно-линейная зависимость PWL(T1 V1 T2 V2 ...) с необязательным повтором с момента
+    repeat_time и задержкой delay; после последней точки без повтора значение не меняется.
+    """
+    def __init__(self, times: list, values: list, repeat_time: float = None, delay: float = 0.0) -> None:
+        self.times = np.asarray(times, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        self.repeat_time = repeat_time
+        self.delay = delay
+        self.cycle = self.times[-1] - repeat_time if repeat_time is not None else 0.0
+
+    def __call__(self, time):
+        local = np.asarray(time, dtype=float) - self.delay
+        if self.cycle > 0:
+            local = np.where(local > self.times[-1],
+                             self.repeat_time + np.mod(local - self.repeat_time, self.cycle), local)
+        return np.interp(local, self.times, self.values)
+
+    def breakpoints(self, start: float, stop: float) -> np.ndarray:
+        points = self.delay + self.times
+        if self.cycle > 0:
+            tail = self.times[self.times >= self.repeat_time] - self.repeat_time
+            cycles = max(0, int(np.ceil((stop - self.delay - self.times[-1]) / self.cycle)))
+            repeats = self.delay + self.times[-1] + self.cycle * np.arange(cycles)[:, None] + tail
+            points = np.concatenate([points, repeats.ravel()])
+        points = np.unique(points)
+        return points[(points > start) & (points < stop)]
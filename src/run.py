@@ -18,4 +18,4 @@ sim.print_currents()
 sim.print_voltages()
 
 sim.set_initial_conditions({'L1': 100.0, 'C1': 100.0})
-sim.analyze()
\ No newline at end of file
+sim.analyze().plot()
\ No newline at end of file
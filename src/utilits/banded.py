@@ -0,0 +1,62 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+def bandwidths(matrix) -> tuple:
+    """
+    Возвращает число поддиагоналей и наддиагоналей разреженной матрицы.
+
+    Аргументы:
+        matrix: Квадратная матрица (scipy.sparse или np.ndarray).
+
+    Возвращает:
+        tuple: (lower, upper); для диагональной матрицы — (0, 0).
+    """
+    rows, cols = csr_matrix(matrix).nonzero()
+    if not rows.size:
+        return 0, 0
+    offsets = rows - cols
+    return int(max(offsets.max(), 0)), int(max(-offsets.min(), 0))
+
+def band_ordering(matrix) -> tuple:
+    """
+    Находит порядок переменных с наименьшей шириной ленты: исходный или обратный Катхилла — Макки.
+
+    Упорядочение строится по симметричному шаблону A + Aᵀ; берётся тот порядок, в котором лента уже.
+    Цепочка звеньев линии в порядке элементов уже ленточная, а элементы, описанные вне линии
+    (нагрузка, источник), переставляются к своим соседям.
+
+    Аргументы:
+        matrix: Квадратная разреженная матрица.
+
+    Возвращает:
+        tuple: (перестановка, lower, upper); матрица в новом порядке — matrix[перестановка][:, перестановка].
+    """
+    matrix = csr_matrix(matrix)
+    natural = np.arange(matrix.shape[0])
+    lower, upper = bandwidths(matrix)
+    pattern = csr_matrix((np.ones(matrix.nnz), matrix.indices, matrix.indptr), shape=matrix.shape)
+    permutation = reverse_cuthill_mckee((pattern + pattern.T).tocsr(), symmetric_mode=True).astype(int)
+    reordered = bandwidths(matrix[permutation][:, permutation])
+    if sum(reordered) < lower + upper:
+        return permutation, *reordered
+    return natural, lower, upper
+
+def to_banded(matrix, lower: int, upper: int) -> np.ndarray:
+    """
+    Переводит матрицу в ленточный формат LAPACK: ab[upper + i - j, j] = a[i, j].
+
+    Этот формат принимают scipy.linalg.solve_banded и LSODA (параметры lband, uband).
+
+    Аргументы:
+        matrix: Квадратная матрица с шириной ленты не больше (lower, upper).
+        lower (int): Число поддиагоналей.
+        upper (int): Число наддиагоналей.
+
+    Возвращает:
+        np.ndarray: Массив размера (lower + upper + 1, n).
+    """
+    matrix = csr_matrix(matrix).tocoo()
+    banded = np.zeros((lower + upper + 1, matrix.shape[0]))
+    np.add.at(banded, (upper + matrix.row - matrix.col, matrix.col), matrix.data)
+    return banded
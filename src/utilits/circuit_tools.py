@@ -1,4 +1,5 @@
 from collections import defaultdict
+from entities.netlist import Netlist
 
 def get_inductors_and_capacitors(circuit) -> list:
     """
@@ -10,11 +11,7 @@ def get_inductors_and_capacitors(circuit) -> list:
     Возвращает:
         list: Список имён индуктивностей и конденсаторов.
     """
-    inductors_and_capacitors = []
-    for name in circuit.element_names:
-        if 'L' in name or 'C' in name:
-            inductors_and_capacitors.append(name)
-    return inductors_and_capacitors
+    return [element.name for element in circuit.elements if element.PREFIX in ('L', 'C')]
 
 def split_variable_list(variables_str: str) -> list:
     """
@@ -70,23 +67,7 @@ def get_element_nodes_dict(circuit) -> dict:
     Возвращает:
         dict: Словарь, где ключ — имя элемента, значение — список его узлов и параметров.
     """
-    element_nodes_dict = {}
-    for circuit_element in circuit.elements:
-        if circuit_element.PREFIX == 'V':
-            element_nodes_dict[circuit_element.name] = circuit_element.node_names + [circuit_element.dc_value.value]
-        elif circuit_element.PREFIX == 'L':
-            element_nodes_dict[circuit_element.name] = circuit_element.node_names + [circuit_element.inductance.value]
-        elif circuit_element.PREFIX == 'I':
-            element_nodes_dict[circuit_element.name] = circuit_element.node_names + [circuit_element.current.value]
-        elif circuit_element.PREFIX == 'R':
-            element_nodes_dict[circuit_element.name] = circuit_element.node_names + [circuit_element.resistance.value]
-        elif circuit_element.PREFIX == 'C':
-            element_nodes_dict[circuit_element.name] = circuit_element.node_names + [circuit_element.capacitance.value]
-        elif circuit_element.PREFIX == 'X':
-            element_nodes_dict[f"Line {circuit_element.name}"] = circuit_element.node_names
-        else:
-            return "Error at PREFIX"
-    return element_nodes_dict
+    return dict(Netlist.from_circuit(circuit))
 
 def get_node_connections(circuit) -> dict:
     """
@@ -154,46 +135,78 @@ def find_all_paths_between_nodes(graph: dict, start: str, end: str, path: list =
 def assign_branch_names(branches: list, nodes_list: dict) -> dict:
     """
     Присваивает имена ветвям на основе списка узлов.
+
+    Элемент между соседними узлами ветви находится по индексу пар узлов Netlist за O(1).
+    Ветвь с индуктивностью или конденсатором называется по нему, иначе — по первому
+    резистору или источнику напряжения.
     """
+    netlist = Netlist.from_nodes_dict(nodes_list)
     branch_names = {}
     for branch in branches:
         for i in range(len(branch) - 1):
-            pos1 = branch[i]
-            pos2 = branch[i + 1]
             name = ""
-            for key, value in nodes_list.items():
-                if sorted(value[0] + value[1]) == sorted(pos1 + pos2):
-                    if "X" in key:
-                        break
-                    elif "R" in key or "V" in key:
-                        name = f"I_{key}"
-                        break
-                    elif "C" in key or "L" in key:
-                        name = f"I_{key}"
-                        if branch in branch_names.values():
-                            branch_names = {name if v == branch else k: v for k, v in branch_names.items()}
-                        else:
-                            branch_names[name] = branch
-                        break
+            for key in netlist.elements_between(branch[i], branch[i + 1]):
+                if netlist.is_type(key, Netlist.SUBCIRCUIT):
+                    break
+                elif netlist.is_type(key, Netlist.RESISTOR, Netlist.VOLTAGE_SOURCE):
+                    name = f"I_{key}"
+                    break
+                elif netlist.is_type(key, Netlist.CAPACITOR, Netlist.INDUCTOR):
+                    name = f"I_{key}"
+                    if branch in branch_names.values():
+                        branch_names = {name if v == branch else k: v for k, v in branch_names.items()}
+                    else:
+                        branch_names[name] = branch
+                    break
             if branch not in branch_names.values():
                 branch_names[name] = branch
     return branch_names
 
+def find_branch_paths(graph: dict, junction_nodes: list) -> list:
+    """
+    Находит ветви схемы — цепочки узлов между точками ветвления — за линейное время.
+
+    Каждое ребро графа проходится один раз, поэтому сложность O(V + E) вместо перебора
+    всех простых путей между парами узлов ветвления.
+
+    Аргументы:
+        graph (dict): Граф соединений между узлами.
+        junction_nodes (list): Узлы с более чем двумя соединениями.
+
+    Возвращает:
+        list: Список ветвей (каждая — список узлов от одной точки ветвления до другой).
+    """
+    order = {node: i for i, node in enumerate(junction_nodes)}
+    visited = set()
+    branches = []
+    for start in junction_nodes:
+        for neighbor in sorted(graph[start]):
+            if frozenset((start, neighbor)) in visited:
+                continue
+            visited.add(frozenset((start, neighbor)))
+            path = [start, neighbor]
+            while path[-1] not in order:
+                next_node = next((node for node in graph[path[-1]] if frozenset((path[-1], node)) not in visited), None)
+                if next_node is None:
+                    break
+                visited.add(frozenset((path[-1], next_node)))
+                path.append(next_node)
+            if path[-1] in order and order[path[-1]] < order[start]:
+                path.reverse()
+            branches.append(path)
+    return branches
+
 def calculate_branches(nodes_list: dict, connection_list: dict) -> dict:
     """
     Вычисляет ветви схемы на основе списка узлов и соединений.
     """
-    from itertools import combinations
     branches = []
     nodes = find_junction_nodes(connection_list)
     if nodes == 0:
         branches.append(find_single_path(connection_list) + ['0'])
         branches = assign_branch_names(branches, nodes_list)
     else:
-        node_combinations = list(combinations(nodes, 2))
-        node_combinations = [comb for comb in node_combinations if (comb[1], comb[0]) not in node_combinations]
-        for comb in node_combinations:
-            branches += find_all_paths_between_nodes(connection_list, comb[0], comb[1])
+        branches = find_branch_paths(connection_list, nodes)
         branches = assign_branch_names(branches, nodes_list)
     return branches
 
@@ -209,10 +222,11 @@ def substitute_element_values(formula: str, nodes: dict) -> str:
         str: Формула с подставленными значениями.
     """
     formula = str(formula)
+    netlist = Netlist.from_nodes_dict(nodes)
     for key, val in nodes.items():
-        if "X" in key:
+        if netlist.is_type(key, Netlist.SUBCIRCUIT):
             continue
-        elif "V" in key and key in str(formula):
+        elif netlist.is_type(key, Netlist.VOLTAGE_SOURCE) and key in str(formula):
             formula = formula.replace(f"U_{key}", str(val[2]))
         else:
             if key in formula:
@@ -220,36 +234,51 @@ def substitute_element_values(formula: str, nodes: dict) -> str:
                 formula = formula.replace(f"_{val[2]}", f"_{key}")
     return formula
 
+def index_branch_edges(currents: dict) -> dict:
+    """
+    Строит индекс рёбер ветвей: упорядоченная пара соседних узлов -> (номер ветви, имя ветви).
+
+    Для пары, встречающейся в нескольких ветвях, сохраняется первая ветвь.
+
+    Аргументы:
+        currents (dict): Словарь токов в ветвях (имя -> список узлов).
+
+    Возвращает:
+        dict: Индекс {(узел, узел): (номер ветви, имя ветви)}.
+    """
+    index = {}
+    for position, (key, branch) in enumerate(currents.items()):
+        for edge in zip(branch, branch[1:]):
+            index.setdefault(edge, (position, key))
+    return index
+
 def calculate_voltages(currents: dict, nodes_list: dict) -> dict:
     """
     Вычисляет напряжения на элементах схемы по токам и списку узлов.
+
+    Направление напряжения определяется по индексу рёбер ветвей за O(1) на элемент.
+
     Аргументы:
         currents (dict): Словарь токов в ветвях.
         nodes_list (dict): Словарь с информацией об узлах элементов.
     Возвращает:
         dict: Словарь напряжений на элементах.
     """
+    netlist = Netlist.from_nodes_dict(nodes_list)
+    edges = index_branch_edges(currents)
     voltages = {}
-    for key, value in nodes_list.items():
-        if "X" in key:
+    for key, value in netlist.items():
+        if netlist.is_type(key, Netlist.SUBCIRCUIT):
             continue
         node_pair = [value[0], value[1]]
-        if "V" in key:
-            for branch in currents.values():
-                if any(node_pair == branch[::-1][i:i+len(node_pair)] for i in range(len(branch[::-1]) - len(node_pair) + 1)):
-                    voltages[f"U_{key}"] = node_pair
-                    break
-                elif any(node_pair == branch[i:i+len(node_pair)] for i in range(len(branch) - len(node_pair) + 1)):
-                    voltages[f"-U_{key}"] = node_pair
-                    break
+        forward = edges.get((value[0], value[1]))
+        backward = edges.get((value[1], value[0]))
+        if forward is None and backward is None:
+            continue
+        if netlist.is_type(key, Netlist.VOLTAGE_SOURCE):
+            along = forward is not None and (backward is None or forward[0] < backward[0])
+            voltages[f"-U_{key}" if along else f"U_{key}"] = node_pair
         else:
-            for branch in currents.values():
-                if any(node_pair == branch[i:i+len(node_pair)] for i in range(len(branch) - len(node_pair) + 1)):
-                    voltages[f"U_{key}"] = node_pair
-                    break
-                elif any(node_pair == branch[::-1][i:i+len(node_pair)] for i in range(len(branch[::-1]) - len(node_pair) + 1)):
-                    voltages[f"-U_{key}"] = node_pair
-                    break
+            along = forward is not None and (backward is None or forward[0] <= backward[0])
+            voltages[f"U_{key}" if along else f"-U_{key}"] = node_pair
     return voltages
-    
-
@@ -1,5 +1,8 @@
 from scipy import *
 from sympy import *
+import networkx as nx
+from entities.netlist import Netlist
+from utilits.circuit_tools import index_branch_edges
 
 def is_sublist(main_list: list, sublist: list) -> bool:
     """
@@ -58,6 +61,132 @@ def find_all_paths_in_graph(element_graph: dict, start: str, end: str, path: lis
                     path_list.append(new_path)
     return path_list
 
+def build_spanning_tree(element_graph: dict, element_nodes: dict) -> tuple:
+    """
+    Строит нормальное остовное дерево графа схемы.
+
+    В дерево в первую очередь попадают источники напряжения, затем конденсаторы и линии,
+    затем резисторы; индуктивности по возможности остаются хордами. Поэтому фундаментальный
+    контур хорды-индуктивности проходит через источники и конденсаторы.
+
+    Аргументы:
+        element_graph (dict): Граф соединений между узлами.
+        element_nodes (dict): Словарь с информацией об узлах элементов.
+
+    Возвращает:
+        tuple: (словарь родителей узлов в дереве, словарь глубин узлов, список хорд — пар узлов).
+    """
+    netlist = Netlist.from_nodes_dict(element_nodes)
+    type_weights = {Netlist.SUBCIRCUIT: 1, Netlist.VOLTAGE_SOURCE: 0, Netlist.CAPACITOR: 1, Netlist.INDUCTOR: 3}
+    weights = {}
+    for key, value in netlist.items():
+        weight = type_weights.get(netlist.type_of(key), 2)
+        pair = frozenset(value[:2])
+        weights[pair] = min(weight, weights.get(pair, weight))
+    graph = nx.Graph()
+    for node, neighbors in element_graph.items():
+        for neighbor in neighbors:
+            graph.add_edge(node, neighbor, weight=weights.get(frozenset((node, neighbor)), 2))
+    tree = nx.minimum_spanning_tree(graph)
+    parent = {}
+    depth = {}
+    for root in sorted(tree.nodes):
+        if root in depth:
+            continue
+        parent[root] = None
+        depth[root] = 0
+        for u, v in nx.bfs_edges(tree, root):
+            parent[v] = u
+            depth[v] = depth[u] + 1
+    chords = [(u, v) for u, v in graph.edges if not tree.has_edge(u, v)]
+    return parent, depth, chords
+
+def get_tree_path(parent: dict, depth: dict, start: str, end: str) -> list:
+    """
+    Возвращает единственный путь между двумя узлами по остовному дереву.
+
+    Аргументы:
+        parent (dict): Родители узлов в дереве.
+        depth (dict): Глубины узлов в дереве.
+        start (str): Начальная вершина.
+        end (str): Конечная вершина.
+
+    Возвращает:
+        list: Путь (список вершин) от start до end.
+    """
+    head = [start]
+    tail = [end]
+    while head[-1] != tail[-1]:
+        if depth[head[-1]] >= depth[tail[-1]]:
+            head.append(parent[head[-1]])
+        else:
+            tail.append(parent[tail[-1]])
+    return head + tail[-2::-1]
+
+def edges_to_path(edges: set, start: str, end: str) -> list | None:
+    """
+    Преобразует множество рёбер в простой путь от start до end, если оно образует такой путь.
+
+    Аргументы:
+        edges (set): Множество рёбер (frozenset пар узлов).
+        start (str): Начальная вершина.
+        end (str): Конечная вершина.
+
+    Возвращает:
+        list | None: Путь (список вершин) или None, если рёбра не образуют простой путь.
+    """
+    adjacency = {}
+    for edge in edges:
+        u, v = tuple(edge)
+        adjacency.setdefault(u, []).append(v)
+        adjacency.setdefault(v, []).append(u)
+    if any(len(neighbors) > 2 for neighbors in adjacency.values()):
+        return None
+    path = [start]
+    while path[-1] != end:
+        next_node = next((node for node in adjacency.get(path[-1], []) if len(path) < 2 or node != path[-2]), None)
+        if next_node is None or next_node in path:
+            return None
+        path.append(next_node)
+    return path if len(path) - 1 == len(edges) else None
+
+def find_loop_paths(element_graph: dict, start: str, end: str, element_nodes: dict, spanning_tree: tuple = None) -> list:
+    """
+    Находит пути между двумя узлами по фундаментальным контурам нормального остовного дерева.
+
+    Вместо перебора всех простых путей (экспоненциального по числу контуров) возвращаются:
+    прямое ребро между узлами (если оно есть), путь по остовному дереву и пути, полученные
+    из него заменой участка фундаментальным контуром каждой хорды. Сложность полиномиальная.
+
+    Аргументы:
+        element_graph (dict): Словарь, представляющий граф.
+        start (str): Начальная вершина.
+        end (str): Конечная вершина.
+        element_nodes (dict): Словарь с информацией об узлах элементов.
+        spanning_tree (tuple, optional): Готовый результат build_spanning_tree для этой схемы;
+            если не задан, дерево строится заново.
+
+    Возвращает:
+        list: Список путей (каждый путь — список вершин).
+    """
+    if spanning_tree is None:
+        spanning_tree = build_spanning_tree(element_graph, element_nodes)
+    parent, depth, chords = spanning_tree
+    tree_path = get_tree_path(parent, depth, start, end)
+    tree_edges = {frozenset(edge) for edge in zip(tree_path, tree_path[1:])}
+    path_list = []
+    if end in element_graph.get(start, ()):
+        path_list.append([start, end])
+    if tree_path not in path_list:
+        path_list.append(tree_path)
+    for u, v in chords:
+        cycle = get_tree_path(parent, depth, u, v)
+        cycle_edges = {frozenset(edge) for edge in zip(cycle, cycle[1:])} | {frozenset((u, v))}
+        path = edges_to_path(tree_edges ^ cycle_edges, start, end)
+        if path is not None and path not in path_list:
+            path_list.append(path)
+    return path_list
+
 def get_kirchhoff_current_equation(branch: str, branch_current_map: dict) -> Eq:
     """
     Составляет уравнение по первому закону Кирхгофа для заданной ветви.
@@ -122,12 +251,11 @@ def get_resistor_names_from_path(path: list, element_nodes: dict) -> str:
     Возвращает:
         str: Строка с именами резисторов, разделёнными знаком '+'.
     """
+    netlist = Netlist.from_nodes_dict(element_nodes)
     resistors = []
-    for i in range(len(path)-1):
-        pos1 = path[i]
-        pos2 = path[i+1]
-        for key, value in element_nodes.items():
-            if ((pos1 == value[0] and pos2 == value[1]) or (pos1 == value[1] and pos2 == value[0])) and "R" in key:
+    for pos1, pos2 in zip(path, path[1:]):
+        for key in netlist.elements_between(pos1, pos2):
+            if netlist.is_type(key, Netlist.RESISTOR):
                 resistors.append(key)
     return "+".join(resistors)
 
@@ -142,11 +270,8 @@ def filter_valid_element_paths(path_list: list, element_nodes: dict) -> dict:
     Возвращает:
         dict: Словарь, где ключ — имя элемента, значение — путь (список узлов).
     """
-    valid = {}
-    for key, value in element_nodes.items():
-        if "X" in key or "V" in key or "R" in key:
-            continue
-        valid[key] = (value[:2])
+    netlist = Netlist.from_nodes_dict(element_nodes)
+    valid = {key: netlist[key][:2] for key in netlist.keys_of_type(Netlist.CAPACITOR, Netlist.INDUCTOR, Netlist.CURRENT_SOURCE)}
     result = {}
     for key, node_pair in valid.items():
         for path in path_list:
@@ -199,22 +324,32 @@ def get_forbidden_voltages(forbidden_names: list, expression: str) -> list:
             forbidden.append(item)
     return forbidden
 
-def get_current_by_nodes(branch_current_map: dict, node_pair_list: list) -> str:
+def get_current_by_nodes(branch_current_map: dict, node_pair_list: list, edge_index: dict = None) -> str:
     """
     Находит ток по паре узлов.
 
+    Ток ветви, в которой узлы соседние, находится по индексу рёбер за O(1); иначе — первая
+    ветвь, содержащая оба узла.
+
     Аргументы:
         branch_current_map (dict): Словарь токов в ветвях.
         node_pair_list (list): Список из двух узлов.
+        edge_index (dict, optional): Индекс index_branch_edges(branch_current_map).
 
     Возвращает:
         str: Имя тока, соответствующего данной паре узлов.
     """
+    if edge_index is None:
+        edge_index = index_branch_edges(branch_current_map)
+    a, b = node_pair_list
+    found = [entry for entry in (edge_index.get((a, b)), edge_index.get((b, a))) if entry is not None]
+    if found:
+        return min(found)[1]
     for key, value in branch_current_map.items():
         if all(elem in value for elem in node_pair_list):
             return key
 
-def convert_voltage_to_ohm_law(voltage_names: list, voltage_map: dict, branch_current_map: dict) -> dict:
+def convert_voltage_to_ohm_law(voltage_names: list, voltage_map: dict, branch_current_map: dict, edge_index: dict = None) -> dict:
     """
     Преобразует список напряжений в выражения по закону Ома.
 
@@ -222,6 +357,7 @@ def convert_voltage_to_ohm_law(voltage_names: list, voltage_map: dict, branch_cu
         voltage_names (list): Список имён напряжений.
         voltage_map (dict): Словарь напряжений.
         branch_current_map (dict): Словарь токов в ветвях.
+        edge_index (dict, optional): Индекс рёбер ветвей (index_branch_edges).
 
     Возвращает:
         dict: Словарь, где ключ — имя напряжения, значение — выражение по закону Ома.
@@ -233,11 +369,11 @@ def convert_voltage_to_ohm_law(voltage_names: list, voltage_map: dict, branch_cu
         elif f"-{voltage}" in voltage_map:
             node_pair_list = voltage_map[f"-{voltage}"][::-1]
         resistance = voltage[voltage.find("_")+1:]
-        current = get_current_by_nodes(branch_current_map, node_pair_list)
+        current = get_current_by_nodes(branch_current_map, node_pair_list, edge_index)
         result[voltage] = f"({current}*{resistance})"
     return result
 
-def solve_forbidden_current_expressions(forbidden_names: list, branch_current_map: dict, voltage_map: dict, element_nodes: dict, element_graph: dict, element_key: str, forbidden_voltage_names: list) -> dict:
+def solve_forbidden_current_expressions(forbidden_names: list, branch_current_map: dict, voltage_map: dict, element_nodes: dict, element_graph: dict, element_key: str, forbidden_voltage_names: list, edge_index: dict = None, spanning_tree: tuple = None) -> dict:
     """
     Решает выражения для запрещённых токов.
 
@@ -249,6 +385,8 @@ def solve_forbidden_current_expressions(forbidden_names: list, branch_current_ma
         element_graph (dict): Словарь соединений между элементами.
         element_key (str): Имя элемента.
         forbidden_voltage_names (list): Список имён запрещённых напряжений.
+        edge_index (dict, optional): Индекс рёбер ветвей (index_branch_edges).
+        spanning_tree (tuple, optional): Остовное дерево схемы (build_spanning_tree).
 
     Возвращает:
         dict: Словарь выражений для запрещённых токов.
@@ -257,7 +395,7 @@ def solve_forbidden_current_expressions(forbidden_names: list, branch_current_ma
     for elem in forbidden_names:
         node_pair_list = get_element_terminals(elem, branch_current_map)
         resistance = "(" + get_resistor_names_from_path(branch_current_map[elem], element_nodes) + ")"
-        path_list = find_all_paths_in_graph(element_graph, node_pair_list[0], node_pair_list[1])
+        path_list = find_loop_paths(element_graph, node_pair_list[0], node_pair_list[1], element_nodes, spanning_tree)
         path_list = filter_valid_element_paths(path_list, element_nodes)
         expr = get_voltage_expression_along_path(path_list, voltage_map, element_key)
         forbidden = get_forbidden_voltages(forbidden_voltage_names, expr)
@@ -265,7 +403,7 @@ def solve_forbidden_current_expressions(forbidden_names: list, branch_current_ma
             result[elem] = f"({expr})/{resistance}"
             continue
         else:
-            formula = convert_voltage_to_ohm_law(forbidden, voltage_map, branch_current_map)
+            formula = convert_voltage_to_ohm_law(forbidden, voltage_map, branch_current_map, edge_index)
             for key, value in formula.items():
                 expr = expr.replace(key, value)
         result[elem] = f"({expr})/{resistance}"
@@ -288,6 +426,13 @@ def generate_circuit_equations(can_be: list, cant_be: list, need_to_find: list,
     Возвращает:
         tuple: Кортеж из двух словарей — уравнения для токов и для напряжений.
     """
+    element_nodes = Netlist.from_nodes_dict(element_nodes)
+    edge_index = index_branch_edges(branch_current_map)
+    spanning_tree = build_spanning_tree(element_graph, element_nodes)
+
+    def element_type(voltage: str) -> int:
+        return element_nodes.type_of(voltage.lstrip('-+')[2:])
+
     u_set = {}
     i_set = {}
     i_max_set = []
@@ -299,16 +444,16 @@ def generate_circuit_equations(can_be: list, cant_be: list, need_to_find: list,
                     pos1 = path[i]
                     pos2 = path[i+1]
                     for key, val in voltage_map.items():
-                        if "R" in key or "X" in key:
+                        if element_type(key) in (Netlist.RESISTOR, Netlist.SUBCIRCUIT):
                             continue
                         elif [pos1, pos2] == val:
-                            if "V" in key:
+                            if element_type(key) == Netlist.VOLTAGE_SOURCE:
                                 expr.append(f"-{key}")
                                 break
                             expr.append(f"-{key}")
                             break
                         elif [pos2, pos1] == val:
-                            if "V" in key:
+                            if element_type(key) == Netlist.VOLTAGE_SOURCE:
                                 expr.append(f"+{key}")
                                 break
                             expr.append(f"+{key}")
@@ -326,7 +471,7 @@ def generate_circuit_equations(can_be: list, cant_be: list, need_to_find: list,
                 i_set[elem] = equation
                 break
             else:
-                solved = solve_forbidden_current_expressions(forbidden, branch_current_map, voltage_map, element_nodes, element_graph, elem, cant_be)
+                solved = solve_forbidden_current_expressions(forbidden, branch_current_map, voltage_map, element_nodes, element_graph, elem, cant_be, edge_index, spanning_tree)
                 i_eq = []
                 for key, value in solved.items():
                     i_eq.append(Eq(simplify(key), simplify(value)))
@@ -343,7 +488,7 @@ def generate_circuit_equations(can_be: list, cant_be: list, need_to_find: list,
                 pos1 = path[i]
                 pos2 = path[i+1]
                 for key, val in voltage_map.items():
-                    if "X" in key:
+                    if element_type(key) == Netlist.SUBCIRCUIT:
                         continue
                     elif [pos1, pos2] == val:
                         expr.append(f"+{key}")
@@ -359,17 +504,17 @@ def generate_circuit_equations(can_be: list, cant_be: list, need_to_find: list,
                 node_pair_list = voltage_map[elem]
             else:
                 node_pair_list = voltage_map[elem][::-1]
-            path = find_all_paths_in_graph(element_graph, node_pair_list[0], node_pair_list[1])
+            path = find_loop_paths(element_graph, node_pair_list[0], node_pair_list[1], element_nodes, spanning_tree)
             path.remove(node_pair_list)
             formula = get_u_from_path(path[0], voltage_map)
             forbidden = get_forbidden_voltages(cant_be, formula)
-            x = convert_voltage_to_ohm_law(forbidden, voltage_map, branch_current_map)
+            x = convert_voltage_to_ohm_law(forbidden, voltage_map, branch_current_map, edge_index)
             for key, value in x.items():
                 formula = formula.replace(key, value)
             u_set[elem] = simplify(formula)
         else:
             node_pair_list = voltage_map[elem]
-            path_list = find_all_paths_in_graph(element_graph, node_pair_list[0], node_pair_list[1])
+            path_list = find_loop_paths(element_graph, node_pair_list[0], node_pair_list[1], element_nodes, spanning_tree)
             path_list.remove(node_pair_list)
             path_list = filter_valid_element_paths(path_list, element_nodes)
             formulas = []
@@ -380,7 +525,7 @@ def generate_circuit_equations(can_be: list, cant_be: list, need_to_find: list,
                 if is_good_formula:
                     break
                 forbidden = get_forbidden_voltages(cant_be, formulas[0])
-                u_eq = convert_voltage_to_ohm_law(forbidden, voltage_map, branch_current_map)
+                u_eq = convert_voltage_to_ohm_law(forbidden, voltage_map, branch_current_map, edge_index)
                 for key, value in u_eq.items():
                     formulas[0] = formulas[0].replace(key, f"{value}")
                 for key, value in i_set.items():
@@ -1,24 +1,198 @@
-import matplotlib.pyplot as plt
+import PySpice.Logging.Logging as Logging
+logger = Logging.setup_logging()
 import numpy as np
-from scipy.integrate import solve_ivp
-from sympy import simplify
+from scipy.integrate import OdeSolution, solve_ivp
+from scipy.optimize import OptimizeResult
+from time import perf_counter
+from entities.compiled_model import CompiledModel
+from utilits.stiffness import select_solver_settings
 
-def substitute_variables_in_expression(expression: str, variable_mapping: dict) -> str:
+def plot_bode(frequencies, response, label: str = None, show: bool = True):
     """
-    Заменяет переменные в выражении согласно переданной карте.
+    Строит диаграмму Боде: амплитуду в децибелах и фазу в градусах по логарифмической оси частот.
 
     Аргументы:
-        expression (str): Строка выражения, в котором требуется замена.
-        variable_mapping (dict): Словарь соответствия переменных (ключ — исходная переменная, значение — новая).
+        frequencies (array-like): Частоты в герцах.
+        response (array-like): Комплексная частотная характеристика на этих частотах.
+        label (str, optional): Подпись кривой.
+        show (bool): Показать окно с графиком (plt.show).
 
     Возвращает:
-        str: Новое выражение с заменёнными переменными.
+        tuple: Оси амплитуды и фазы.
     """
-    for key, value in variable_mapping.items():
-        expression = expression.replace(key, value)
-    return expression
+    import matplotlib.pyplot as plt
+    response = np.asarray(response)
+    figure, (magnitude, phase) = plt.subplots(2, 1, sharex=True)
+    magnitude.semilogx(frequencies, 20 * np.log10(np.abs(response)), label=label)
+    phase.semilogx(frequencies, np.degrees(np.unwrap(np.angle(response))), label=label)
+    magnitude.set_ylabel('|H|, dB')
+    phase.set_ylabel('arg H, deg')
+    phase.set_xlabel('Frequency, Hz')
+    for axes in (magnitude, phase):
+        axes.grid(which='both')
+    if label is not None:
+        magnitude.legend()
+    if show:
+        plt.show()
+    return magnitude, phase
 
-def plot_ode_system_solution(initial_conditions_dict: dict, inductor_equations: list, capacitor_equations: list) -> None:
+def plot_time_series(time, series: dict, show: bool = True):
+    """
+    Строит графики изменения величин во времени.
+
+    matplotlib импортируется при вызове, поэтому расчёт без графиков его не загружает.
+
+    Аргументы:
+        time (array-like): Моменты времени.
+        series (dict): Значения величин (ключ — имя, значение — массив по времени).
+        show (bool): Показать окно с графиком (plt.show).
+
+    Возвращает:
+        matplotlib.axes.Axes: Оси графика.
+    """
+    import matplotlib.pyplot as plt
+    axes = plt.figure().gca()
+    for key, values in series.items():
+        axes.plot(time, values, label=f'{key}')
+    axes.set_xlabel('Time')
+    axes.set_ylabel('Values')
+    axes.legend()
+    axes.grid()
+    if show:
+        plt.show()
+    return axes
+
+def solve_piecewise(rhs, time_span: list, initial_state: np.ndarray, breakpoints=(), t_eval=None,
+                    dense_output: bool = False, **options) -> OptimizeResult:
+    """
+    Решает систему ОДУ отрезками между точками излома источников.
+
+    В каждой точке излома (фронт импульса, узел PWL) решатель останавливается и начинает заново
+    с текущего состояния, поэтому адаптивный шаг не дробится на разрыве правой части, а точка
+    излома не может оказаться пропущенной внутри длинного шага.
+
+    Аргументы:
+        rhs: Правая часть f(t, y).
+        time_span (list): Интервал интегрирования [t0, t1].
+        initial_state (np.ndarray): Состояние в момент t0.
+        breakpoints (array-like): Точки излома; точки вне (t0, t1) не учитываются.
+        t_eval (array-like, optional): Моменты времени для записи решения.
+        dense_output (bool): Построить плотный выход на всём интервале.
+        options: Прочие аргументы solve_ivp (method, max_step, jac, ...).
+
+    Возвращает:
+        OptimizeResult: Поля t, y, sol (при dense_output), nfev, njev, nlu, success, message
+            — как у результата solve_ivp, и segments — число отрезков.
+    """
+    start, stop = float(time_span[0]), float(time_span[1])
+    points = np.asarray(breakpoints, dtype=float)
+    edges = np.concatenate([[start], np.unique(points[(points > start) & (points < stop)]), [stop]])
+    t_eval = None if t_eval is None else np.asarray(t_eval, dtype=float)
+    state = np.asarray(initial_state, dtype=float)
+    times, values, interpolants, ts = [], [], [], [edges[:1]]
+    counters = {'nfev': 0, 'njev': 0, 'nlu': 0}
+    for index, (left, right) in enumerate(zip(edges[:-1], edges[1:])):
+        segment_eval = None
+        keep = slice(1 if index else 0, None)
+        if t_eval is not None:
+            inside = t_eval[(t_eval >= left) & (t_eval < right)]
+            keep = slice(0, inside.size + int(right == stop and np.any(t_eval == stop)))
+            segment_eval = np.append(inside, right)
+        solution = solve_ivp(rhs, (left, right), state, t_eval=segment_eval, dense_output=dense_output, **options)
+        if not solution.success:
+            return OptimizeResult(t=np.concatenate(times or [np.empty(0)]), y=np.hstack(values or [np.empty((state.size, 0))]),
+                                  sol=None, success=False, message=solution.message, segments=index + 1, **counters)
+        for key in counters:
+            counters[key] += getattr(solution, key)
+        times.append(solution.t[keep])
+        values.append(solution.y[:, keep])
+        if dense_output:
+            interpolants.extend(solution.sol.interpolants)
+            ts.append(solution.sol.ts[1:])
+        state = solution.y[:, -1]
+    sol = OdeSolution(np.concatenate(ts), interpolants) if dense_output else None
+    return OptimizeResult(t=np.concatenate(times), y=np.hstack(values), sol=sol, success=True,
+                          message='The solver successfully reached the end of the integration interval.',
+                          segments=len(edges) - 1, **counters)
+
+def model_solver_options(model, initial_state: np.ndarray, end_time: float = None, method: str = None,
+                         max_step: float = None, source_period: float = None) -> tuple:
+    """
+    Выбирает метод и шаг по собственным числам модели и собирает параметры solve_ivp.
+
+    Собственные числа даёт сама модель, если умеет (model.eigenvalues(): у BandedLinearModel — только
+    крайние моды), иначе они вычисляются по матрице Якоби в начальной точке. Если метод не задан,
+    берётся метод модели model.default_method, а при его отсутствии — по жёсткости системы. Модель
+    с resolve_modes = False (BandedLinearModel) не ограничивает шаг неявного метода своими модами.
+    Матрица Якоби передаётся в форме, которую задаёт модель (model.jacobian_options), иначе — model.jacobian.
+
+    Аргументы:
+        model: CompiledModel, LinearModel или BandedLinearModel.
+        initial_state (np.ndarray): Начальное состояние.
+        end_time (float, optional): Длительность расчёта.
+        method (str, optional): Метод solve_ivp.
+        max_step (float, optional): Максимальный шаг.
+        source_period (float, optional): Наименьший период источников.
+
+    Возвращает:
+        tuple: (настройки select_solver_settings, параметры solve_ivp).
+    """
+    eigenvalues = model.eigenvalues() if hasattr(model, 'eigenvalues') else np.linalg.eigvals(model.jacobian(0.0, initial_state))
+    settings = select_solver_settings(eigenvalues, end_time=end_time, method=method or getattr(model, 'default_method', None),
+                                      max_step=max_step, source_period=source_period,
+                                      resolve_modes=getattr(model, 'resolve_modes', True))
+    options = {'method': settings['method'], 'max_step': settings['max_step']}
+    if settings['method'] in ('Radau', 'BDF', 'LSODA'):
+        if hasattr(model, 'jacobian_options'):
+            options.update(model.jacobian_options(settings['method']))
+        else:
+            options['jac'] = model.jacobian
+    return settings, options
+
+def solve_ode_system(model: CompiledModel, initial_conditions_dict: dict, time_span: list = None,
+                     method: str = None, max_step: float = None, breakpoints=None, source_period: float = None):
+    """
+    Решает систему ОДУ скомпилированной модели; выбранный метод и число вызовов правой части
+    в секунду записываются в журнал (logger.debug).
+
+    По собственным числам матрицы Якоби в начальной точке оцениваются постоянные времени системы.
+    Для жёсткой системы выбирается неявный метод с аналитической матрицей Якоби модели; интервал
+    и максимальный шаг выбираются по самой медленной и самой быстрой модам, если не заданы явно.
+
+    Аргументы:
+        model (CompiledModel): Скомпилированная модель.
+        initial_conditions_dict (dict): Начальные условия в порядке переменных состояния модели.
+        time_span (list, optional): Интервал интегрирования.
+        method (str, optional): Метод solve_ivp.
+        max_step (float, optional): Максимальный шаг.
+        breakpoints (callable, optional): Функция (t0, t1) -> точки излома источников; решатель
+            перезапускается в каждой из них (см. solve_piecewise).
+        source_period (float, optional): Наименьший период источников, ограничивающий максимальный шаг.
+
+    Возвращает:
+        Результат solve_piecewise (поля как у scipy.integrate.solve_ivp) с плотным выходом (solution.sol).
+    """
+    initial_state = np.array(list(initial_conditions_dict.values()), dtype=float)
+    settings, options = model_solver_options(model, initial_state, time_span[1] - time_span[0] if time_span else None,
+                                             method, max_step, source_period)
+    if time_span is None:
+        time_span = [0, float(settings['end_time'])]
+    logger.debug(f"Метод {settings['method']} ({'жёсткая' if settings['stiff'] else 'нежёсткая'} система, "
+                 f"отношение постоянных времени {settings['stiffness_ratio']:.3g}), интервал {time_span}, "
+                 f"максимальный шаг {settings['max_step']:.3g}")
+    model.reset_counters()
+    start = perf_counter()
+    points = breakpoints(*time_span) if breakpoints is not None else ()
+    solution = solve_piecewise(model.rhs, time_span, initial_state, points, dense_output=True, **options)
+    elapsed = perf_counter() - start
+    if not solution.success:
+        raise RuntimeError(solution.message)
+    logger.debug(f"Вызовов правой части: {model.rhs_calls}, {model.calls_per_second(elapsed):.0f} вызовов/с"
+                 + (f", отрезков между точками излома: {solution.segments}" if solution.segments > 1 else ""))
+    return solution
+
+def plot_ode_system_solution(initial_conditions_dict: dict, inductor_equations: list, capacitor_equations: list,
+                             model: CompiledModel = None, time_span: list = None) -> None:
     """
     Строит график решения системы ОДУ по заданным уравнениям и начальным условиям.
 
@@ -26,46 +200,13 @@ def plot_ode_system_solution(initial_conditions_dict: dict, inductor_equations:
         initial_conditions_dict (dict): Начальные условия для переменных (ключ — имя переменной, значение — значение).
         inductor_equations (list): Список уравнений для индуктивностей.
         capacitor_equations (list): Список уравнений для конденсаторов.
+        model (CompiledModel, optional): Уже скомпилированная модель; если не задана, строится по уравнениям.
+        time_span (list, optional): Интервал интегрирования (по умолчанию — по постоянным времени системы).
 
     Возвращает:
         None
     """
-    def ode_rhs(time, y, ode_equation):
-        dydt = eval(ode_equation)
-        return dydt
-    str_eval = "["
-    time_span = [0, 1]
-    equations = {}
-    y_map = {}
-    for eq in inductor_equations:
-        left_part = eq[:eq.find("'")+1]
-        right_part = eq[eq.find("=")+2:]
-        equations[left_part] = str(simplify(right_part))
-    for eq in capacitor_equations:
-        left_part = eq[:eq.find("'")+1]
-        right_part = eq[eq.find("=")+2:]
-        equations[left_part] = str(simplify(right_part))
-    for i, key in enumerate(initial_conditions_dict.keys()):
-        y_map[key] = f"y[{i}]"
-    for key, value in equations.items():
-        equations[key] = substitute_variables_in_expression(value, y_map)
-        str_eval += f"{equations[key]}, "
-    str_eval += "]"
-    solution = solve_ivp(lambda time, y: ode_rhs(time, y, str_eval), time_span, list(initial_conditions_dict.values()))
-    for i, key in enumerate(initial_conditions_dict.keys()):
-        plt.plot(solution.t, solution.y[i], label=f'{key}')
-    plt.xlabel('Time')
-    plt.ylabel('Values')
-    plt.legend()
-    plt.grid()
-    plt.show()
-    
-    # plt.plot(sol.t, sol.y[0], label='y1(t)')
-    # plt.plot(sol.t, sol.y[1], label='y2(t)')
-    # plt.xlabel('Time')
-    # plt.ylabel('Values')
-    # plt.title('Solution of system of ODEs')
-    # plt.legend()
-    # plt.show()
-        
-
+    if model is None:
+        model = CompiledModel.from_equations(list(initial_conditions_dict.keys()), inductor_equations + capacitor_equations)
+    solution = solve_ode_system(model, initial_conditions_dict, time_span)
+    plot_time_series(solution.t, dict(zip(initial_conditions_dict.keys(), solution.y)))
@@ -0,0 +1,314 @@
+import os
+import re
+from functools import lru_cache
+from entities.netlist import Netlist
+from entities.waveform import SineWaveform, PulseWaveform, PiecewiseLinearWaveform
+
+SUFFIXES = {'t': 1e12, 'g': 1e9, 'meg': 1e6, 'k': 1e3, 'mil': 25.4e-6, 'm': 1e-3,
+            'u': 1e-6, 'µ': 1e-6, 'n': 1e-9, 'p': 1e-12, 'f': 1e-15, 'a': 1e-18}
+NUMBER = re.compile(r'([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|mil|[tgkmuµnpfa])?', re.IGNORECASE)
+SOURCE_FUNCTION = re.compile(r'\b(sin|pulse|pwl)\s*(?:\(([^)]*)\)|(.*))', re.IGNORECASE)
+IGNORED_BLOCKS = {'.control': '.endc'}
+GROUND_ALIASES = {'0', 'gnd'}
+
+@lru_cache(maxsize=4096)
+def parse_value(text: str) -> float:
+    """
+    Переводит число SPICE с инженерной приставкой в float: '4.7k' -> 4700, '1MEG' -> 1e6, '10uF' -> 1e-5.
+
+    Приставка не зависит от регистра (M и m — милли, MEG — мега, F — фемто), буквы после неё
+    (единицы измерения) игнорируются.
+
+    Аргументы:
+        text (str): Запись числа.
+
+    Возвращает:
+        float: Значение в единицах СИ.
+    """
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    match = NUMBER.match(text)
+    if match is None:
+        raise ValueError(f"Invalid SPICE number: {text}")
+    value = float(match.group(1))
+    suffix = match.group(2)
+    return value * SUFFIXES[suffix.lower()] if suffix else value
+
+def logical_lines(lines):
+    """
+    Объединяет строки продолжения ('+') и убирает комментарии ('*' в начале строки, '$' и ';' в строке).
+
+    Первая строка файла SPICE — заголовок, она пропускается.
+
+    Аргументы:
+        lines: Итерируемый набор строк (например, открытый файл).
+
+    Возвращает:
+        generator: Пары (номер первой физической строки, логическая строка).
+    """
+    pending, start = None, 0
+    for number, line in enumerate(lines, 1):
+        if number == 1:
+            continue
+        for marker in (';', '$'):
+            if marker in line:
+                line = line.split(marker, 1)[0]
+        line = line.strip()
+        if not line or line[0] == '*':
+            continue
+        if line[0] == '+':
+            if pending is not None:
+                pending += ' ' + line[1:]
+            continue
+        if pending is not None:
+            yield start, pending
+        pending, start = line, number
+    if pending is not None:
+        yield start, pending
+
+def _node(token: str) -> str:
+    """
+    Возвращает имя узла без учёта регистра; земля ('0', 'gnd', 'GND') — узел '0'.
+    """
+    token = token.lower()
+    return '0' if token in GROUND_ALIASES else token
+
+def _source(rest: str) -> tuple:
+    """
+    Разбирает описание источника после узлов: значение по постоянному току и зависимость от времени.
+
+    Аргументы:
+        rest (str): Часть строки после узлов ('DC 5', '5V', 'SIN(0 1 1k)', 'PULSE 0 5 0 0 0 1m 2m', ...).
+
+    Возвращает:
+        tuple: (значение, Waveform или None); при зависимости от времени значение — при t = 0.
+    """
+    waveform = None
+    match = SOURCE_FUNCTION.search(rest)
+    if match is not None:
+        arguments = (match.group(2) if match.group(2) is not None else match.group(3)).replace(',', ' ').split()
+        rest = rest[:match.start()] + ' ' + rest[match.end():] if match.group(2) is not None else rest[:match.start()]
+        values = []
+        for token in arguments:
+            if token.lower() in ('ac', 'dc') or '=' in token:
+                break
+            values.append(parse_value(token))
+        options = dict(token.lower().split('=', 1) for token in re.sub(r'\s*=\s*', '=', rest).split() if '=' in token)
+        kind = match.group(1).lower()
+        if kind == 'sin':
+            values += [0.0] * (5 - len(values))
+            waveform = SineWaveform(*values[:5])
+        elif kind == 'pulse':
+            values += [0.0] * (7 - len(values))
+            waveform = PulseWaveform(*values[:7])
+        else:
+            repeat = options.get('r')
+            waveform = PiecewiseLinearWaveform(values[0::2], values[1::2],
+                                               None if repeat is None else parse_value(repeat),
+                                               parse_value(options.get('td', '0')))
+    tokens = rest.split()
+    value = None
+    k = 0
+    while k < len(tokens):
+        token = tokens[k].lower()
+        if token == 'dc' and k + 1 < len(tokens):
+            value = parse_value(tokens[k + 1])
+            k += 2
+        elif token == 'ac':
+            k += 2 + (k + 2 < len(tokens) and NUMBER.fullmatch(tokens[k + 2]) is not None)
+        elif '=' in token:
+            k += 1
+        else:
+            if value is None:
+                value = parse_value(tokens[k])
+            k += 1
+    if waveform is not None:
+        return float(waveform(0.0)), waveform
+    return (0.0 if value is None else value), None
+
+def parse_element(number: int, line: str) -> tuple:
+    """
+    Разбирает строку элемента в шаблон, не зависящий от места подключения.
+
+    Имена узлов, как в SPICE, не зависят от регистра и приводятся к нижнему (IN и in — один узел);
+    узел gnd (GND) — земля '0'.
+
+    Аргументы:
+        number (int): Номер строки (для сообщений об ошибках).
+        line (str): Логическая строка элемента.
+
+    Возвращает:
+        tuple: (имя, код типа, узел+, узел-, значение, Waveform или None) для элементов R, L, C, V, I;
+        для линии T — (имя, DELAY_LINE, узел порта 1, узел порта 2, Z0, TD);
+        для вызова подцепи — (имя, SUBCIRCUIT, узлы, имя подцепи, номер строки, None).
+    """
+    tokens = line.split()
+    name = tokens[0]
+    letter = name[0].upper()
+    code = Netlist.PREFIXES.get(letter)
+    if code == Netlist.SUBCIRCUIT:
+        words = [token for token in tokens if '=' not in token and token.lower() != 'params:']
+        return name, code, [_node(word) for word in words[1:-1]], words[-1], number, None
+    if code == Netlist.DELAY_LINE:
+        words = [token for token in re.sub(r'\s*=\s*', '=', line).split() if '=' not in token]
+        options = dict(token.lower().split('=', 1) for token in re.sub(r'\s*=\s*', '=', line).split() if '=' in token)
+        if len(words) < 5 or 'z0' not in options or 'td' not in options:
+            raise ValueError(f"Line {number}: a delay line needs four nodes, Z0 and TD: {line}")
+        if _node(words[2]) != '0' or _node(words[4]) != '0':
+            raise ValueError(f"Line {number}: delay line ports must be referenced to ground: {line}")
+        return name, code, _node(words[1]), _node(words[3]), parse_value(options['z0']), parse_value(options['td'])
+    if code is None or len(tokens) < 3 + (letter in 'RLC'):
+        raise ValueError(f"Line {number}: unsupported element: {line}")
+    if letter in 'VI':
+        value, waveform = _source(line.split(None, 3)[3] if len(tokens) > 3 else '')
+        return name, code, _node(tokens[1]), _node(tokens[2]), value, waveform
+    return name, code, _node(tokens[1]), _node(tokens[2]), parse_value(tokens[3]), None
+
+class _Reader:
+    """
+    Состояние потокового разбора: накопленные элементы, шаблоны подцепей, отложенные до конца файла вызовы.
+    """
+    def __init__(self) -> None:
+        self.keys, self.nodes, self.types, self.values = [], [], [], []
+        self.waveforms = {}
+        self.delay_lines = {}
+        self.subcircuits = {}
+        self.pending = []
+        self.names = set()
+
+    def add(self, template: tuple, node_map: dict = None, path: str = '', defer: bool = True) -> None:
+        """
+        Добавляет элемент по шаблону parse_element или раскрывает вызов подцепи.
+
+        Аргументы:
+            template (tuple): Шаблон элемента.
+            node_map (dict, optional): Выводы подцепи -> узлы схемы; None на верхнем уровне.
+            path (str): Путь вызова подцепи ('X1.X2'), пустой на верхнем уровне.
+            defer (bool): Откладывать вызов подцепи верхнего уровня до конца файла.
+        """
+        name, code, a, b, value, extra = template
+        if code == Netlist.SUBCIRCUIT:
+            if node_map is None and defer:
+                self.pending.append((len(self.keys), template))
+            else:
+                self.instance(template, node_map, path)
+            return
+        key = f"{name[0].upper()}.{path}.{name}" if path else name
+        if key in self.names:
+            raise ValueError(f"Duplicate element {key}")
+        self.names.add(key)
+        if node_map is not None:
+            a = self.node(a, node_map, path)
+            b = self.node(b, node_map, path)
+        if code == Netlist.DELAY_LINE:
+            self.delay_lines[key] = extra
+        elif extra is not None:
+            self.waveforms[key] = extra
+        self.keys.append(key)
+        self.nodes.append((a, b))
+        self.types.append(code)
+        self.values.append(value)
+
+    @staticmethod
+    def node(node: str, node_map: dict, path: str) -> str:
+        """
+        Возвращает имя узла схемы: выводы подцепи заменяются узлами вызова, внутренние узлы получают путь.
+        """
+        if node == '0':
+            return node
+        mapped = node_map.get(node)
+        return mapped if mapped is not None else f"{path}.{node}"
+
+    def instance(self, template: tuple, node_map: dict, path: str) -> None:
+        """
+        Раскрывает вызов подцепи (вместе с вложенными вызовами).
+        """
+        name, _, nodes, subcircuit, number, _ = template
+        if subcircuit.lower() not in self.subcircuits:
+            raise ValueError(f"Line {number}: unknown subcircuit {subcircuit}")
+        ports, body = self.subcircuits[subcircuit.lower()]
+        if len(nodes) != len(ports):
+            raise ValueError(f"Line {number}: subcircuit {subcircuit} has {len(ports)} nodes, got {len(nodes)}")
+        if node_map is not None:
+            nodes = [self.node(node, node_map, path) for node in nodes]
+        inner_map = dict(zip(ports, nodes))
+        inner = f"{path}.{name}" if path else name
+        for element in body:
+            self.add(element, inner_map, inner)
+
+    def resolve(self) -> None:
+        """
+        Раскрывает отложенные вызовы подцепей на их местах в порядке элементов.
+
+        Вызывается после чтения всего файла, когда известны все подцепи: подцепь может вызывать
+        другую, определённую ниже по файлу.
+        """
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        columns = (self.keys, self.nodes, self.types, self.values)
+        start = pending[0][0]
+        tails = [column[start:] for column in columns]
+        for column in columns:
+            del column[start:]
+        stops = [position - start for position, _ in pending[1:]] + [len(tails[0])]
+        for (position, template), stop in zip(pending, stops):
+            self.add(template, defer=False)
+            for column, tail in zip(columns, tails):
+                column.extend(tail[position - start:stop])
+
+def read_netlist(source) -> Netlist:
+    """
+    Потоково читает список соединений SPICE (.cir) и строит Netlist без объектов PySpice.
+
+    Файл читается построчно: строки продолжения ('+') склеиваются, комментарии и управляющие
+    команды (.tran, .options, .model, блоки .control) пропускаются. Поддерживаются элементы R, L,
+    C, источники V и I (DC, SIN, PULSE, PWL), линии без потерь T (Z0 и TD, порты относительно
+    земли), числа с инженерными приставками и подцепи .subckt: тело подцепи разбирается один раз,
+    вызовы X раскрываются в элементы с именами в стиле ngspice (R.X1.R1, внутренние узлы X1.n3).
+    Вызовы подцепей верхнего уровня раскрываются после чтения всего файла, поэтому подцепи (в том
+    числе вложенные) могут быть определены после вызова. Имена узлов приводятся к нижнему регистру,
+    gnd — к '0'.
+
+    Аргументы:
+        source: Путь к файлу или итерируемый набор строк (первая строка — заголовок).
+
+    Возвращает:
+        Netlist: Представление схемы.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding='utf-8', errors='replace') as file:
+            return read_netlist(file)
+    reader = _Reader()
+    body = None
+    skip_until = None
+    for number, line in logical_lines(source):
+        if skip_until is not None:
+            if line.lower().startswith(skip_until):
+                skip_until = None
+            continue
+        if line[0] == '.':
+            command = line.split(None, 1)[0].lower()
+            if command == '.subckt':
+                words = [word for word in line.split()[1:] if '=' not in word and word.lower() != 'params:']
+                body = []
+                reader.subcircuits[words[0].lower()] = ([word.lower() for word in words[1:]], body)
+            elif command == '.ends':
+                body = None
+            elif command == '.end':
+                break
+            elif command in IGNORED_BLOCKS:
+                skip_until = IGNORED_BLOCKS[command]
+            elif command in ('.include', '.inc', '.lib'):
+                raise ValueError(f"Line {number}: {command} is not supported; merge the files first")
+            continue
+        template = parse_element(number, line)
+        if body is not None:
+            body.append(template)
+        else:
+            reader.add(template)
+    reader.resolve()
+    return Netlist(reader.keys, reader.nodes, reader.types, reader.values, reader.waveforms,
+                   delay_lines=reader.delay_lines)
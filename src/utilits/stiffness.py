@@ -0,0 +1,91 @@
+import numpy as np
+
+IMPLICIT_METHODS = ('Radau', 'BDF', 'LSODA')
+
+def estimate_time_constants(eigenvalues) -> dict:
+    """
+    Оценивает постоянные времени и периоды колебаний по собственным числам системы.
+
+    Аргументы:
+        eigenvalues (array-like): Собственные числа матрицы Якоби (или пучка матриц) системы.
+
+    Возвращает:
+        dict: Словарь с ключами:
+            'fastest' — наименьшая постоянная времени затухающих мод, с;
+            'slowest' — наибольшая постоянная времени затухающих мод, с;
+            'shortest_period' — наименьший период колебательных мод, с (None, если колебаний нет);
+            'longest_period' — наибольший период колебательных мод, с (None, если колебаний нет);
+            'stiffness_ratio' — отношение наибольшей и наименьшей скоростей затухания;
+            'undamped' — есть ли моды без затухания (Re λ >= 0).
+    """
+    eigenvalues = np.asarray(eigenvalues, dtype=complex)
+    eigenvalues = eigenvalues[np.isfinite(eigenvalues)]
+    rates = -eigenvalues.real
+    scale = np.abs(eigenvalues).max() if eigenvalues.size else 0.0
+    decaying = rates > 1e-9 * max(scale, 1.0)
+    frequencies = np.abs(eigenvalues.imag)
+    oscillating = frequencies > 1e-9 * max(scale, 1.0)
+    periods = 2 * np.pi / frequencies[oscillating]
+    return {
+        'fastest': 1 / rates[decaying].max() if decaying.any() else None,
+        'slowest': 1 / rates[decaying].min() if decaying.any() else None,
+        'shortest_period': periods.min() if periods.size else None,
+        'longest_period': periods.max() if periods.size else None,
+        'stiffness_ratio': rates[decaying].max() / rates[decaying].min() if decaying.any() else 1.0,
+        'undamped': bool((~decaying).any()),
+    }
+
+def select_solver_settings(eigenvalues, end_time: float = None, method: str = None, max_step: float = None,
+                           stiffness_threshold: float = 1e3, settle_factor: float = 5.0,
+                           points_per_period: int = 20, min_points: int = 200, source_period: float = None,
+                           resolve_modes: bool = True) -> dict:
+    """
+    Выбирает метод интегрирования, интервал и максимальный шаг по собственным числам системы.
+
+    Система считается жёсткой, если отношение скоростей затухания самой быстрой и самой медленной
+    мод больше stiffness_threshold; тогда выбирается неявный метод Radau (с аналитической матрицей
+    Якоби), иначе — явный RK45. Интервал расчёта — settle_factor самых медленных постоянных времени
+    (не меньше нескольких периодов самых медленных колебаний). Максимальный шаг ограничен так, чтобы
+    на период самых быстрых колебаний приходилось points_per_period шагов, а для нежёсткой системы —
+    ещё и самой быстрой постоянной времени; то же ограничение действует для периода source_period
+    изменяющихся во времени источников. При resolve_modes=False неявный метод не обязан разрешать
+    собственные моды системы: шаг ограничен только периодом источников и длиной интервала (моды,
+    не возбуждаемые сигналом, гасит сам метод). Значения, заданные пользователем, не меняются.
+
+    Аргументы:
+        eigenvalues (array-like): Собственные числа системы.
+        end_time (float, optional): Время окончания расчёта, заданное пользователем.
+        method (str, optional): Метод solve_ivp, заданный пользователем.
+        max_step (float, optional): Максимальный шаг, заданный пользователем.
+        stiffness_threshold (float): Порог отношения скоростей затухания для жёсткой системы.
+        settle_factor (float): Сколько самых медленных постоянных времени рассчитывать.
+        points_per_period (int): Число шагов на период самых быстрых колебаний.
+        min_points (int): Минимальное число шагов на интервале расчёта.
+        source_period (float, optional): Наименьший период источников (например, синусоидальных).
+        resolve_modes (bool): Ограничивать шаг неявного метода периодами и постоянными времени мод.
+
+    Возвращает:
+        dict: 'method', 'end_time', 'max_step', 'stiff' и оценки постоянных времени.
+    """
+    modes = estimate_time_constants(eigenvalues)
+    stiff = modes['stiffness_ratio'] > stiffness_threshold
+    if end_time is None:
+        candidates = []
+        if modes['slowest'] is not None:
+            candidates.append(settle_factor * modes['slowest'])
+        if modes['longest_period'] is not None:
+            candidates.append(settle_factor * modes['longest_period'])
+        end_time = max(candidates) if candidates else 1.0
+    if method is None:
+        method = 'Radau' if stiff else 'RK45'
+    if max_step is None:
+        limits = [end_time / min_points]
+        if resolve_modes or method not in IMPLICIT_METHODS:
+            if modes['shortest_period'] is not None:
+                limits.append(modes['shortest_period'] / points_per_period)
+            if not stiff and modes['fastest'] is not None:
+                limits.append(modes['fastest'])
+        if source_period is not None:
+            limits.append(source_period / points_per_period)
+        max_step = min(limits)
+    return {'method': method, 'end_time': end_time, 'max_step': max_step, 'stiff': stiff, **modes}
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Модули проекта импортируются из каталога src (как при запуске из него: from entities... import ...).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
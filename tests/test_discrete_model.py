@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from scipy.linalg import expm
+from benchmarks.circuits import ladder_circuit
+from entities.circuit_simulation import CircuitSimulation
+from entities.discrete_model import DiscreteModel
+
+def stepwise(model, initial_state, inputs):
+    """
+    Рекурсия x[k+1] = Φ x[k] + Γ u[k] по одному шагу — эталон для блочного расчёта.
+    """
+    states = [np.asarray(initial_state, dtype=float)]
+    for k in range(inputs.shape[-1]):
+        states.append(model.Phi @ states[-1] + model.Gamma @ inputs[:, k])
+    return np.stack(states, axis=-1)
+
+@pytest.fixture
+def ladder():
+    simulation = CircuitSimulation(ladder_circuit(4), backend='numeric')
+    simulation.set_initial_conditions({'C1': 5.0, 'L2': 1.0})
+    return simulation
+
+def test_analyze_discrete_matches_analyze(ladder):
+    """
+    Для постоянных источников ZOH точен в узлах сетки: analyze_discrete совпадает с e^(At) до
+    округления и с analyze() до допуска solve_ivp.
+    """
+    discrete = ladder.analyze_discrete(0.05, 1e-4)
+    continuous = ladder.analyze(end_time=0.05)
+    scale = np.max(np.abs(discrete.values))
+    assert np.max(np.abs(continuous(discrete.time) - discrete.values)) < 1e-5 * scale
+    model = ladder.to_state_space()
+    x0 = np.array([ladder.initial_conditions[name] for name in model.state_names])
+    steady = np.linalg.solve(model.A, -model.B @ model.input_values)
+    exact = np.stack([steady + expm(model.A * t) @ (x0 - steady) for t in discrete.time], axis=-1)
+    assert np.max(np.abs(exact - discrete.values)) < 1e-12 * scale
+
+@pytest.mark.parametrize('block', [1, 7, 64])
+def test_blocked_recurrence_with_partial_last_block(ladder, block):
+    """
+    Блочная рекурсия с размером блока, не делящим число шагов (последний блок неполный),
+    совпадает с пошаговой; так же для постоянных входов схемы и для пакета последовательностей.
+    """
+    model = DiscreteModel.from_state_space(ladder.to_state_space(), 1e-4)
+    n, m = model.Gamma.shape
+    rng = np.random.default_rng(2)
+    steps = 50
+    x0 = rng.normal(size=n)
+    inputs = rng.normal(size=(3, m, steps))
+    batched = model.simulate(x0, inputs, block=block)
+    for k in range(3):
+        assert np.allclose(batched[k], stepwise(model, x0, inputs[k]), rtol=1e-12, atol=1e-9)
+    constant = np.repeat(model.input_values[:, None], steps, axis=1)
+    assert np.allclose(model.simulate(x0, steps=steps, block=block), stepwise(model, x0, constant),
+                       rtol=1e-12, atol=1e-9)
+
+def test_simulate_writes_into_out(ladder):
+    """
+    Результат записывается в переданный массив; неверная форма отклоняется.
+    """
+    model = ladder.discretize(1e-4)
+    out = np.empty((len(model.state_names), 11))
+    assert model.simulate(np.zeros(len(model.state_names)), steps=10, out=out) is out
+    with pytest.raises(ValueError, match='Output array must have shape'):
+        model.simulate(np.zeros(len(model.state_names)), steps=10, out=np.empty((1, 11)))
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from scipy.linalg import expm
+from benchmarks.circuits import ladder_circuit
+from entities.mna_system import MNASystem
+from entities.netlist import Netlist
+from entities.numeric_assembly import NumericAssembly
+
+RC = {'V1': ['1', '0', 10.0], 'R1': ['1', '2', 1000.0], 'C1': ['2', '0', 1e-6]}
+RL = {'V1': ['1', '0', 10.0], 'R1': ['1', '2', 10.0], 'L1': ['2', '0', 0.01]}
+RLC = {'V1': ['1', '0', 1.0], 'R1': ['1', '2', 10.0], 'L1': ['2', '3', 0.001], 'C1': ['3', '0', 1e-6]}
+
+def transient(elements, end_time, time_step, method='trapezoidal', initial_conditions=None):
+    """
+    Переходный процесс MNASystem: моменты времени и словарь значений переменных состояния.
+    """
+    time, values, names = MNASystem(elements).transient(end_time, time_step, initial_conditions, method)
+    return time, dict(zip(names, values))
+
+@pytest.mark.parametrize('method, tolerance', [('trapezoidal', 1e-5), ('backward_euler', 1e-2)])
+def test_rc_step_response(method, tolerance):
+    """
+    Заряд RC-цепи: U_C(t) = E (1 - e^(-t/τ)), τ = RC.
+    """
+    time, states = transient(RC, 5e-3, 1e-6, method)
+    expected = 10.0 * (1 - np.exp(-time / 1e-3))
+    assert np.max(np.abs(states['U_C1'] - expected)) < tolerance
+
+def test_rl_step_response():
+    """
+    Нарастание тока RL-цепи: I_L(t) = E / R (1 - e^(-t/τ)), τ = L / R.
+    """
+    time, states = transient(RL, 5e-3, 1e-6)
+    expected = 1.0 * (1 - np.exp(-time / 1e-3))
+    assert np.max(np.abs(states['I_L1'] - expected)) < 1e-6
+
+def test_rlc_underdamped_response():
+    """
+    Последовательный RLC-контур с затухающими колебаниями: напряжение конденсатора и ток контура.
+    """
+    alpha = 10.0 / (2 * 0.001)
+    omega = np.sqrt(1 / (0.001 * 1e-6) - alpha ** 2)
+    time, states = transient(RLC, 1e-3, 1e-7)
+    decay = np.exp(-alpha * time)
+    voltage = 1 - decay * (np.cos(omega * time) + alpha / omega * np.sin(omega * time))
+    current = decay * np.sin(omega * time) / (0.001 * omega)
+    assert np.max(np.abs(states['U_C1'] - voltage)) < 1e-5
+    assert np.max(np.abs(states['I_L1'] - current)) < 1e-6
+
+def test_matches_numeric_backend():
+    """
+    Лестничная цепь: MNA с малым шагом совпадает с точным решением модели NumericAssembly (e^(At)).
+    """
+    netlist = Netlist.from_circuit(ladder_circuit(3))
+    model = NumericAssembly(netlist).state_space()
+    rng = np.random.default_rng(1)
+    initial = dict(zip(model.state_names, rng.uniform(-1, 1, len(model.state_names))))
+    time, states = transient(netlist, 2e-3, 1e-6, initial_conditions=initial)
+    x0 = np.array([initial[name] for name in model.state_names])
+    steady = np.linalg.solve(model.A, -model.B @ model.input_values)
+    for k in (0, len(time) // 2, len(time) - 1):
+        exact = steady + expm(model.A * time[k]) @ (x0 - steady)
+        simulated = np.array([states[name][k] for name in model.state_names])
+        assert np.allclose(simulated, exact, atol=1e-4)
+
+def test_operating_point_with_gmin():
+    """
+    Рабочая точка: конденсатор — разрыв, индуктивность — короткое замыкание; узел между двумя
+    конденсаторами связан с землёй только через gmin и не делает систему вырожденной.
+    """
+    assert MNASystem(RC).operating_point()['U_C1'] == pytest.approx(10.0)
+    assert MNASystem(RL).operating_point()['I_L1'] == pytest.approx(1.0)
+    divider = {'V1': ['1', '0', 5.0], 'C1': ['1', '2', 1e-6], 'C2': ['2', '0', 1e-6]}
+    point = MNASystem(divider).operating_point(gmin=1e-9)
+    assert np.all(np.isfinite(list(point.values())))
+    assert point['U_C1'] == pytest.approx(5.0)
+    assert point['U_C2'] == pytest.approx(0.0, abs=1e-9)
+
+def test_capacitor_tree_skips_loops():
+    """
+    Конденсатор параллельно источнику и параллельные конденсаторы не входят в дерево, а
+    начальное состояние с ними остаётся конечным и согласованным.
+    """
+    elements = {'V1': ['1', '0', 5.0], 'C1': ['1', '0', 1e-6], 'R1': ['1', '2', 100.0],
+                'C2': ['2', '0', 1e-6], 'C3': ['2', '0', 2e-6], 'C4': ['2', '3', 1e-6], 'C5': ['3', '0', 1e-6]}
+    system = MNASystem(elements)
+    assert system._capacitor_tree(system._static_matrix()) == ['C2', 'C4']
+    x = system.initial_state({'U_C2': 3.0, 'U_C4': 1.0})
+    states = dict(zip(system.state_variables, system.state_projection() @ x))
+    assert states['U_C1'] == pytest.approx(5.0)
+    assert states['U_C3'] == pytest.approx(3.0)
+    assert states['U_C5'] == pytest.approx(2.0)
+
+def test_march_resumes_where_it_stopped():
+    """
+    Два вызова march подряд (второй с start) дают то же, что один вызов на весь интервал.
+    """
+    system = MNASystem(RLC)
+    operators = system.step_operators(1e-7)
+    projection, names = system.output_projection()
+    x = system.initial_state()
+    whole = np.empty((len(names), 200))
+    system.march(x, 200, operators, projection, whole)
+    parts = np.empty((len(names), 200))
+    middle = system.march(x, 120, operators, projection, parts[:, :120])
+    system.march(middle, 80, operators, projection, parts[:, 120:], start=120)
+    assert np.allclose(parts, whole, rtol=0, atol=1e-14)
+
+def test_step_operators_reject_unknown_method():
+    """
+    Неизвестный метод интегрирования отклоняется с ValueError.
+    """
+    with pytest.raises(ValueError, match='Unknown integration method'):
+        MNASystem(RC).step_operators(1e-6, 'gear')
@@ -0,0 +1,27 @@
+import os
+import pickle
+import pytest
+from entities.model_cache import ModelCache
+
+def test_missing_entry_is_a_miss(tmp_path):
+    """
+    Отсутствующая запись — промах без ошибок.
+    """
+    cache = ModelCache(str(tmp_path))
+    assert cache.get('absent') is None
+    assert cache.misses == 1
+
+@pytest.mark.parametrize('content', [b'', b'\x80\x04\x95garbage', pickle.dumps({'a': 1})[:-3]])
+def test_unreadable_entry_is_deleted(tmp_path, content):
+    """
+    Пустой, повреждённый или обрезанный файл записи удаляется и считается промахом.
+    """
+    cache = ModelCache(str(tmp_path))
+    cache.put('entry', {'a': 1})
+    path = cache._path('entry')
+    with open(path, 'wb') as file:
+        file.write(content)
+    assert cache.get('entry') is None
+    assert not os.path.exists(path)
+    cache.put('entry', {'a': 2})
+    assert cache.get('entry') == {'a': 2}
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from benchmarks.circuits import ladder_circuit, mesh_circuit
+from entities.netlist import Netlist
+from entities.numeric_assembly import NumericAssembly
+
+def test_circuit_without_states_has_static_model():
+    """
+    Схема без L и C даёт модель без переменных состояния: выходы-потенциалы узлов — y = D u.
+    """
+    assembly = NumericAssembly(Netlist.from_circuit(mesh_circuit(1, 1)))
+    model = assembly.state_space(outputs=['U_2'])
+    assert model.A.shape == (0, 0) and model.B.shape == (0, 1)
+    assert model.D == pytest.approx(np.array([[1.0]]))
+    assert np.allclose(model.frequency_response([1.0, 1e3], 'U_V1', 'U_2'), 1.0)
+
+def test_ensemble_matches_assembly_of_each_member():
+    """
+    Пакетные матрицы ансамбля совпадают с A и B u сборки каждого члена по отдельности.
+    """
+    netlist = Netlist.from_circuit(ladder_circuit(3))
+    values = {'R1': [0.5, 1.0, 4.0], 'C2': [1e-4, 1e-3, 2e-3], 'V1': [10.0, 100.0, 50.0]}
+    A_batch, forcing_batch = NumericAssembly(netlist).ensemble(values)
+    for k in range(3):
+        member = NumericAssembly(netlist.with_values({key: series[k] for key, series in values.items()}))
+        A, B = member.eliminate()
+        assert np.allclose(A_batch[k], A)
+        assert np.allclose(forcing_batch[k], B @ member.input_values)
+
+def test_ensemble_rejects_unknown_element():
+    """
+    Элемент, которого нет в схеме, отклоняется с KeyError.
+    """
+    with pytest.raises(KeyError, match='Unknown element'):
+        NumericAssembly(Netlist.from_circuit(ladder_circuit(1))).ensemble({'R9': [1.0]})
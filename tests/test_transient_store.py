@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from entities.circuit_simulation import CircuitSimulation
+from entities.netlist import Netlist
+from entities.transient_store import TransientStore
+
+RLC = {'V1': ['1', '0', 1.0], 'R1': ['1', '2', 10.0], 'L1': ['2', '3', 0.001], 'C1': ['3', '0', 1e-6]}
+
+class Interrupted(Exception):
+    """
+    Имитация остановки расчёта (сбой процесса) после нескольких записанных окон.
+    """
+
+def simulation(backend):
+    """
+    Последовательный RLC-контур с ненулевыми начальными условиями.
+    """
+    result = CircuitSimulation(Netlist.from_nodes_dict(RLC), backend=backend)
+    result.set_initial_conditions({'L1': 0.01, 'C1': -0.5})
+    return result
+
+@pytest.mark.parametrize('backend', ['numeric', 'mna'])
+def test_resumed_stream_matches_uninterrupted_run(tmp_path, monkeypatch, backend):
+    """
+    Расчёт, остановленный после трёх окон и продолженный повторным вызовом stream, совпадает
+    с расчётом без остановки.
+    """
+    arguments = {'end_time': 1e-3, 'time_step': 1e-6, 'window': 1e-4}
+    reference = simulation(backend).stream(str(tmp_path / 'whole'), **arguments).to_result()
+
+    append = TransientStore.append
+    calls = {'count': 0}
+
+    def failing_append(store, values, state):
+        calls['count'] += 1
+        if calls['count'] > 3:
+            raise Interrupted()
+        append(store, values, state)
+
+    monkeypatch.setattr(TransientStore, 'append', failing_append)
+    with pytest.raises(Interrupted):
+        simulation(backend).stream(str(tmp_path / 'parts'), **arguments)
+    monkeypatch.setattr(TransientStore, 'append', append)
+    stopped = TransientStore(str(tmp_path / 'parts')).open()
+    assert 1 < stopped.count < stopped.sample_count
+
+    resumed = simulation(backend).stream(str(tmp_path / 'parts'), **arguments).to_result()
+    assert resumed.names == reference.names
+    np.testing.assert_array_equal(resumed.time, reference.time)
+    np.testing.assert_allclose(resumed.values, reference.values, rtol=0, atol=1e-12)
+
+def test_stream_rejects_store_of_another_run(tmp_path):
+    """
+    Каталог с расчётом других параметров не продолжается.
+    """
+    simulation('mna').stream(str(tmp_path), end_time=1e-4, time_step=1e-6)
+    with pytest.raises(ValueError, match='belongs to a different run'):
+        simulation('mna').stream(str(tmp_path), end_time=2e-4, time_step=1e-6)